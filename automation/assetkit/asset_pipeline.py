@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+automation_package_location = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(automation_package_location))
+
+from automation.config.project_config import ProjectConfig
+from automation.utils.logger import Logger
+from automation.utils.cache_utils import JsonStore, atomic_write_text, file_fingerprint, hash_bytes
+from automation.assetkit.converters import CONVERTERS, find_converter
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 2
+
+# Written last into a cache entry, an entry without it is incomplete
+OUTPUTS_NAME = "outputs.json"
+
+
+def get_assets_cache_dir():
+    return Path(ProjectConfig.CACHE_DIR) / "assets"
+
+def get_default_output_dir():
+    if ProjectConfig.BUILD_DIR:
+        return Path(ProjectConfig.BUILD_DIR) / "assets"
+    return ProjectConfig.PROJECT_ROOT / "build" / "assets"
+
+def bake_assets(source_dir=None, output_dir=None, jobs=None, params=None, force=False):
+    """
+    Convert every asset below `source_dir` with the converter registered for its extension.
+
+    Baked files are stored in a content-addressed cache keyed by the source's
+    content hash, the converter version and the converter parameters, so only
+    changed assets are converted again. They are then linked into `output_dir`
+    next to a manifest.json that maps each source asset to its baked files.
+
+    Args:
+        source_dir (str or None): The asset sources (default: <project>/assets).
+        output_dir (str or None): Where baked files and the manifest go (default: <build dir>/assets).
+        jobs (int or None): Number of converter processes, defaults to the CPU count.
+        params (dict or None): Per converter parameter overrides, {"image": {"max_size": 1024}}.
+        force (bool): Convert every asset, ignoring the cache.
+
+    Returns:
+        int: 0 if every asset was baked, 1 otherwise.
+    """
+    source_dir = Path(source_dir or ProjectConfig.PROJECT_ROOT / "assets").resolve()
+    output_dir = Path(output_dir or get_default_output_dir()).resolve()
+    objects_dir = get_assets_cache_dir() / "objects"
+    params = params or {}
+
+    if not source_dir.is_dir():
+        Logger.Error(f"Asset directory not found: {source_dir}")
+        return 1
+
+    start_time = time.perf_counter()
+    sources_store = JsonStore(get_assets_cache_dir() / "sources.json")
+    fingerprints = sources_store.load().get("files", {})
+
+    tasks = []
+    skipped = 0
+    for source_path in collect_assets(source_dir):
+        relative_path = source_path.relative_to(source_dir).as_posix()
+        converter = find_converter(source_path)
+        if converter is None:
+            skipped += 1
+            continue
+
+        if not converter.is_available():
+            Logger.Warning(f"Assets: skipping {relative_path}, the {converter.name} converter's dependencies are not installed")
+            skipped += 1
+            continue
+
+        converter_params = dict(converter.default_params(), **params.get(converter.name, {}))
+        fingerprint = file_fingerprint(source_path, fingerprints.get(relative_path))
+        fingerprints[relative_path] = fingerprint
+
+        key = hash_bytes(json.dumps([fingerprint["digest"], converter.name, converter.version, converter_params], sort_keys=True).encode("utf-8"))
+        tasks.append((relative_path, source_path, converter, converter_params, key))
+
+    def merge(data):
+        data.setdefault("files", {}).update(fingerprints)
+    sources_store.update(merge)
+
+    entries = {}
+    failures = []
+    pending = []
+
+    for relative_path, source_path, converter, converter_params, key in tasks:
+        entry_dir = objects_dir / key[:2] / key
+        if not force and (entry_dir / OUTPUTS_NAME).is_file():
+            entries[relative_path] = (converter.name, key, _read_outputs(entry_dir))
+        else:
+            pending.append((relative_path, source_path, converter, converter_params, key))
+
+    if pending:
+        Logger.Info(f"Assets: converting {len(pending)} of {len(tasks)} assets")
+        with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count() or 1, len(pending))) as executor:
+            futures = {
+                executor.submit(_convert_asset, converter.name, str(source_path), converter_params, str(objects_dir), key): (relative_path, converter, key)
+                for relative_path, source_path, converter, converter_params, key in pending
+            }
+
+            for future in as_completed(futures):
+                relative_path, converter, key = futures[future]
+                try:
+                    outputs = future.result()
+                except Exception as e:
+                    Logger.Error(f"Assets: failed to convert {relative_path} with {converter.name}: {e}")
+                    failures.append(relative_path)
+                    continue
+
+                Logger.Info(f"Assets: converted {relative_path} ({len(outputs)} files)")
+                entries[relative_path] = (converter.name, key, outputs)
+
+    _copy_outputs(entries, objects_dir, output_dir)
+
+    elapsed = time.perf_counter() - start_time
+    Logger.Info(f"Assets: {len(entries)} baked, {len(pending) - len(failures)} converted, {len(tasks) - len(pending)} cached, "
+                f"{len(failures)} failed, {skipped} skipped in {elapsed:.2f}s, manifest: {output_dir / MANIFEST_NAME}")
+
+    return 1 if failures else 0
+
+def collect_assets(source_dir):
+    """
+    All files below `source_dir`, sorted, skipping hidden files and directories.
+    """
+    assets = []
+    for root, dirs, names in os.walk(source_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        assets.extend(Path(root) / name for name in names if not name.startswith("."))
+
+    return sorted(assets)
+
+def _convert_asset(converter_name, source_path, params, objects_dir, key):
+    """
+    Run a converter in a worker process and move its outputs into the cache entry for `key`.
+    """
+    entry_dir = Path(objects_dir) / key[:2] / key
+    entry_dir.parent.mkdir(parents=True, exist_ok=True)
+
+    work_dir = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=entry_dir.parent))
+    try:
+        outputs = CONVERTERS[converter_name].convert(source_path, work_dir, params)
+        atomic_write_text(work_dir / OUTPUTS_NAME, json.dumps(outputs))
+
+        if entry_dir.exists():
+            # A forced rebuild, or another process baked the same content meanwhile
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        os.rename(work_dir, entry_dir)
+    finally:
+        if work_dir.exists():
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return outputs
+
+def _read_outputs(entry_dir):
+    with open(entry_dir / OUTPUTS_NAME, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _copy_outputs(entries, objects_dir, output_dir):
+    """
+    Copy baked files from the cache into `output_dir` and write the manifest.
+
+    The outputs are copies so that editing one never changes the cache entry it came from.
+    Files of assets that were removed or changed since the previous manifest are deleted.
+    """
+    manifest_path = output_dir / MANIFEST_NAME
+    previous = {}
+    reuse = False
+    if manifest_path.is_file():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        previous = manifest.get("assets", {})
+        # Version 1 outputs are hard links into the cache, they are replaced by copies
+        reuse = manifest.get("version") == MANIFEST_VERSION
+
+    assets = {}
+    for relative_path in sorted(entries):
+        converter_name, key, outputs = entries[relative_path]
+        files = [f"{relative_path}.baked/{name}" for name in outputs]
+        assets[relative_path] = {"converter": converter_name, "key": key, "files": files}
+
+        old = previous.get(relative_path)
+        if reuse and old and old["key"] == key and all((output_dir / file).is_file() for file in files):
+            continue
+
+        if old:
+            _remove_files(output_dir, old["files"])
+
+        entry_dir = objects_dir / key[:2] / key
+        for name, file in zip(outputs, files):
+            destination = output_dir / file
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(entry_dir / name, destination)
+
+    for relative_path, old in previous.items():
+        if relative_path not in assets:
+            _remove_files(output_dir, old["files"])
+
+    atomic_write_text(manifest_path, json.dumps({"version": MANIFEST_VERSION, "assets": assets}, indent=2))
+
+    return assets
+
+def _remove_files(output_dir, files):
+    for file in files:
+        try:
+            (output_dir / file).unlink()
+        except FileNotFoundError:
+            pass
+
+    # Drop the asset's .baked directory once it is empty
+    for directory in {(output_dir / file).parent for file in files}:
+        try:
+            directory.rmdir()
+        except OSError:
+            pass
+
+def _parse_params(assignments):
+    """
+    Parse "converter.param=value" assignments, values are JSON where possible.
+    """
+    params = {}
+    for assignment in assignments or ():
+        name, separator, value = assignment.partition("=")
+        converter_name, dot, param = name.partition(".")
+        if not separator or not dot:
+            raise argparse.ArgumentTypeError(f"Expected converter.param=value, got: {assignment}")
+
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+        params.setdefault(converter_name, {})[param] = value
+
+    return params
+
+def _create_parser(parent_parser=None):
+    description = "Bakes assets with the converter registered for each file extension."
+    if parent_parser is None:
+        parser = argparse.ArgumentParser(description=description)
+    else:
+        parser = parent_parser.add_parser("assets", description=description, help=description)
+
+    parser.add_argument(
+        "source",
+        type=Path,
+        nargs="?",
+        default=None,
+        help="The asset source directory (default: <project>/assets)."
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=None,
+        help="Where baked files and manifest.json are written (default: <build dir>/assets)."
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Number of converter processes (default: the CPU count)."
+    )
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=None,
+        metavar="CONVERTER.PARAM=VALUE",
+        help=f"Override a converter parameter, e.g. image.max_size=1024, can be repeated. Converters: {', '.join(CONVERTERS)}."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert every asset, ignoring the asset cache."
+    )
+
+    return parser
+
+def _run(args):
+    return bake_assets(args.source, args.output, args.jobs, _parse_params(args.param), args.force)
+
+def register_subcommand(parent_parser):
+    """
+    Add 'assets' subcommand to the parent parser.
+    """
+    parser = _create_parser(parent_parser)
+
+    parser.set_defaults(func=_run)
+
+def main():
+    """
+    Entry point for the script. Parses command-line arguments and calls `bake_assets`.
+    """
+    parser = _create_parser()
+
+    args = parser.parse_args()
+
+    sys.exit(_run(args))
+
+if __name__ == "__main__":
+    ProjectConfig.initialize()
+
+    main()
@@ -0,0 +1,182 @@
+import wave
+import shutil
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ConverterBase:
+    """
+    Turns one source asset into one or more baked files.
+
+    Bump `version` whenever the output for the same source and parameters
+    changes, the asset cache is keyed by it.
+    """
+    name = None
+    version = 1
+    extensions = ()
+
+    def default_params(self):
+        return {}
+
+    def is_available(self):
+        """
+        Whether the converter's optional dependencies are installed.
+        """
+        return True
+
+    def convert(self, source_path, output_dir, params):
+        """
+        Convert `source_path`, writing the baked files into the empty `output_dir`.
+
+        Returns:
+            list: Names of the written files, relative to `output_dir`.
+        """
+        raise NotImplementedError
+
+
+CONVERTERS = {}
+
+_EXTENSION_MAP = {}
+
+
+def register_converter(converter_class):
+    """
+    Register a converter for its extensions, usable as a class decorator.
+    """
+    converter = converter_class()
+    CONVERTERS[converter.name] = converter
+    for extension in converter.extensions:
+        _EXTENSION_MAP[extension.lower()] = converter
+    return converter_class
+
+def find_converter(path):
+    """
+    The converter registered for the extension of `path`, or None.
+    """
+    return _EXTENSION_MAP.get(Path(path).suffix.lower())
+
+
+@register_converter
+class ImageConverter(ConverterBase):
+    """
+    Downscales an image to fit `max_size` and writes its mip chain as PNG files. Needs Pillow.
+    """
+    name = "image"
+    version = 1
+    extensions = (".png", ".jpg", ".jpeg", ".tga", ".bmp")
+
+    def default_params(self):
+        return {"max_size": 2048, "mips": True}
+
+    def is_available(self):
+        return Image is not None
+
+    def convert(self, source_path, output_dir, params):
+        if Image is None:
+            raise RuntimeError("Pillow is required to convert images, install it with `pip install pillow`.")
+
+        with Image.open(source_path) as source:
+            image = source.convert("RGBA")
+
+        max_size = params["max_size"]
+        if max(image.size) > max_size:
+            scale = max_size / max(image.size)
+            image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.LANCZOS)
+
+        outputs = []
+        level = 0
+        while True:
+            name = f"mip{level}.png"
+            image.save(Path(output_dir) / name)
+            outputs.append(name)
+
+            if not params["mips"] or image.size == (1, 1):
+                return outputs
+
+            image = image.resize((max(1, image.width // 2), max(1, image.height // 2)), Image.LANCZOS)
+            level += 1
+
+
+@register_converter
+class WavConverter(ConverterBase):
+    """
+    Resamples 16-bit PCM WAV files to `sample_rate` by linear interpolation. Needs numpy.
+    """
+    name = "wav"
+    version = 3
+    extensions = (".wav",)
+
+    def default_params(self):
+        return {"sample_rate": 48000}
+
+    def is_available(self):
+        return numpy is not None
+
+    def convert(self, source_path, output_dir, params):
+        if numpy is None:
+            raise RuntimeError("numpy is required to resample sounds, install it with `pip install numpy`.")
+
+        with wave.open(str(source_path), "rb") as source:
+            channels = source.getnchannels()
+            sample_width = source.getsampwidth()
+            source_rate = source.getframerate()
+            frames = source.readframes(source.getnframes())
+
+        if sample_width != 2:
+            raise ValueError(f"Only 16-bit PCM is supported, {source_path} has {sample_width * 8}-bit samples.")
+
+        target_rate = params["sample_rate"]
+
+        if source_rate != target_rate:
+            frames = _resample(frames, channels, source_rate, target_rate)
+
+        name = Path(source_path).stem + ".wav"
+        with wave.open(str(Path(output_dir) / name), "wb") as target:
+            target.setnchannels(channels)
+            target.setsampwidth(sample_width)
+            target.setframerate(target_rate)
+            target.writeframes(frames)
+
+        return [name]
+
+
+def _resample(frames, channels, source_rate, target_rate):
+    # One row per frame, one column per channel, all channels interpolated at once
+    samples = numpy.frombuffer(frames, dtype="<i2").reshape(-1, channels).astype(numpy.float64)
+
+    source_frames = len(samples)
+    if source_frames == 0:
+        return b""
+    target_frames = max(1, source_frames * target_rate // source_rate)
+
+    positions = numpy.arange(target_frames) * (source_rate / target_rate)
+    indices = numpy.minimum(positions.astype(numpy.int64), source_frames - 1)
+    following = numpy.minimum(indices + 1, source_frames - 1)
+    fractions = (positions - indices)[:, numpy.newaxis]
+
+    resampled = samples[indices] + (samples[following] - samples[indices]) * fractions
+    return numpy.rint(resampled).astype("<i2").tobytes()
+
+
+@register_converter
+class CopyConverter(ConverterBase):
+    """
+    Passes models and fonts through unchanged, so they are listed in the manifest with the baked assets.
+    """
+    name = "copy"
+    version = 1
+    extensions = (".obj", ".mtl", ".gltf", ".glb", ".fbx", ".ttf", ".otf", ".ogg")
+
+    def convert(self, source_path, output_dir, params):
+        name = Path(source_path).name
+        shutil.copyfile(source_path, Path(output_dir) / name)
+        return [name]
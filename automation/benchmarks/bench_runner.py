@@ -0,0 +1,387 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+automation_package_location = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(automation_package_location))
+
+from automation.config.project_config import ProjectConfig
+from automation.utils.logger import Logger
+from automation.utils.shell_utils import run_command
+from automation.utils.cache_utils import atomic_write_text
+from automation.utils.code_format import format_code
+
+
+STUB_TOOL = Path(__file__).resolve().parent / "stub_tool.py"
+MANAGE_SCRIPT = automation_package_location / "automation" / "manage.py"
+
+MEGABYTE = 1024 * 1024
+
+# Relative change beyond which a metric counts as a regression
+DEFAULT_THRESHOLD = 0.15
+
+
+def _metric(value, unit, higher_is_better):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+def _median_time(function, repeat):
+    """
+    Run `function` `repeat` times and return the median wall time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+
+    return statistics.median(timings)
+
+def _ignore_line(_):
+    pass
+
+def _stub_command(*arguments):
+    return [sys.executable, str(STUB_TOOL), *map(str, arguments)]
+
+def _write_stub_launcher(directory, name, *arguments):
+    """
+    Write an executable that runs the stub tool, for code that expects a real binary path.
+    """
+    if os.name == "nt":
+        launcher = Path(directory) / f"{name}.cmd"
+        launcher.write_text(f'@"{sys.executable}" "{STUB_TOOL}" {" ".join(arguments)} %*\n', encoding="utf-8")
+    else:
+        launcher = Path(directory) / name
+        launcher.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{STUB_TOOL}" {" ".join(arguments)} "$@"\n', encoding="utf-8")
+        launcher.chmod(0o755)
+
+    return launcher
+
+def bench_startup(args):
+    """
+    Wall time of `manage.py --help` and `manage.py tree` in a fresh interpreter, and the modules `--help` imports.
+
+    Subcommand modules are loaded lazily, so both should stay flat as subcommands are added.
+    """
+    def start(*arguments):
+        command = [sys.executable, str(MANAGE_SCRIPT), *arguments]
+
+        def run_manage():
+            completed = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if completed.returncode != 0:
+                raise RuntimeError(f"manage.py exited with code {completed.returncode}: "
+                                   f"{completed.stderr.decode(errors='replace').strip().splitlines()[-1:]}")
+            return completed
+
+        return run_manage
+
+    # -X importtime reports one line per imported module on stderr
+    completed = subprocess.run([sys.executable, "-X", "importtime", str(MANAGE_SCRIPT), "--help"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    modules = sum(line.startswith(b"import time:") for line in completed.stderr.splitlines()) - 1
+
+    return {
+        "startup.manage_help": _metric(_median_time(start("--help"), args.repeat) * 1000, "ms", False),
+        "startup.manage_tree": _metric(_median_time(start("tree", str(MANAGE_SCRIPT.parent)), args.repeat) * 1000, "ms", False),
+        "startup.modules_imported": _metric(modules, "modules", False),
+    }
+
+def bench_command_overhead(args):
+    """
+    Per-call cost of `run_command` compared to a bare `subprocess.run` of the same no-op command.
+    """
+    true_path = shutil.which("true")
+    command = [true_path] if true_path else _stub_command("--size", 0)
+
+    def with_run_command():
+        for _ in range(args.calls):
+            run_command(command, log_stdout=_ignore_line, log_stderr=_ignore_line)
+
+    def with_subprocess():
+        for _ in range(args.calls):
+            subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    per_call = _median_time(with_run_command, args.repeat) / args.calls * 1000
+    baseline = _median_time(with_subprocess, args.repeat) / args.calls * 1000
+
+    return {
+        "run_command.per_call": _metric(per_call, "ms", False),
+        "run_command.overhead": _metric(per_call - baseline, "ms", False),
+    }
+
+def bench_reader_throughput(args):
+    """
+    Throughput of output streamed through SubprocessLogReaderAsync, per output encoding.
+    """
+    size = int(args.output_mb * MEGABYTE)
+    metrics = {}
+
+    # Output beyond the in-memory limit spills to temporary files, keep them in a scratch directory
+    temp_root = tempfile.tempdir
+    with tempfile.TemporaryDirectory(prefix="automation-bench-") as temp_dir:
+        tempfile.tempdir = temp_dir
+        try:
+            for encoding in args.encodings:
+                command = _stub_command("--size", size, "--encoding", encoding)
+
+                def read_output():
+                    success, _, _ = run_command(command, log_stdout=_ignore_line, log_stderr=_ignore_line)
+                    if not success:
+                        raise RuntimeError(f"stub tool failed writing {encoding} output")
+
+                elapsed = _median_time(read_output, args.repeat)
+                metrics[f"reader.throughput.{encoding}"] = _metric(size / MEGABYTE / elapsed, "MB/s", True)
+        finally:
+            tempfile.tempdir = temp_root
+
+    return metrics
+
+def bench_format(args):
+    """
+    Files per second through `format_code` with a stub clang-format, without and with the format cache.
+    """
+    cache_dir = ProjectConfig.CACHE_DIR
+
+    with tempfile.TemporaryDirectory(prefix="automation-bench-") as temp_dir:
+        temp_dir = Path(temp_dir)
+        source_dir = temp_dir / "src"
+        source_dir.mkdir()
+
+        content = "int function_{index}(int value)\n{{\n    return value * {index};\n}}\n" * 40
+        for index in range(args.format_files):
+            (source_dir / f"file_{index}.cpp").write_text(content.format(index=index), encoding="utf-8")
+
+        clang_format = _write_stub_launcher(temp_dir, "clang-format", "clang-format")
+
+        def format_all(use_cache):
+            failures = format_code(str(source_dir), recursive=True, jobs=args.jobs, use_cache=use_cache, clang_format_path=clang_format)
+            if failures:
+                raise RuntimeError(f"{len(failures)} files failed to format")
+
+        # Keep the benchmark's format cache away from the project's one
+        ProjectConfig.CACHE_DIR = temp_dir / "cache"
+        try:
+            cold = _median_time(lambda: format_all(False), args.repeat)
+            format_all(True)
+            warm = _median_time(lambda: format_all(True), args.repeat)
+        finally:
+            ProjectConfig.CACHE_DIR = cache_dir
+
+    return {
+        "format.files_per_second": _metric(args.format_files / cold, "files/s", True),
+        "format.cached_files_per_second": _metric(args.format_files / warm, "files/s", True),
+    }
+
+
+SCENARIOS = {
+    "startup": bench_startup,
+    "command": bench_command_overhead,
+    "reader": bench_reader_throughput,
+    "format": bench_format,
+}
+
+
+def run_benchmarks(args):
+    """
+    Run the selected scenarios and collect their metrics.
+
+    Returns:
+        dict: The results document, with one entry per metric under "metrics".
+    """
+    metrics = {}
+    errors = {}
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark scenarios {unknown}, choose from: {', '.join(SCENARIOS)}")
+
+    for name in args.scenarios or SCENARIOS:
+        Logger.Info(f"Benchmark: running {name}")
+        try:
+            metrics.update(SCENARIOS[name](args))
+        except Exception as e:
+            Logger.Error(f"Benchmark: {name} failed: {e}")
+            errors[name] = str(e)
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "parameters": {
+            "repeat": args.repeat,
+            "calls": args.calls,
+            "output_mb": args.output_mb,
+            "encodings": args.encodings,
+            "format_files": args.format_files,
+            "jobs": args.jobs,
+        },
+        "metrics": metrics,
+        "errors": errors,
+    }
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare metrics against a baseline and log a table of the changes.
+
+    Returns:
+        list: Names of the metrics that regressed by more than `threshold`.
+    """
+    regressions = []
+    lines = [f"{'metric':<36} {'baseline':>12} {'current':>12} {'change':>9}"]
+
+    for name, metric in sorted(results["metrics"].items()):
+        base = baseline.get("metrics", {}).get(name)
+        if base is None or not base["value"]:
+            lines.append(f"{name:<36} {'-':>12} {metric['value']:>12.3f} {'new':>9}  {metric['unit']}")
+            continue
+
+        change = (metric["value"] - base["value"]) / abs(base["value"])
+        worse = -change if metric["higher_is_better"] else change
+        marker = ""
+        if worse > threshold:
+            regressions.append(name)
+            marker = "  REGRESSION"
+
+        lines.append(f"{name:<36} {base['value']:>12.3f} {metric['value']:>12.3f} {change:>+8.1%}  {metric['unit']}{marker}")
+
+    Logger.Info("Benchmark results:\n" + "\n".join(lines))
+
+    return regressions
+
+def run(args):
+    """
+    Run the benchmarks, save the results and check them against the baseline.
+
+    Returns:
+        int: 1 if a metric regressed beyond the threshold or a scenario failed, 0 otherwise.
+    """
+    results = run_benchmarks(args)
+
+    results_path = args.results or ProjectConfig.CACHE_DIR / "benchmarks" / "latest.json"
+    baseline_path = args.baseline or ProjectConfig.CACHE_DIR / "benchmarks" / "baseline.json"
+
+    atomic_write_text(results_path, json.dumps(results, indent=2))
+    Logger.Info(f"Benchmark results written to: {results_path}")
+
+    baseline = {}
+    if baseline_path.is_file():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        Logger.Info(f"No benchmark baseline at {baseline_path}, use --save-baseline to record one")
+
+    regressions = compare_results(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        atomic_write_text(baseline_path, json.dumps(results, indent=2))
+        Logger.Info(f"Benchmark baseline saved to: {baseline_path}")
+    elif regressions:
+        Logger.Error(f"Benchmark: {len(regressions)} metrics regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+
+    return 1 if results["errors"] or (regressions and not args.save_baseline) else 0
+
+def _create_parser(parent_parser=None):
+    description = "Benchmarks the automation tooling against stub executables and compares with a baseline."
+    if parent_parser is None:
+        parser = argparse.ArgumentParser(description=description)
+    else:
+        parser = parent_parser.add_parser("bench", description=description, help=description)
+
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per measurement, the median is reported (default: 3)."
+    )
+    parser.add_argument(
+        "--calls",
+        type=int,
+        default=50,
+        help="Commands per run_command overhead measurement (default: 50)."
+    )
+    parser.add_argument(
+        "--output-mb",
+        type=float,
+        default=100,
+        help="Output volume of the reader throughput scenario in MB (default: 100)."
+    )
+    parser.add_argument(
+        "--encodings",
+        nargs="+",
+        default=["utf-8", "gbk"],
+        help="Output encodings of the reader throughput scenario (default: utf-8 gbk)."
+    )
+    parser.add_argument(
+        "--format-files",
+        type=int,
+        default=500,
+        help="Number of generated source files for the format scenario (default: 500)."
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=0,
+        help="Parallel clang-format processes in the format scenario (default: the CPU count)."
+    )
+    parser.add_argument(
+        "--results",
+        type=Path,
+        default=None,
+        help="Where to write the results JSON (default: <cache dir>/benchmarks/latest.json)."
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Baseline JSON to compare against (default: <cache dir>/benchmarks/baseline.json)."
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the new baseline."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Relative change counted as a regression (default: {DEFAULT_THRESHOLD})."
+    )
+
+    return parser
+
+def register_subcommand(parent_parser):
+    """
+    Add 'bench' subcommand to the parent parser.
+    """
+    parser = _create_parser(parent_parser)
+
+    parser.set_defaults(func=run)
+
+def main():
+    """
+    Entry point for the script. Parses command-line arguments and calls `run`.
+    """
+    parser = _create_parser()
+
+    args = parser.parse_args()
+
+    sys.exit(run(args))
+
+if __name__ == "__main__":
+    ProjectConfig.initialize()
+
+    main()
@@ -0,0 +1,66 @@
+"""
+A stand-in executable for the automation benchmarks.
+
+In "output" mode it writes a configurable volume of text in a configurable
+encoding, in "clang-format" mode it mimics `clang-format -i` closely enough
+for `format_code`: it reads and rewrites each file and answers `--version`.
+"""
+import sys
+import argparse
+
+
+SAMPLE_TEXT = "[ 42%] Building CXX object src/CMakeFiles/engine.dir/构建输出.cpp.o -- "
+
+
+def write_output(size, line_length, encoding, stream):
+    """
+    Write `size` bytes of `line_length` character lines to `stream` ("stdout", "stderr" or "both").
+    """
+    text = (SAMPLE_TEXT * (line_length // len(SAMPLE_TEXT) + 1))[:max(line_length - 1, 0)] + "\n"
+    line = text.encode(encoding)
+
+    block = line * max(1, (1 << 16) // len(line))
+    targets = [sys.stdout.buffer, sys.stderr.buffer] if stream == "both" else [getattr(sys, stream).buffer]
+
+    remaining = size
+    while remaining > 0:
+        chunk = block if remaining >= len(block) else block[:remaining]
+        for target in targets:
+            target.write(chunk)
+        remaining -= len(chunk)
+
+    for target in targets:
+        target.flush()
+
+def clang_format(arguments):
+    if "--version" in arguments:
+        print("clang-format version 0.0.0 (automation benchmark stub)")
+        return 0
+
+    for file_path in (argument for argument in arguments if not argument.startswith("-")):
+        with open(file_path, "rb") as f:
+            content = f.read()
+        with open(file_path, "wb") as f:
+            f.write(content)
+
+    return 0
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "clang-format":
+        return clang_format(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(description="Benchmark stub that emits a configurable volume of output.")
+    parser.add_argument("--size", type=int, default=0, help="Bytes written to each selected stream.")
+    parser.add_argument("--line-length", type=int, default=120, help="Characters per line.")
+    parser.add_argument("--encoding", type=str, default="utf-8", help="Encoding of the output.")
+    parser.add_argument("--stream", choices=["stdout", "stderr", "both"], default="stdout")
+    parser.add_argument("--exit-code", type=int, default=0)
+
+    args = parser.parse_args()
+
+    write_output(args.size, args.line_length, args.encoding, args.stream)
+
+    return args.exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
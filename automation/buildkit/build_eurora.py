@@ -1,52 +1,201 @@
 
 import sys
+import json
 
 from automation.config.project_config import ProjectConfig
 from automation.utils.logger import Logger
 from automation.utils.file_utils import clean
-from automation.buildkit.conan_helper import run_conan_command
+from automation.utils.code_format import SOURCE_EXTENSIONS, format_code
+from automation.buildkit.conan_helper import (
+    run_conan_command,
+    get_conan_build_folder,
+    get_conan_generators_folder,
+    get_conan_profile_path
+)
 from automation.buildkit.builder_base import StepBase, BuilderBase
+from automation.buildkit.compiler_cache import CompilerCache
+from automation.buildkit.cmake_file_api import CodeModel, write_query
+from automation.buildkit.test_runner import TEST_EXECUTABLE, find_test_executable, list_tests, run_tests
+from automation.buildkit.test_impact import BUILD_OUTPUT_NAMES, affected_targets, changed_project_files, select_affected_tests
+from automation.buildkit.conan_cache import restore_artifacts, save_artifacts, get_artifact_path, configure_download_cache
 
 
 class StepClean(StepBase):
-    def run(self):
-        if not self.config.clean:
-            return
+    resources = ("build_dir",)
+    # Their outputs were deleted, their stamps must not skip them
+    invalidates = ("StepInstallDP", "StepBuild")
 
+    def enabled(self):
+        return self.config.clean
+
+    def run(self):
         Logger.Info("Builder: @@@ Cleaning @@@")
 
-        clean(ProjectConfig.BUILD_DIR)
+        # The build directory is renamed aside and deleted while the next steps run
+        clean(ProjectConfig.BUILD_DIR, background=True)
+
+
+class StepFormat(StepBase):
+    resources = ("sources",)
+
+    def enabled(self):
+        return self.config.format
+
+    def run(self):
+        Logger.Info("Builder: @@@ Formatting @@@")
+
+        for source_dir in ("src", "include", "tests"):
+            format_code(str(ProjectConfig.PROJECT_ROOT / source_dir), recursive=True, jobs=self.config.jobs)
 
 
 class StepInstallDP(StepBase):
+    depends_on = (StepClean,)
+    # Release and Debug installs share the conan cache and the Generators folder, they never run together
+    resources = ("conan_home",)
+
+    def __init__(self, build_type):
+        super().__init__(f"StepInstallDP[{build_type}]")
+        self.build_type = build_type
+
+    def enabled(self):
+        return self.config.install_dp
+
+    def inputs(self):
+        return [ProjectConfig.PROJECT_ROOT / "conanfile.py", get_conan_profile_path()]
+
+    def settings(self):
+        return {
+            "build_type": self.build_type,
+            "profile": ProjectConfig.CONAN_PROFILE,
+            "cppstd": ProjectConfig.COMPILER_CPPSTD,
+        }
+
+    def outputs(self):
+        return [get_conan_generators_folder() / "conan_toolchain.cmake"]
+
     def run(self):
-        if not self.config.install_dp:
-            return
+        Logger.Info(f"Builder: @@@ Installing dependencies ({self.build_type}) @@@")
+
+        if self.config.conan_cache:
+            # A fresh conan home restores the archived binaries instead of building them from source
+            configure_download_cache()
+            restore_artifacts(self.build_type)
 
-        Logger.Info("Builder: @@@ Installing dependencies @@@")
+        run_conan_command(f"conan install {ProjectConfig.PROJECT_ROOT} --build=missing -s build_type={self.build_type}")
 
-        run_conan_command(f"conan install {ProjectConfig.PROJECT_ROOT} --build=missing -s build_type=Release")
-        run_conan_command(f"conan install {ProjectConfig.PROJECT_ROOT} --build=missing -s build_type=Debug")
+        if self.config.conan_cache and not get_artifact_path(self.build_type).is_file():
+            save_artifacts(self.build_type)
 
 
 class StepBuild(StepBase):
+    depends_on = (StepClean, StepFormat, StepInstallDP)
+    resources = ("build_dir",)
+
+    def enabled(self):
+        return self.config.build
+
+    def inputs(self):
+        project_root = ProjectConfig.PROJECT_ROOT
+        return [
+            project_root / "CMakeLists.txt",
+            project_root / "conanfile.py",
+            project_root / "cmake",
+            project_root / "src",
+            project_root / "include",
+            project_root / "tests",
+            get_conan_profile_path(),
+        ]
+
+    def accepts_input(self, path):
+        # The in-source build writes Makefiles, cmake_install.cmake and archives next to the sources
+        if path.name in BUILD_OUTPUT_NAMES:
+            return False
+        return path.suffix in SOURCE_EXTENSIONS or path.name == "CMakeLists.txt" or path.suffix == ".cmake"
+
+    def settings(self):
+        return {
+            "build_type": "Debug" if self.config.debug else "Release",
+            "cppstd": ProjectConfig.COMPILER_CPPSTD,
+            "cmake_generator": ProjectConfig.CMAKE_GENERATOR,
+            "targets": self.config.targets,
+        }
+
+    def outputs(self):
+        return [get_conan_build_folder() / "CMakeCache.txt"]
+
     def run(self):
-        if not self.config.build:
+        Logger.Info("Builder: @@@ Building @@@")
+
+        # Have CMake describe its targets on configure, test impact analysis reads the reply
+        write_query(get_conan_build_folder())
+
+        build_type = "Debug" if self.config.debug else "Release"
+        command = f"conan build {ProjectConfig.PROJECT_ROOT} -s build_type={build_type}".split()
+
+        targets = self.select_targets(build_type)
+        if targets:
+            Logger.Info(f"Builder: building targets {', '.join(targets)}")
+            command += ["-c", f"user.aether:build_targets={json.dumps(targets)}"]
+
+        compiler_cache = None
+        if self.config.compiler_cache:
+            compiler_cache = CompilerCache.detect(self.config.compiler_cache)
+
+        if compiler_cache is None:
+            run_conan_command(command)
             return
 
-        Logger.Info("Builder: @@@ Building @@@")
+        compiler_cache.zero_statistics()
+        try:
+            run_conan_command(command + compiler_cache.conan_arguments(), env=compiler_cache.environment())
+        finally:
+            compiler_cache.report()
 
-        if self.config.debug:
-            run_conan_command(f"conan build {ProjectConfig.PROJECT_ROOT} -s build_type=Debug")
-        else:
-            run_conan_command(f"conan build {ProjectConfig.PROJECT_ROOT} -s build_type=Release")
+
+    def select_targets(self, build_type):
+        """
+        The CMake targets to build, None for all of them.
+
+        With `--targets auto` these are the targets owning a file changed in the
+        working tree and every target depending on them, reduced to the ones not
+        already built as a dependency of another. A clean working tree says nothing
+        about the binaries (after a pull, a checkout or --clean), so it builds all
+        targets and leaves skipping up-to-date ones to make.
+        """
+        if not self.config.targets:
+            return None
+        if self.config.targets != "auto":
+            return [target.strip() for target in self.config.targets.split(",") if target.strip()]
+
+        model = CodeModel.load(get_conan_build_folder(), build_type)
+        if model is None:
+            Logger.Info("Builder: no CMake file API reply yet, building all targets")
+            return None
+
+        try:
+            affected = affected_targets(changed_project_files("HEAD"), model)
+        except RuntimeError as e:
+            Logger.Warning(f"Builder: {e}, building all targets")
+            return None
+
+        if affected is None:
+            Logger.Info("Builder: building all targets")
+            return None
+        if not affected:
+            Logger.Info("Builder: no targets affected by the changes in the working tree, building all targets")
+            return None
+
+        return model.build_roots(affected)
 
 
 class StepPack(StepBase):
-    def run(self):
-        if not self.config.pack:
-            return
+    depends_on = (StepBuild,)
+    resources = ("build_dir",)
 
+    def enabled(self):
+        return self.config.pack
+
+    def run(self):
         Logger.Info("Builder: @@@ Packing @@@")
 
         if self.config.debug:
@@ -56,17 +205,44 @@ class StepPack(StepBase):
 
 
 class StepTest(StepBase):
+    depends_on = (StepBuild,)
+
+    def enabled(self):
+        return self.config.test
+
     def run(self):
-        if not self.config.test:
+        Logger.Info("Builder: @@@ Testing @@@")
+
+        build_type = "Debug" if self.config.debug else "Release"
+        executable = find_test_executable(build_type)
+        if executable is None:
+            # BUILD_TESTS is off by default, a build without tests has nothing to run
+            Logger.Warning(f"Builder: {TEST_EXECUTABLE} was not found in {get_conan_build_folder()}, "
+                           "configure with -DBUILD_TESTS=ON to build the tests, skipping")
             return
 
-        Logger.Info("Builder: @@@ Testing @@@")
+        tests = None
+        if self.config.affected_since:
+            tests = select_affected_tests(self.config.affected_since, list_tests(executable), TEST_EXECUTABLE, build_type)
+            if tests == []:
+                Logger.Info(f"Builder: no tests affected by changes since {self.config.affected_since}")
+                return
+
+        summary = run_tests(executable, jobs=self.config.jobs, tests=tests)
+        if summary["failed"]:
+            raise RuntimeError(f"{len(summary['failed'])} tests failed")
 
 
 class EuroraBuilder(BuilderBase):
+    def __init__(self):
+        super().__init__()
+        self.stamp_path = ProjectConfig.CACHE_DIR / "build_stamps.json"
+
     def setup_steps(self):
         self.steps.append(StepClean())
-        self.steps.append(StepInstallDP())
+        self.steps.append(StepFormat())
+        self.steps.append(StepInstallDP("Release"))
+        self.steps.append(StepInstallDP("Debug"))
         self.steps.append(StepBuild())
         self.steps.append(StepPack())
         self.steps.append(StepTest())
@@ -6,12 +6,34 @@ automation_package_location = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(automation_package_location))
 
 from automation.config.project_config import ProjectConfig
+from automation.utils.logger import Logger
+from automation.utils.tracing import Tracer
+from automation.utils.process_utils import MemoryBudget
 from automation.buildkit.build_eurora import EuroraBuilder
 
 
 def run(config):
-    eurora_builder = EuroraBuilder()
-    eurora_builder.setup_and_run(config)
+    if config.trace:
+        Tracer.enable()
+
+    if config.memory_aware:
+        MemoryBudget.enable()
+
+    try:
+        eurora_builder = EuroraBuilder()
+        eurora_builder.setup_and_run(config)
+    finally:
+        # The daemon runs many builds in one process, the next one starts from its own options
+        if config.memory_aware:
+            MemoryBudget.enable(False)
+
+        if config.trace:
+            try:
+                Tracer.write(config.trace)
+                Logger.Info(f"Trace written to: {config.trace}")
+                Logger.Info(Tracer.summary())
+            finally:
+                Tracer.disable()
 
 def _create_parser(parent_parser = None):
     description = "Eurora."
@@ -38,6 +60,14 @@ def _create_parser(parent_parser = None):
         action = 'store_true'
     )
 
+    workflow.add_argument(
+        "--format",
+        dest = 'format',
+        help = f'Format {ProjectConfig.PROJECT_NAME} sources with clang-format',
+        default = False,
+        action = 'store_true'
+    )
+
     workflow.add_argument(
         "--build",
         dest = 'build',
@@ -80,6 +110,73 @@ def _create_parser(parent_parser = None):
         action = 'store_true'
     )
 
+    flags.add_argument(
+        "--force",
+        dest = 'force',
+        help = "Run every enabled step, even when its inputs are unchanged since the last run",
+        default = False,
+        action = 'store_true'
+    )
+
+    flags.add_argument(
+        "-j", "--jobs",
+        dest = 'jobs',
+        help = "Maximum number of steps and tool processes running in parallel (default: CPU count)",
+        type = int,
+        default = None
+    )
+
+    flags.add_argument(
+        "--compiler-cache",
+        dest = 'compiler_cache',
+        help = "Compile through ccache or sccache (default: auto, the first one found), cached under the project cache directory",
+        nargs = '?',
+        const = 'auto',
+        choices = ['auto', 'ccache', 'sccache'],
+        default = None
+    )
+
+    flags.add_argument(
+        "--conan-cache",
+        dest = 'conan_cache',
+        help = "Restore dependency binaries from the local artifact store before installing, and save them after a build from source",
+        default = False,
+        action = 'store_true'
+    )
+
+    flags.add_argument(
+        "--targets",
+        dest = 'targets',
+        help = "With --build, only build these comma separated CMake targets, or 'auto' for the targets affected by the changes in the working tree and their dependents, all targets when nothing is affected",
+        metavar = "TARGETS",
+        default = None
+    )
+
+    flags.add_argument(
+        "--affected-since",
+        dest = 'affected_since',
+        help = "With --test, only run the tests affected by the files changed since this git revision, e.g. origin/main",
+        metavar = "REF",
+        default = None
+    )
+
+    flags.add_argument(
+        "--memory-aware",
+        dest = 'memory_aware',
+        help = "Hold back parallel commands whose recent peak memory use would exceed the available memory",
+        default = False,
+        action = 'store_true'
+    )
+
+    flags.add_argument(
+        "--trace",
+        dest = 'trace',
+        help = "Write a Chrome trace / Perfetto JSON timeline of steps and commands to this file",
+        metavar = "FILE",
+        type = Path,
+        default = None
+    )
+
     return parser
 
 def register_subcommand(parent_parse):
@@ -1,17 +1,181 @@
+import os
+import json
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from automation.utils.logger import Logger
+from automation.utils.shell_utils import terminate_running_commands
+from automation.utils.cache_utils import JsonStore, file_fingerprint, hash_bytes
+from automation.utils.tracing import Tracer
+from automation.utils.jobserver import serve_jobserver
+
+
 class StepBase:
+    # Steps that must finish before this one starts, given as step classes or step names
+    depends_on = ()
 
-    def __init__(self):
+    # Resources used exclusively, steps sharing a resource never run at the same time
+    resources = ()
+
+    # Steps whose stamps this one makes stale when it runs, given as step classes or step names
+    invalidates = ()
+
+    def __init__(self, name=None):
         self.config = None
+        self.name = name or type(self).__name__
 
     def setup(self, config):
         self.config = config
 
+    def enabled(self):
+        """
+        Whether the step takes part in this run, e.g. because its workflow flag was given.
+        """
+        return True
+
+    def inputs(self):
+        """
+        Files, or directories scanned recursively, whose content the step's result depends on.
+        """
+        return []
+
+    def accepts_input(self, path):
+        """
+        Whether a file found below an input directory is part of the inputs, e.g. not a build product.
+        """
+        return True
+
+    def settings(self):
+        """
+        JSON serializable settings (configuration values, CLI flags) the step's result depends on.
+        """
+        return {}
+
+    def outputs(self):
+        """
+        Paths the step produces, the step is never skipped while one of them is missing.
+        """
+        return []
+
+    def is_incremental(self):
+        """
+        Whether the step declares enough to be skipped when its fingerprint is unchanged.
+        """
+        return bool(self.inputs() or self.outputs())
+
     def run(self):
         pass
 
     def setup_and_run(self, config):
         self.setup(config)
-        self.run()
+        if self.enabled():
+            self.run()
+
+
+class StampDatabase:
+    """
+    Fingerprints of the last successful run of each step.
+
+    A fingerprint hashes the step's settings, the content of its inputs and the
+    fingerprints of the steps it depends on. Input digests are cached by size
+    and mtime so unchanged files are not read again.
+    """
+
+    def __init__(self, path):
+        self.store = JsonStore(path)
+        data = self.store.load()
+
+        self.stamps = data.get("steps", {})
+        self.files = data.get("files", {})
+        self.current = {}
+        self.lock = threading.Lock()
+
+    def fingerprint(self, step, dependencies):
+        digests = []
+        for path in _expand_inputs(step.inputs(), step.accepts_input):
+            key = str(path)
+            try:
+                entry = file_fingerprint(path, self.files.get(key))
+            except OSError:
+                entry = {"digest": None}
+
+            with self.lock:
+                self.files[key] = entry
+            digests.append((key, entry["digest"]))
+
+        with self.lock:
+            dependency_stamps = sorted(self.current.get(dep.name, self.stamps.get(dep.name)) or "" for dep in dependencies)
+
+        payload = {
+            "step": step.name,
+            "settings": step.settings(),
+            "inputs": digests,
+            "dependencies": dependency_stamps,
+        }
+        return hash_bytes(json.dumps(payload, sort_keys=True, default=str).encode("utf-8"))
+
+    def is_up_to_date(self, step, fingerprint):
+        if self.stamps.get(step.name) != fingerprint:
+            return False
+
+        return all(Path(output).exists() for output in step.outputs())
+
+    def record(self, step, fingerprint, ran):
+        """
+        Remember the fingerprint used for `step` in this run, persisting it when the step actually ran.
+        """
+        with self.lock:
+            self.current[step.name] = fingerprint
+            if not ran:
+                return
+
+            self.stamps[step.name] = fingerprint
+            files = dict(self.files)
+
+        def merge(data):
+            data.setdefault("steps", {})[step.name] = fingerprint
+            data.setdefault("files", {}).update(files)
+
+        with self.lock:
+            self.store.update(merge)
+
+    def forget(self, names):
+        """
+        Drop the stamps of the steps called `names`, they run again next time.
+        """
+        with self.lock:
+            for name in names:
+                self.stamps.pop(name, None)
+                self.current.pop(name, None)
+
+        def merge(data):
+            for name in names:
+                data.get("steps", {}).pop(name, None)
+
+        with self.lock:
+            self.store.update(merge)
+
+
+def _expand_inputs(inputs, accept=None):
+    """
+    Expand input directories into the sorted list of files below them.
+
+    Hidden directories and CMakeFiles directories, which in-source CMake builds
+    create next to the sources, are not part of a step's inputs, nor are files
+    below input directories that `accept` rejects.
+    """
+    files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for root, dirs, names in os.walk(path):
+                dirs[:] = [d for d in dirs if not d.startswith(".") and d != "CMakeFiles"]
+                files.extend(Path(root) / name for name in names if accept is None or accept(Path(root) / name))
+        else:
+            files.append(path)
+
+    return sorted(set(files))
 
 
 class BuilderBase:
@@ -22,6 +186,11 @@ class BuilderBase:
         self.parser = None
         self.steps = []
 
+        # Stamp database location, enables skipping up-to-date steps when set by a subclass
+        self.stamp_path = None
+        self.stamps = None
+        self.dependencies = {}
+
         self.setup_argument_parser()
         self.setup_steps()
 
@@ -40,8 +209,130 @@ class BuilderBase:
         self.setup_sependencies()
 
     def run(self):
-        for step in self.steps:
-            step.setup_and_run(self.config)
+        """
+        Run the steps as a dependency graph on a pool of `--jobs` workers.
+
+        A step starts once its dependencies finished and none of its resources is
+        in use, ties are broken by the order of `self.steps`. The first failure
+        stops scheduling, terminates running commands and is re-raised.
+
+        The commands of all steps, and the makes and tool pools they start, take
+        tokens from one jobserver so that at most `--jobs` processes run at once.
+        """
+        jobs = getattr(self.config, "jobs", None) or os.cpu_count() or 1
+        dependencies = self.dependencies = self._resolve_dependencies()
+
+        if self.stamp_path is not None:
+            self.stamps = StampDatabase(self.stamp_path)
+
+        pending = list(self.steps)
+        finished = set()
+        running = {}
+        busy_resources = set()
+        failure = None
+
+        with serve_jobserver(jobs), ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="step") as executor:
+            while pending or running:
+                if failure is None:
+                    for step in list(pending):
+                        if len(running) >= jobs:
+                            break
+                        if not dependencies[step] <= finished or busy_resources.intersection(step.resources):
+                            continue
+
+                        pending.remove(step)
+                        busy_resources.update(step.resources)
+                        running[executor.submit(self.run_step, step)] = step
+
+                if not running:
+                    if failure is None:
+                        raise RuntimeError(f"Builder: cannot schedule {[step.name for step in pending]}, check for dependency cycles")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    busy_resources.difference_update(step.resources)
+
+                    try:
+                        future.result()
+                        finished.add(step)
+                    except Exception as e:
+                        Logger.Error(f"Builder: step {step.name} failed: {e}")
+                        if failure is None:
+                            failure = e
+                            self.cancel()
+
+        if failure is not None:
+            if pending:
+                Logger.Error(f"Builder: skipped {[step.name for step in pending]}")
+            raise failure
+
+    def run_step(self, step):
+        """
+        Run one step, skipping it when its fingerprint matches the last successful run.
+        """
+        step.setup(self.config)
+
+        if not step.enabled():
+            return
+
+        with Tracer.span(step.name, "step") as trace_args:
+            if self.stamps is None or not step.is_incremental():
+                step.run()
+                self._invalidate(step)
+                return
+
+            fingerprint = self.stamps.fingerprint(step, self.dependencies.get(step, ()))
+
+            if not getattr(self.config, "force", False) and self.stamps.is_up_to_date(step, fingerprint):
+                Logger.Info(f"Builder: {step.name} is up to date, skipping")
+                trace_args["skipped"] = True
+                self.stamps.record(step, fingerprint, ran=False)
+                return
+
+            step.run()
+            self.stamps.record(step, fingerprint, ran=True)
+            self._invalidate(step)
+
+    def cancel(self):
+        """
+        Fail fast: terminate the commands of the steps that are still running.
+        """
+        terminate_running_commands()
+
+    def _invalidate(self, step):
+        if self.stamps is None or not step.invalidates:
+            return
+
+        stale = [other.name for other in self._find_steps(step, step.invalidates)]
+        if stale:
+            Logger.Info(f"Builder: {step.name} invalidated {stale}")
+            self.stamps.forget(stale)
+
+    def _resolve_dependencies(self):
+        """
+        Map each step to the set of steps it waits for.
+        """
+        return {step: self._find_steps(step, step.depends_on) for step in self.steps}
+
+    def _find_steps(self, step, references):
+        """
+        The other steps matching `references`, given as step classes or step names.
+        """
+        found = set()
+        for reference in references:
+            for other in self.steps:
+                if other is step:
+                    continue
+                if isinstance(reference, type):
+                    matches = isinstance(other, reference)
+                else:
+                    matches = reference in (other.name, type(other).__name__)
+                if matches:
+                    found.add(other)
+
+        return found
 
     def setup_and_run(self, arguments):
         self.setup(arguments)
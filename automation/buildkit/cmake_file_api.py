@@ -0,0 +1,208 @@
+import json
+from pathlib import Path
+
+from automation.utils.logger import Logger
+from automation.utils.cache_utils import atomic_write_text
+
+
+CLIENT_NAME = "aether"
+
+# codemodel maps targets to their sources and dependencies, cmakeFiles lists the files the configure step read
+QUERY = {
+    "requests": [
+        {"kind": "codemodel", "version": 2},
+        {"kind": "cmakeFiles", "version": 1},
+    ]
+}
+
+
+def get_api_dir(build_dir):
+    return Path(build_dir) / ".cmake" / "api" / "v1"
+
+def write_query(build_dir):
+    """
+    Ask CMake to write codemodel and cmakeFiles replies into `build_dir` on its next configure.
+    """
+    query_path = get_api_dir(build_dir) / "query" / f"client-{CLIENT_NAME}" / "query.json"
+    text = json.dumps(QUERY, indent=2)
+
+    if not query_path.is_file() or query_path.read_text(encoding="utf-8") != text:
+        atomic_write_text(query_path, text)
+
+    return query_path
+
+
+class Target:
+    """
+    One CMake target of the codemodel reply.
+    """
+
+    def __init__(self, name, type, source_dir, sources, include_dirs, dependencies):
+        self.name = name
+        self.type = type
+        self.source_dir = source_dir
+        self.sources = sources
+        self.include_dirs = include_dirs
+        # Names of the targets this one links to or otherwise depends on
+        self.dependencies = dependencies
+
+    def __repr__(self):
+        return f"Target({self.name!r}, {self.type!r})"
+
+
+class CodeModel:
+    """
+    The targets of a configured build directory, read from the CMake file API reply.
+    """
+
+    def __init__(self, source_dir, build_dir, targets, cmake_inputs):
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        self.targets = targets
+        # CMakeLists.txt and included .cmake files of the project, changing one reconfigures the build
+        self.cmake_inputs = cmake_inputs
+
+        self._owners = {}
+        for target in targets.values():
+            for source in target.sources:
+                self._owners.setdefault(source, set()).add(target.name)
+
+    @classmethod
+    def load(cls, build_dir, configuration=None):
+        """
+        Read the latest reply in `build_dir`.
+
+        Args:
+            build_dir (str or Path): The CMake build directory.
+            configuration (str or None): The configuration of multi-config generators, e.g. "Debug", defaults to the first one.
+
+        Returns:
+            CodeModel: The targets, or None if CMake has not written a reply for our query yet.
+        """
+        reply_dir = get_api_dir(build_dir) / "reply"
+        indexes = sorted(reply_dir.glob("index-*.json"))
+        if not indexes:
+            return None
+
+        # CMake names index files so that the newest one sorts last
+        index = _read_json(indexes[-1])
+        responses = index.get("reply", {}).get(f"client-{CLIENT_NAME}", {}).get("query.json", {}).get("responses", [])
+        replies = {response["kind"]: response["jsonFile"] for response in responses if "jsonFile" in response}
+
+        if "codemodel" not in replies:
+            Logger.Warning(f"CMake file API: no codemodel reply in {reply_dir}")
+            return None
+
+        codemodel = _read_json(reply_dir / replies["codemodel"])
+        source_dir = Path(codemodel["paths"]["source"])
+        configurations = codemodel.get("configurations", [])
+        if not configurations:
+            return None
+
+        selected = next((item for item in configurations if item.get("name") == configuration), configurations[0])
+
+        target_replies = [_read_json(reply_dir / target["jsonFile"]) for target in selected.get("targets", [])]
+        names = {target["id"]: target["name"] for target in target_replies}
+
+        targets = {}
+        for target in target_replies:
+            includes = [
+                _resolve(source_dir, include["path"])
+                for group in target.get("compileGroups", [])
+                for include in group.get("includes", [])
+                if not include.get("isSystem")
+            ]
+            targets[target["name"]] = Target(
+                name=target["name"],
+                type=target["type"],
+                source_dir=_resolve(source_dir, target.get("paths", {}).get("source", ".")),
+                sources=[_resolve(source_dir, source["path"]) for source in target.get("sources", []) if not source.get("isGenerated")],
+                include_dirs=sorted(set(includes)),
+                dependencies={names[dependency["id"]] for dependency in target.get("dependencies", []) if dependency["id"] in names},
+            )
+
+        cmake_inputs = set()
+        if "cmakeFiles" in replies:
+            cmake_files = _read_json(reply_dir / replies["cmakeFiles"])
+            cmake_inputs = {
+                _resolve(source_dir, item["path"])
+                for item in cmake_files.get("inputs", [])
+                if not item.get("isExternal") and not item.get("isGenerated") and not item.get("isCMake")
+                and "CMakeFiles" not in Path(item["path"]).parts
+            }
+
+        return cls(source_dir, Path(codemodel["paths"]["build"]), targets, cmake_inputs)
+
+    def owners(self, path):
+        """
+        Names of the targets a file belongs to.
+
+        Files listed as target sources belong to those targets. Headers that are
+        not listed belong to every target that has their directory, or one of its
+        parents, on its include path.
+        """
+        path = Path(path).resolve()
+        if path in self._owners:
+            return set(self._owners[path])
+
+        return {
+            target.name
+            for target in self.targets.values()
+            if any(path.is_relative_to(include_dir) for include_dir in target.include_dirs)
+        }
+
+    def dependents(self, names):
+        """
+        `names` and every target that depends on one of them, directly or transitively.
+        """
+        reverse = {}
+        for target in self.targets.values():
+            for dependency in target.dependencies:
+                reverse.setdefault(dependency, set()).add(target.name)
+
+        affected = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name in affected:
+                continue
+            affected.add(name)
+            pending.extend(reverse.get(name, ()))
+
+        return affected
+
+    def dependencies_of(self, name):
+        """
+        The targets `name` depends on, directly or transitively.
+        """
+        dependencies = set()
+        pending = [name]
+        while pending:
+            for dependency in self.targets[pending.pop()].dependencies:
+                if dependency not in dependencies and dependency in self.targets:
+                    dependencies.add(dependency)
+                    pending.append(dependency)
+
+        return dependencies
+
+    def build_roots(self, names):
+        """
+        The smallest subset of `names` whose build also builds all of `names`, their dependencies come along.
+        """
+        covered = set()
+        for name in names:
+            covered.update(self.dependencies_of(name))
+
+        return sorted(set(names) - covered)
+
+    def is_cmake_input(self, path):
+        return Path(path).resolve() in self.cmake_inputs
+
+
+def _resolve(source_dir, path):
+    # Reply paths below the top-level source directory are relative to it
+    return (source_dir / path).resolve()
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,148 @@
+import os
+import json
+import shutil
+from pathlib import Path
+
+from automation.config.project_config import ProjectConfig
+from automation.utils.logger import Logger
+from automation.utils.shell_utils import run_command
+from automation.environment.venv_helper import get_executable_path
+
+
+COMPILER_CACHE_TOOLS = ("ccache", "sccache")
+
+# Conan configuration read by conanfile.py's generate() to set CMAKE_<LANG>_COMPILER_LAUNCHER
+COMPILER_LAUNCHER_CONF = "user.aether:compiler_launcher"
+
+
+class CompilerCache:
+    """
+    A ccache or sccache installation used as compiler launcher, with its cache kept under ProjectConfig.CACHE_DIR.
+    """
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = Path(path)
+        self.cache_dir = Path(ProjectConfig.CACHE_DIR) / name
+
+    @classmethod
+    def detect(cls, preferred="auto"):
+        """
+        Find a compiler cache in the virtual environment or on PATH.
+
+        Args:
+            preferred (str): "ccache", "sccache", or "auto" to take the first one found.
+
+        Returns:
+            CompilerCache: The detected compiler cache, or None if it is not installed.
+        """
+        names = COMPILER_CACHE_TOOLS if preferred == "auto" else (preferred,)
+
+        for name in names:
+            # Neither tool is a Python package, a venv copy takes precedence over the system one
+            path = _find_in_venv(name) or shutil.which(name)
+            if path is not None:
+                return cls(name, path)
+
+        Logger.Warning(f"Compiler cache: {' or '.join(names)} not found, building without a compiler cache")
+        return None
+
+    def environment(self):
+        """
+        Environment variables that point the cache at the project cache directory.
+        """
+        if self.name == "ccache":
+            return {
+                "CCACHE_DIR": str(self.cache_dir),
+                # Hash paths relative to the project root so that clones of the project share hits
+                "CCACHE_BASEDIR": str(ProjectConfig.PROJECT_ROOT),
+                "CCACHE_NOHASHDIR": "1",
+            }
+
+        return {"SCCACHE_DIR": str(self.cache_dir)}
+
+    def conan_arguments(self):
+        return ["-c", f"{COMPILER_LAUNCHER_CONF}={self.path.as_posix()}"]
+
+    def zero_statistics(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._run(["--zero-stats"])
+
+    def statistics(self):
+        """
+        Read the hit and miss counters since the last `zero_statistics` call.
+
+        Returns:
+            dict: {"hits": int, "misses": int, "size": int or None}, or None if the tool did not report them.
+        """
+        if self.name == "ccache":
+            success, stdout = self._run(["--print-stats"])
+            if not success:
+                return None
+
+            counters = {}
+            for line in stdout.splitlines():
+                key, _, value = line.partition("\t")
+                if value.strip().isdigit():
+                    counters[key] = int(value)
+
+            size = counters.get("cache_size_kibibyte")
+            return {
+                "hits": counters.get("direct_cache_hit", 0) + counters.get("preprocessed_cache_hit", 0),
+                "misses": counters.get("cache_miss", 0),
+                "size": size * 1024 if size is not None else _directory_size(self.cache_dir),
+            }
+
+        success, stdout = self._run(["--show-stats", "--stats-format=json"])
+        if not success:
+            return None
+
+        try:
+            data = json.loads(stdout)
+        except ValueError:
+            return None
+
+        stats = data.get("stats", {})
+        return {
+            "hits": sum(stats.get("cache_hits", {}).get("counts", {}).values()),
+            "misses": sum(stats.get("cache_misses", {}).get("counts", {}).values()),
+            "size": data.get("cache_size") or _directory_size(self.cache_dir),
+        }
+
+    def report(self):
+        statistics = self.statistics()
+        if statistics is None:
+            Logger.Warning(f"Compiler cache: {self.name} did not report statistics")
+            return
+
+        hits, misses = statistics["hits"], statistics["misses"]
+        total = hits + misses
+        hit_rate = 100.0 * hits / total if total else 0.0
+        size = statistics["size"] or 0
+
+        Logger.Info(f"Compiler cache: {self.name} {hits} hits, {misses} misses ({hit_rate:.1f}% hit rate), "
+                    f"cache size {size / (1024 * 1024):.1f} MiB at {self.cache_dir}")
+
+    def _run(self, arguments):
+        success, stdout, _ = run_command([str(self.path), *arguments], env=self.environment(), log_stdout=lambda _: None)
+        return success, stdout
+
+
+def _directory_size(path):
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+
+    return total
+
+
+def _find_in_venv(name):
+    try:
+        return get_executable_path(name, quiet=True)
+    except OSError:
+        # pipenv itself is not installed
+        return None
@@ -0,0 +1,255 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+automation_package_location = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(automation_package_location))
+
+from automation.config.project_config import ProjectConfig
+from automation.utils.logger import Logger
+from automation.utils.shell_utils import run_command
+from automation.utils.cache_utils import FileLock, atomic_write_text, hash_bytes, hash_file
+from automation.buildkit.conan_helper import make_conan_command, get_conan_profile_path
+
+
+BUILD_TYPES = ("Release", "Debug")
+
+# Archives kept per build type, older ones are pruned on save
+DEFAULT_KEEP = 3
+
+DOWNLOAD_CACHE_CONF = "core.download:download_cache"
+
+# Graphs of large dependency trees run to tens of MiB, the JSON must be read whole
+CONAN_JSON_OUTPUT_LIMIT = 512 * 1024 * 1024
+
+
+def get_artifact_store():
+    return Path(ProjectConfig.CACHE_DIR) / "conan_artifacts"
+
+def get_download_cache():
+    return Path(ProjectConfig.CACHE_DIR) / "conan_downloads"
+
+def artifact_key(build_type):
+    """
+    Identify the binaries an install produces: profile, lockfile, conanfile and build type.
+    """
+    project_root = ProjectConfig.PROJECT_ROOT
+    inputs = {"build_type": build_type}
+    for name, path in (("profile", get_conan_profile_path()),
+                       ("lockfile", project_root / "conan.lock"),
+                       ("conanfile", project_root / "conanfile.py")):
+        inputs[name] = hash_file(path) if path.is_file() else None
+
+    return hash_bytes(json.dumps(inputs, sort_keys=True).encode("utf-8"))[:16]
+
+def get_artifact_path(build_type, store=None):
+    return Path(store or get_artifact_store()) / f"{build_type}-{artifact_key(build_type)}.tgz"
+
+def save_artifacts(build_type, store=None, keep=DEFAULT_KEEP):
+    """
+    Export the binaries of the project's dependencies for `build_type` from the conan cache into the artifact store.
+
+    Returns:
+        Path: The archive, or None if the dependencies could not be listed or saved.
+    """
+    archive = get_artifact_path(build_type, store)
+    archive.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(prefix="conan-cache-") as temp_dir:
+        graph_path = Path(temp_dir) / "graph.json"
+        package_list_path = Path(temp_dir) / "pkglist.json"
+
+        graph = _run_conan_json(["conan", "graph", "info", str(ProjectConfig.PROJECT_ROOT), "-s", f"build_type={build_type}", "--format=json"])
+        if graph is None:
+            return None
+        graph_path.write_text(graph, encoding="utf-8")
+
+        package_list = _run_conan_json(["conan", "list", f"--graph={graph_path}", "--graph-binaries=cache", "--format=json"])
+        if package_list is None:
+            return None
+        package_list_path.write_text(package_list, encoding="utf-8")
+
+        temp_archive = archive.with_name(f".{archive.name}.{os.getpid()}.tmp")
+        success, _, _ = run_command(make_conan_command(["conan", "cache", "save", f"--list={package_list_path}", f"--file={temp_archive}"]))
+        if not success:
+            Logger.Error(f"Conan cache: failed to save {build_type} binaries")
+            temp_archive.unlink(missing_ok=True)
+            return None
+
+        os.replace(temp_archive, archive)
+
+    atomic_write_text(archive.with_suffix(".json"), json.dumps({
+        "build_type": build_type,
+        "key": artifact_key(build_type),
+        "profile": ProjectConfig.CONAN_PROFILE,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "size": archive.stat().st_size,
+    }, indent=2))
+
+    Logger.Info(f"Conan cache: saved {build_type} binaries to {archive} ({archive.stat().st_size / (1024 * 1024):.1f} MiB)")
+    _prune_artifacts(archive.parent, build_type, keep)
+
+    return archive
+
+def restore_artifacts(build_type, store=None):
+    """
+    Restore the archived binaries for `build_type` into the current conan home.
+
+    Returns:
+        bool: Whether a matching archive was found and restored.
+    """
+    archive = get_artifact_path(build_type, store)
+    if not archive.is_file():
+        Logger.Info(f"Conan cache: no {build_type} artifacts for the current profile and lockfile ({archive.name})")
+        return False
+
+    success, _, _ = run_command(make_conan_command(["conan", "cache", "restore", str(archive)]), check=False)
+    if not success:
+        Logger.Error(f"Conan cache: failed to restore {archive}")
+        return False
+
+    Logger.Info(f"Conan cache: restored {build_type} binaries from {archive}")
+    return True
+
+def configure_download_cache(download_cache=None):
+    """
+    Point the conan home at a download cache shared by every conan home of the project.
+    """
+    download_cache = Path(download_cache or get_download_cache()).resolve()
+    download_cache.mkdir(parents=True, exist_ok=True)
+
+    global_conf = Path(ProjectConfig.CONAN_USER_HOME) / "global.conf"
+    with FileLock(global_conf.with_name("global.conf.lock")):
+        lines = global_conf.read_text(encoding="utf-8").splitlines() if global_conf.is_file() else []
+        lines = [line for line in lines if not line.strip().startswith(f"{DOWNLOAD_CACHE_CONF}=")]
+        lines.append(f"{DOWNLOAD_CACHE_CONF}={download_cache.as_posix()}")
+        atomic_write_text(global_conf, "\n".join(lines) + "\n")
+
+    Logger.Info(f"Conan cache: download cache set to {download_cache}")
+    return download_cache
+
+def _run_conan_json(command_args):
+    success, stdout, _ = run_command(make_conan_command(command_args), check=False, log_stdout=lambda _: None,
+                                     output_limit=CONAN_JSON_OUTPUT_LIMIT)
+    if not success:
+        Logger.Error(f"Conan cache: `{' '.join(command_args)}` failed")
+        return None
+
+    # Output beyond the limit is cut to its head and tail, which no longer parses
+    try:
+        json.loads(stdout)
+    except ValueError as e:
+        Logger.Error(f"Conan cache: `{' '.join(command_args)}` did not print valid JSON ({len(stdout)} characters): {e}")
+        return None
+    return stdout
+
+def _prune_artifacts(store, build_type, keep):
+    archives = sorted(store.glob(f"{build_type}-*.tgz"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for archive in archives[keep:]:
+        Logger.Info(f"Conan cache: pruning {archive.name}")
+        archive.unlink(missing_ok=True)
+        archive.with_suffix(".json").unlink(missing_ok=True)
+
+def _selected_build_types(args):
+    return [args.build_type] if args.build_type else list(BUILD_TYPES)
+
+def _save(args):
+    archives = [save_artifacts(build_type, args.store, args.keep) for build_type in _selected_build_types(args)]
+    return 0 if all(archives) else 1
+
+def _restore(args):
+    if not args.no_download_cache:
+        configure_download_cache(args.download_cache)
+
+    restored = [restore_artifacts(build_type, args.store) for build_type in _selected_build_types(args)]
+    return 0 if all(restored) else 1
+
+def _download_cache(args):
+    configure_download_cache(args.path)
+    return 0
+
+def _create_parser(parent_parser=None):
+    description = "Saves and restores the binaries of the conan dependencies in a local artifact store."
+    if parent_parser is None:
+        parser = argparse.ArgumentParser(description=description)
+    else:
+        parser = parent_parser.add_parser("conan-cache", description=description, help=description)
+
+    actions = parser.add_subparsers(title="Actions", dest="action", required=True)
+
+    for name, func, help in (("save", _save, "Export the dependency binaries of the current profile and lockfile."),
+                             ("restore", _restore, "Restore the matching dependency binaries into the conan home.")):
+        action = actions.add_parser(name, description=help, help=help)
+        action.add_argument(
+            "-s", "--build-type",
+            choices=BUILD_TYPES,
+            default=None,
+            help="Only this build type (default: Release and Debug)."
+        )
+        action.add_argument(
+            "--store",
+            type=Path,
+            default=None,
+            help="The artifact store directory (default: <cache dir>/conan_artifacts)."
+        )
+        action.set_defaults(conan_cache_func=func)
+
+        if name == "save":
+            action.add_argument(
+                "--keep",
+                type=int,
+                default=DEFAULT_KEEP,
+                help=f"Archives kept per build type (default: {DEFAULT_KEEP})."
+            )
+        else:
+            action.add_argument(
+                "--download-cache",
+                type=Path,
+                default=None,
+                help="Shared download cache to configure (default: <cache dir>/conan_downloads)."
+            )
+            action.add_argument(
+                "--no-download-cache",
+                action="store_true",
+                help="Leave the conan home's download cache setting alone."
+            )
+
+    download_cache_help = "Configure a download cache shared by every conan home of the project."
+    download_cache = actions.add_parser("download-cache", description=download_cache_help, help=download_cache_help)
+    download_cache.add_argument(
+        "path",
+        type=Path,
+        nargs="?",
+        default=None,
+        help="The download cache directory (default: <cache dir>/conan_downloads)."
+    )
+    download_cache.set_defaults(conan_cache_func=_download_cache)
+
+    return parser
+
+def register_subcommand(parent_parser):
+    """
+    Add 'conan-cache' subcommand to the parent parser.
+    """
+    parser = _create_parser(parent_parser)
+
+    parser.set_defaults(func=lambda args: args.conan_cache_func(args))
+
+def main():
+    """
+    Entry point for the script. Parses command-line arguments and runs the selected action.
+    """
+    parser = _create_parser()
+
+    args = parser.parse_args()
+
+    sys.exit(args.conan_cache_func(args))
+
+if __name__ == "__main__":
+    ProjectConfig.initialize()
+
+    main()
@@ -4,22 +4,47 @@ from pathlib import Path
 
 from automation.config.project_config import ProjectConfig
 from automation.utils.logger import Logger
-from automation.utils.shell_utils import run_command
+from automation.utils.shell_utils import run_command, ShellCommand
 from automation.utils.file_utils import clean
 from automation.utils.platform_utils import Platform
+from automation.utils.jobserver import get_jobserver
 from automation.environment.venv_helper import get_pipenv_venv, run_pipenv_python_command, get_executable_path
 
 
-def run_conan_command(command_args, *, check=True):
+# Conan subcommands that build packages or the project with make
+JOBSERVER_SUBCOMMANDS = ("install", "build", "create")
+
+
+def get_conan_build_folder():
     """
-    Run a Conan command with the configured CONAN_USER_HOME environment variable.
+    The folder `conan build` configures CMake in.
+
+    conanfile.py's layout() only relocates the generators, so conan builds next to the conanfile.
+    """
+    return ProjectConfig.PROJECT_ROOT
+
+def get_conan_generators_folder():
+    return get_conan_build_folder() / "Generators"
+
+def get_conan_profile_path():
+    return Path(ProjectConfig.CONAN_USER_HOME) / "profiles" / ProjectConfig.CONAN_PROFILE
+
+def make_conan_command(command_args, *, env=None):
+    """
+    Build a Conan command with the configured CONAN_USER_HOME environment variable.
+
+    The result can be passed to `run_command`, or batched with other commands through `run_commands`.
 
     Args:
-        command_args (list): List of arguments for the Conan command.
+        command_args (str or list): Arguments for the Conan command.
+        env (dict or None): Extra environment variables for the command.
+
+    Returns:
+        ShellCommand: The command ready to run.
     """
     # Set Conan user home directory from ProjectConfig
-    env = os.environ.copy()
-    env["CONAN_HOME"] = str(ProjectConfig.CONAN_USER_HOME)
+    conan_env = dict(env or {})
+    conan_env["CONAN_HOME"] = str(ProjectConfig.CONAN_USER_HOME)
     Logger.Info(f"Conan user home set to: {ProjectConfig.CONAN_USER_HOME}")
 
     if isinstance(command_args, str):
@@ -40,7 +65,22 @@ def run_conan_command(command_args, *, check=True):
     else:
         command_parts.insert(0, str(conan_path))
 
-    return run_command(command_parts, env=env, check=check)
+    # Conan passes -jN to make unless told otherwise, which makes it leave the jobserver
+    jobserver = get_jobserver()
+    if jobserver is not None and jobserver.environment() and len(command_parts) > 1 and command_parts[1] in JOBSERVER_SUBCOMMANDS:
+        command_parts += ["-c", "tools.build:jobs=0"]
+
+    return ShellCommand(command_parts, env=conan_env)
+
+def run_conan_command(command_args, *, check=True, env=None):
+    """
+    Run a Conan command with the configured CONAN_USER_HOME environment variable.
+
+    Args:
+        command_args (list): List of arguments for the Conan command.
+        env (dict or None): Extra environment variables for the command.
+    """
+    return run_command(make_conan_command(command_args, env=env), check=check)
 
 def update_conan_profile(profile_path, section, key, value):
     """
@@ -188,7 +228,7 @@ def initialize_conan_user_home(conan_user_home, profile_name, cppstd=17, shared=
     if Path(conan_user_home).exists():
         user_input = input("Do you want to delete the existing conan cache? (y/n): ").strip().lower()
         if user_input == "y":
-            clean(conan_user_home)
+            clean(conan_user_home, background=True)
         else:
             Logger.Info("Using the existing conan cache.")
 
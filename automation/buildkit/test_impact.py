@@ -0,0 +1,167 @@
+import re
+from pathlib import Path
+
+from automation.config.project_config import ProjectConfig
+from automation.utils.logger import Logger
+from automation.utils.git_utils import changed_files
+from automation.utils.code_format import SOURCE_EXTENSIONS
+from automation.buildkit.cmake_file_api import CodeModel
+from automation.buildkit.conan_helper import get_conan_build_folder, get_conan_profile_path
+
+
+# Changing one of these can change every target, so the full suite runs
+BUILD_CONFIG_NAMES = ("CMakeLists.txt", "CMakePresets.json", "CMakeUserPresets.json", "conanfile.py", "conan.lock")
+BUILD_CONFIG_SUFFIXES = (".cmake",)
+
+# Files an in-source CMake build writes next to the sources, they show up as untracked changes
+BUILD_OUTPUT_DIRS = ("CMakeFiles", ".cmake", "Generators", "Testing")
+BUILD_OUTPUT_NAMES = ("CMakeCache.txt", "Makefile", "build.ninja", "cmake_install.cmake", "CTestTestfile.cmake", "compile_commands.json")
+
+# TEST(Suite, Name), TEST_F, TEST_P, TYPED_TEST and TYPED_TEST_P
+TEST_MACRO_PATTERN = re.compile(r"^\s*(?:TYPED_)?TEST(?:_F|_P)?\s*\(\s*(\w+)\s*,", re.MULTILINE)
+
+
+def changed_project_files(since="HEAD"):
+    """
+    Files changed since the git revision `since`, without the outputs an in-source build leaves next to the sources.
+
+    Raises:
+        RuntimeError: If git fails, e.g. because `since` is not a valid revision.
+    """
+    return [path for path in changed_files(since, ProjectConfig.PROJECT_ROOT) if not _is_build_output(path)]
+
+def affected_targets(changed, model):
+    """
+    Names of the targets owning one of the `changed` files, and of every target depending on them.
+
+    Returns:
+        set or None: The affected targets, None when the change can affect any
+        target: the build configuration changed, or a C/C++ file belongs to no known target.
+    """
+    build_config = [path for path in changed if _is_build_config(path) or model.is_cmake_input(path)]
+    if build_config:
+        Logger.Info(f"Impact: build configuration changed ({_relative(build_config[0])})")
+        return None
+
+    owned = set()
+    for path in changed:
+        owners = model.owners(path)
+        if not owners and path.suffix in SOURCE_EXTENSIONS and _is_project_source(path):
+            Logger.Info(f"Impact: {_relative(path)} belongs to no known target")
+            return None
+        owned.update(owners)
+
+    affected = model.dependents(owned)
+    Logger.Info(f"Impact: {len(changed)} changed files affect {len(affected)} targets: {', '.join(sorted(affected)) or 'none'}")
+
+    return affected
+
+def select_affected_tests(since, tests, executable_name, build_type):
+    """
+    Select the tests of a gtest executable that a change since `since` can affect.
+
+    Changed files are mapped to the CMake targets that own them, then to every
+    target depending on those. When the test executable is among them, the
+    suites to run come from the test sources that changed and from the tests
+    directories mirroring the affected libraries (tests/Core/Log for the target
+    built from src/Core/Log). Whenever the mapping is not conclusive the full
+    suite is selected.
+
+    Args:
+        since (str): The git revision to compare the working tree against.
+        tests (list): Full names of all tests of the executable.
+        executable_name (str): The CMake target name of the test executable.
+        build_type (str): The configuration to read from multi-config builds.
+
+    Returns:
+        list or None: The selected test names, None to run the full suite.
+    """
+    try:
+        changed = changed_project_files(since)
+    except RuntimeError as e:
+        Logger.Warning(f"Test impact: {e}, running the full suite")
+        return None
+
+    model = CodeModel.load(get_conan_build_folder(), build_type)
+    if model is None or executable_name not in model.targets:
+        Logger.Warning("Test impact: no CMake file API reply for the test target yet, build once with --build, running the full suite")
+        return None
+
+    affected = affected_targets(changed, model)
+    if affected is None:
+        Logger.Info("Test impact: running the full suite")
+        return None
+
+    if executable_name not in affected:
+        return []
+
+    executable = model.targets[executable_name]
+    test_sources = [source for source in executable.sources if source.suffix in SOURCE_EXTENSIONS]
+
+    suites = set()
+    for path in changed:
+        if not _is_test_path(path) or executable_name not in model.owners(path):
+            continue
+
+        # Test helpers (fixtures, shared headers, main) may be used by any suite
+        changed_suites = _suites_in(path)
+        if not changed_suites:
+            Logger.Info(f"Test impact: shared test file {_relative(path)} changed, running the full suite")
+            return None
+        suites.update(changed_suites)
+
+    for name in sorted(affected & model.dependencies_of(executable_name)):
+        mirror = _mirrored_tests_dir(model.targets[name].source_dir)
+        mirrored = [source for source in test_sources if mirror is not None and source.is_relative_to(mirror)]
+        if not mirrored:
+            Logger.Info(f"Test impact: no tests mirror target {name}, running the full suite")
+            return None
+
+        for source in mirrored:
+            suites.update(_suites_in(source))
+
+    selected = [test for test in tests if suite_of(test) in suites]
+    Logger.Info(f"Test impact: {len(selected)} of {len(tests)} tests in {len(suites)} suites")
+
+    return selected
+
+def suite_of(test):
+    """
+    The suite name as written in the TEST macro, without gtest's instantiation prefix or type index.
+
+    "Suite.Name", "Prefix/Suite.Name/0" and "Suite/0.Name" all belong to "Suite".
+    """
+    parts = [part for part in test.split(".", 1)[0].split("/") if not part.isdigit()]
+    return parts[-1] if parts else ""
+
+def _suites_in(source):
+    try:
+        text = Path(source).read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return set()
+    return set(TEST_MACRO_PATTERN.findall(text))
+
+def _mirrored_tests_dir(source_dir):
+    project_root = Path(ProjectConfig.PROJECT_ROOT).resolve()
+    if not source_dir.is_relative_to(project_root / "src"):
+        return None
+    return project_root / "tests" / source_dir.relative_to(project_root / "src")
+
+def _is_build_output(path):
+    return path.name in BUILD_OUTPUT_NAMES or any(part in BUILD_OUTPUT_DIRS for part in path.parts)
+
+def _is_build_config(path):
+    return path.name in BUILD_CONFIG_NAMES or path.suffix in BUILD_CONFIG_SUFFIXES or path == get_conan_profile_path()
+
+def _is_project_source(path):
+    project_root = Path(ProjectConfig.PROJECT_ROOT).resolve()
+    return any(path.resolve().is_relative_to(project_root / directory) for directory in ("src", "include", "tests"))
+
+def _is_test_path(path):
+    return path.resolve().is_relative_to(Path(ProjectConfig.PROJECT_ROOT).resolve() / "tests")
+
+def _relative(path):
+    try:
+        return path.relative_to(ProjectConfig.PROJECT_ROOT)
+    except ValueError:
+        return path
@@ -0,0 +1,275 @@
+import os
+import heapq
+import statistics
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+
+from automation.config.project_config import ProjectConfig
+from automation.utils.logger import Logger
+from automation.utils.shell_utils import ShellCommand, run_command, run_commands
+from automation.utils.cache_utils import JsonStore, atomic_write_text
+from automation.buildkit.conan_helper import get_conan_build_folder
+
+
+TEST_EXECUTABLE = "AetherEngineTests"
+
+# Duration assumed for tests that never ran before, when no history exists at all
+DEFAULT_TEST_DURATION = 0.1
+
+# Longer filters are split with gtest's own GTEST_TOTAL_SHARDS/GTEST_SHARD_INDEX instead,
+# Windows limits command lines to 32767 characters
+MAX_FILTER_LENGTH = 30000
+
+# gtest output lines streamed to the log, the rest of the test output is only kept in the report
+RESULT_MARKERS = ("[       OK ]", "[  FAILED  ]", "[  SKIPPED ]")
+
+
+def get_durations_path():
+    return Path(ProjectConfig.CACHE_DIR) / "test_durations.json"
+
+def get_default_junit_path():
+    build_dir = Path(ProjectConfig.BUILD_DIR) if ProjectConfig.BUILD_DIR else ProjectConfig.PROJECT_ROOT / "build"
+    return build_dir / "test-results" / "junit.xml"
+
+def find_test_executable(build_type):
+    """
+    Locate the gtest executable of the conan build, for single and multi-config generators.
+    """
+    name = TEST_EXECUTABLE + (".exe" if os.name == "nt" else "")
+    build_folder = get_conan_build_folder()
+
+    for candidate in (build_folder / "tests" / name, build_folder / "tests" / build_type / name, build_folder / build_type / name):
+        if candidate.is_file():
+            return candidate
+
+    matches = sorted(build_folder.glob(f"**/{name}"))
+    return matches[0] if matches else None
+
+def list_tests(executable):
+    """
+    The full names ("Suite.Test") of the tests in a gtest executable.
+    """
+    success, stdout, stderr = run_command([str(executable), "--gtest_list_tests"], log_stdout=lambda _: None)
+    if not success:
+        raise RuntimeError(f"Failed to list the tests of {executable}: {stderr}")
+
+    tests = []
+    suite = None
+    for line in stdout.splitlines():
+        # Parameterized tests are followed by a "# GetParam() = ..." comment
+        line = line.split("#", 1)[0].rstrip()
+        if not line:
+            continue
+        if not line.startswith(" "):
+            suite = line.strip()
+        elif suite:
+            tests.append(suite + line.strip())
+
+    return tests
+
+def make_shards(tests, durations, shard_count):
+    """
+    Split tests into shards of similar total duration, longest-processing-time first.
+
+    Tests without a recorded duration count with the median of the known ones.
+    """
+    known = [durations[test] for test in tests if test in durations]
+    default = statistics.median(known) if known else DEFAULT_TEST_DURATION
+
+    shard_count = max(1, min(shard_count, len(tests)))
+    heap = [(0.0, index) for index in range(shard_count)]
+    shards = [[] for _ in range(shard_count)]
+
+    for test in sorted(tests, key=lambda test: durations.get(test, default), reverse=True):
+        load, index = heapq.heappop(heap)
+        shards[index].append(test)
+        heapq.heappush(heap, (load + durations.get(test, default), index))
+
+    return [shard for shard in shards if shard]
+
+def run_tests(executable, jobs=None, tests=None, junit_path=None, retries=1):
+    """
+    Run gtest tests in parallel shards, retry failures and write a merged JUnit XML report.
+
+    Args:
+        executable (str or Path): The gtest executable.
+        jobs (int or None): Number of shards run at the same time, defaults to the CPU count.
+        tests (list or None): Full test names to run, all tests when None.
+        junit_path (str or Path or None): Where to write the merged report.
+        retries (int): How often failed tests are run again, a test passing on retry is reported as flaky.
+
+    Returns:
+        dict: {"passed": [...], "failed": [...], "flaky": [...], "skipped": [...]}
+    """
+    executable = Path(executable)
+    jobs = jobs or os.cpu_count() or 1
+    junit_path = Path(junit_path or get_default_junit_path())
+
+    all_tests = list_tests(executable)
+    wanted = None if tests is None else set(tests)
+    selected = all_tests if wanted is None else [test for test in all_tests if test in wanted]
+    if not selected:
+        Logger.Info("Tests: nothing to run")
+        _write_junit(junit_path, {})
+        return {"passed": [], "failed": [], "flaky": [], "skipped": []}
+
+    durations_store = JsonStore(get_durations_path())
+    durations = durations_store.load().get("tests", {})
+
+    with tempfile.TemporaryDirectory(prefix="automation-tests-") as temp_dir:
+        results = _run_shards(executable, make_shards(selected, durations, jobs), Path(temp_dir) / "run0")
+
+        flaky = []
+        for attempt in range(1, retries + 1):
+            failed = [test for test in selected if results[test]["status"] == "failed"]
+            if not failed:
+                break
+
+            Logger.Info(f"Tests: retrying {len(failed)} failed tests (attempt {attempt})")
+            retried = _run_shards(executable, make_shards(failed, durations, jobs), Path(temp_dir) / f"run{attempt}")
+            for test in failed:
+                if retried[test]["status"] == "passed":
+                    flaky.append(test)
+                    retried[test]["flaky"] = True
+                results[test] = retried[test]
+
+    def merge(data):
+        data.setdefault("tests", {}).update({test: result["time"] for test, result in results.items() if result["time"] is not None})
+    durations_store.update(merge)
+
+    _write_junit(junit_path, results)
+
+    summary = {status: [test for test in selected if results[test]["status"] == status] for status in ("passed", "failed", "skipped")}
+    summary["flaky"] = flaky
+
+    Logger.Info(f"Tests: {len(summary['passed'])} passed ({len(flaky)} flaky), {len(summary['failed'])} failed, "
+                f"{len(summary['skipped'])} skipped, report: {junit_path}")
+    for test in flaky:
+        Logger.Warning(f"Tests: flaky {test}")
+    for test in summary["failed"]:
+        Logger.Error(f"Tests: failed {test}: {results[test]['message']}")
+
+    return summary
+
+def _run_shards(executable, shards, output_dir):
+    """
+    Run each shard as one process of the gtest executable and collect per-test results from their XML output.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    use_gtest_sharding = any(len(":".join(shard)) > MAX_FILTER_LENGTH for shard in shards)
+    tests = [test for shard in shards for test in shard]
+
+    commands = []
+    for index, shard in enumerate(shards):
+        xml_path = output_dir / f"shard{index}.xml"
+        arguments = [str(executable), f"--gtest_output=xml:{xml_path}"]
+        env = {}
+
+        if use_gtest_sharding:
+            # The selection does not fit on a command line, gtest shards the whole executable round-robin
+            env["GTEST_TOTAL_SHARDS"] = str(len(shards))
+            env["GTEST_SHARD_INDEX"] = str(index)
+        else:
+            arguments.append(f"--gtest_filter={':'.join(shard)}")
+
+        commands.append(ShellCommand(arguments, env=env, prefix=f"shard {index}"))
+
+    Logger.Info(f"Tests: running {len(tests)} tests in {len(shards)} shards")
+    command_results = run_commands(commands, max_concurrency=len(shards), log_stdout=_log_test_line)
+
+    results = {}
+    for index, command_result in enumerate(command_results):
+        xml_path = output_dir / f"shard{index}.xml"
+        results.update(_parse_gtest_xml(xml_path))
+        if not command_result.success and not xml_path.is_file():
+            Logger.Error(f"Tests: shard {index} exited with code {command_result.exit_code} without a report: {command_result.stderr.strip()}")
+
+    selected = set(tests)
+    results = {test: result for test, result in results.items() if test in selected}
+    for test in tests:
+        if test not in results:
+            # The shard crashed or was killed before the test reported a result
+            results[test] = {"status": "failed", "time": None, "message": "No result, the test process exited early", "output": ""}
+
+    return results
+
+def _log_test_line(line):
+    if any(marker in line for marker in RESULT_MARKERS):
+        Logger.Info(line)
+
+def _parse_gtest_xml(xml_path):
+    if not xml_path.is_file():
+        return {}
+
+    try:
+        root = ElementTree.parse(xml_path).getroot()
+    except ElementTree.ParseError as e:
+        Logger.Error(f"Tests: cannot parse {xml_path}: {e}")
+        return {}
+
+    results = {}
+    for testcase in root.iter("testcase"):
+        name = f"{testcase.get('classname')}.{testcase.get('name')}"
+        failures = testcase.findall("failure") + testcase.findall("error")
+
+        if failures:
+            status = "failed"
+        elif testcase.find("skipped") is not None or testcase.get("status") == "notrun" or testcase.get("result") == "skipped":
+            status = "skipped"
+        else:
+            status = "passed"
+
+        results[name] = {
+            "status": status,
+            "time": float(testcase.get("time", 0) or 0),
+            "message": "\n".join(failure.get("message", "") for failure in failures),
+            "output": "\n".join(failure.text or "" for failure in failures),
+        }
+
+    return results
+
+def _write_junit(junit_path, results):
+    """
+    Write one JUnit XML document with a testsuite per gtest suite.
+    """
+    suites = {}
+    for test in sorted(results):
+        suite, _, name = test.partition(".")
+        suites.setdefault(suite, []).append((name, results[test]))
+
+    root = ElementTree.Element("testsuites", name=TEST_EXECUTABLE)
+    totals = {"tests": 0, "failures": 0, "skipped": 0, "time": 0.0}
+
+    for suite, cases in suites.items():
+        failures = sum(result["status"] == "failed" for _, result in cases)
+        skipped = sum(result["status"] == "skipped" for _, result in cases)
+        time = sum(result["time"] or 0 for _, result in cases)
+        element = ElementTree.SubElement(root, "testsuite", name=suite, tests=str(len(cases)), failures=str(failures),
+                                         errors="0", skipped=str(skipped), time=f"{time:.3f}")
+
+        for name, result in cases:
+            testcase = ElementTree.SubElement(element, "testcase", name=name, classname=suite, time=f"{result['time'] or 0:.3f}")
+            if result["status"] == "failed":
+                failure = ElementTree.SubElement(testcase, "failure", message=result["message"])
+                failure.text = result["output"]
+            elif result["status"] == "skipped":
+                ElementTree.SubElement(testcase, "skipped")
+
+            if result.get("flaky"):
+                properties = ElementTree.SubElement(testcase, "properties")
+                ElementTree.SubElement(properties, "property", name="flaky", value="true")
+
+        totals["tests"] += len(cases)
+        totals["failures"] += failures
+        totals["skipped"] += skipped
+        totals["time"] += time
+
+    root.set("tests", str(totals["tests"]))
+    root.set("failures", str(totals["failures"]))
+    root.set("errors", "0")
+    root.set("skipped", str(totals["skipped"]))
+    root.set("time", f"{totals['time']:.3f}")
+
+    ElementTree.indent(root)
+    atomic_write_text(junit_path, ElementTree.tostring(root, encoding="unicode", xml_declaration=True) + "\n")
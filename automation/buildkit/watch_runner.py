@@ -0,0 +1,274 @@
+import sys
+import time
+import argparse
+import threading
+from pathlib import Path
+
+automation_package_location = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(automation_package_location))
+
+from automation.config.project_config import ProjectConfig
+from automation.environment.venv_helper import get_executable_path
+from automation.utils.logger import Logger
+from automation.utils.shell_utils import terminate_running_commands
+from automation.utils.cache_utils import hash_file
+from automation.utils.code_format import SOURCE_EXTENSIONS, format_code
+from automation.utils.file_watcher import create_watcher
+from automation.buildkit import build_runner
+from automation.buildkit.build_eurora import EuroraBuilder
+
+
+WATCHED_DIRECTORIES = ("src", "include", "tests")
+
+BUILD_FILE_NAMES = ("CMakeLists.txt",)
+BUILD_FILE_SUFFIXES = (".cmake",)
+
+DEFAULT_QUIET_PERIOD = 0.3
+
+
+class WatchPipeline:
+    """
+    Formats, builds and tests batches of changed files on a background thread.
+
+    A batch arriving while the previous one is still running cancels it: the
+    running commands are terminated and the new run covers both batches. The
+    project config, the resolved tools and the command runner's event loop stay
+    loaded in this process between runs.
+    """
+
+    def __init__(self, format=True, test=True, debug=False, jobs=None, targets="auto"):
+        self.format = format
+        self.thread = None
+        self.current = set()
+        self.cancelled = threading.Event()
+        self.clang_format_path = None
+
+        # Content digest of each file as the last run saw it, None for deleted files
+        self.digests = {}
+
+        arguments = ["--build", "--targets", targets]
+        if test:
+            arguments += ["--test", "--affected-since", "HEAD"]
+        if debug:
+            arguments.append("--debug")
+        if jobs:
+            arguments += ["--jobs", str(jobs)]
+        self.build_config = build_runner._create_parser().parse_args(arguments)
+
+    def relevant_changes(self, paths):
+        """
+        The sources and build files among `paths` whose content differs from what the last run saw.
+
+        Saving a file without changes, or clang-format rewriting a file the run
+        formatted itself, does not trigger another run.
+        """
+        changes = set()
+        for path in paths:
+            if path.is_dir():
+                # A directory was moved away or events overflowed, its files are unknown
+                changes.add(path)
+                continue
+
+            if not _is_watched_file(path):
+                continue
+
+            digest = _digest(path)
+            if path not in self.digests or self.digests[path] != digest:
+                self.digests[path] = digest
+                changes.add(path)
+
+        return changes
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def submit(self, changes):
+        if self.is_running():
+            Logger.Info("Watch: new changes, cancelling the current run")
+            self.cancel()
+            # The cancelled run may not have formatted or built its files
+            changes = changes | self.current
+
+        self.current = changes
+        self.cancelled.clear()
+        self.thread = threading.Thread(target=self._run, args=(changes,), name="watch-run", daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        if not self.is_running():
+            return
+
+        self.cancelled.set()
+        # A command may start between two terminations, keep going until the run gives up
+        while self.thread.is_alive():
+            terminate_running_commands()
+            self.thread.join(0.1)
+
+    def _run(self, changes):
+        start_time = time.perf_counter()
+        try:
+            sources = sorted(path for path in changes if path.suffix in SOURCE_EXTENSIONS and path.is_file())
+            if self.format and sources:
+                self._format(sources)
+
+            self._check_cancelled()
+            EuroraBuilder().setup_and_run(self.build_config)
+            self._check_cancelled()
+        except Exception as e:
+            if self.cancelled.is_set():
+                Logger.Info("Watch: run cancelled")
+            else:
+                Logger.Error(f"Watch: run failed after {time.perf_counter() - start_time:.2f}s: {e}")
+            return
+
+        Logger.Info(f"Watch: run finished in {time.perf_counter() - start_time:.2f}s, waiting for changes")
+
+    def _format(self, sources):
+        if self.clang_format_path is None:
+            self.clang_format_path = get_executable_path("clang-format")
+        if self.clang_format_path is None:
+            Logger.Warning("Watch: clang-format was not found, skipping formatting")
+            self.format = False
+            return
+
+        for source in sources:
+            self._check_cancelled()
+            format_code(str(source), clang_format_path=self.clang_format_path)
+            # The formatter's own write must not count as a new change
+            self.digests[source] = _digest(source)
+
+    def _check_cancelled(self):
+        if self.cancelled.is_set():
+            raise RuntimeError("cancelled")
+
+
+def watch(format=True, test=True, debug=False, jobs=None, targets="auto", polling=False, quiet_period=DEFAULT_QUIET_PERIOD):
+    """
+    Watch src/, include/ and tests/, and format, build and test on every change until interrupted.
+
+    Args:
+        format (bool): Format the changed C/C++ files with clang-format.
+        test (bool): Run the tests affected by the uncommitted changes after building.
+        debug (bool): Build and test the Debug configuration.
+        jobs (int or None): Passed to the builder as --jobs.
+        targets (str): Passed to the builder as --targets, "auto" builds the affected targets only.
+        polling (bool): Poll file modification times instead of using inotify.
+        quiet_period (float): Seconds without further changes that end a batch.
+
+    Returns:
+        int: The exit code, 0 when stopped with Ctrl+C.
+    """
+    project_root = ProjectConfig.PROJECT_ROOT
+    roots = [project_root / directory for directory in WATCHED_DIRECTORIES]
+    pipeline = WatchPipeline(format, test, debug, jobs, targets)
+
+    with create_watcher(roots, polling=polling) as watcher:
+        Logger.Info(f"Watch: watching {', '.join(WATCHED_DIRECTORIES)} ({type(watcher).__name__}), press Ctrl+C to stop")
+
+        try:
+            while True:
+                changes = pipeline.relevant_changes(watcher.wait_for_changes(quiet_period))
+                if not changes:
+                    continue
+
+                names = sorted(str(_relative(path)) for path in changes)
+                Logger.Info(f"Watch: {len(changes)} changed: {', '.join(names[:5])}{', ...' if len(names) > 5 else ''}")
+                pipeline.submit(changes)
+        except KeyboardInterrupt:
+            Logger.Info("Watch: stopping")
+            pipeline.cancel()
+
+    return 0
+
+def _is_watched_file(path):
+    if path.name.startswith("."):
+        return False
+    return path.suffix in SOURCE_EXTENSIONS or path.name in BUILD_FILE_NAMES or path.suffix in BUILD_FILE_SUFFIXES
+
+def _digest(path):
+    try:
+        return hash_file(path)
+    except OSError:
+        return None
+
+def _relative(path):
+    try:
+        return path.relative_to(ProjectConfig.PROJECT_ROOT)
+    except ValueError:
+        return path
+
+def _create_parser(parent_parser=None):
+    description = "Watches the sources and formats, builds and tests incrementally on every change."
+    if parent_parser is None:
+        parser = argparse.ArgumentParser(description=description)
+    else:
+        parser = parent_parser.add_parser("watch", description=description, help=description)
+
+    parser.add_argument(
+        "--no-format",
+        dest="format",
+        action="store_false",
+        help="Do not format the changed files."
+    )
+    parser.add_argument(
+        "--no-test",
+        dest="test",
+        action="store_false",
+        help="Only build, do not run the affected tests."
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Build and test the Debug configuration."
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Maximum number of parallel steps and tool processes (default: the CPU count)."
+    )
+    parser.add_argument(
+        "--targets",
+        default="auto",
+        help="CMake targets to build, 'auto' for the ones affected by the changes (default: auto)."
+    )
+    parser.add_argument(
+        "--poll",
+        dest="polling",
+        action="store_true",
+        help="Poll modification times instead of using inotify, e.g. on network file systems."
+    )
+    parser.add_argument(
+        "--quiet-period",
+        type=float,
+        default=DEFAULT_QUIET_PERIOD,
+        help=f"Seconds without further changes before a batch runs (default: {DEFAULT_QUIET_PERIOD})."
+    )
+
+    return parser
+
+def _run(args):
+    return watch(args.format, args.test, args.debug, args.jobs, args.targets, args.polling, args.quiet_period)
+
+def register_subcommand(parent_parser):
+    """
+    Add 'watch' subcommand to the parent parser.
+    """
+    parser = _create_parser(parent_parser)
+
+    parser.set_defaults(func=_run)
+
+def main():
+    """
+    Entry point for the script. Parses command-line arguments and calls `watch`.
+    """
+    parser = _create_parser()
+
+    args = parser.parse_args()
+
+    sys.exit(_run(args))
+
+if __name__ == "__main__":
+    ProjectConfig.initialize()
+
+    main()
@@ -24,6 +24,7 @@ class ProjectConfig:
     COMPILER_CPPSTD = 17
     BUILD_TYPE = None
     CMAKE_GENERATOR = None
+    CACHE_DIR = PROJECT_ROOT / ".cache"
 
     CONAN_USER_HOME = None
     CONAN_PROFILE   = "default"
@@ -67,6 +68,7 @@ class ProjectConfig:
         cls.COMPILER_CPPSTD = config_data.get("compiler.cppstd")
         cls.BUILD_TYPE = config_data.get("build_type")
         cls.CMAKE_GENERATOR = config_data.get("cmake_generator")
+        cls.CACHE_DIR = cls._resolve_cache_dir(config_data.get("cache_dir"))
 
         conan_user_home_template = config_data.get(f"conan.user_home.{cls.PLATFORM}")
         conan_user_home = conan_user_home_template.format(project_name=cls.PROJECT_NAME)
@@ -75,12 +77,29 @@ class ProjectConfig:
         cls.CONAN_PROFILE = config_data.get("conan.profile")
 
     @classmethod
-    def reload(cls, *, build_config_file):
+    def _resolve_cache_dir(cls, cache_dir):
         """
-        Reload the configuration from a file, even if already initialized.
+        Locate the root directory for persistent tool caches.
+
+        Uses "cache_dir" from the configuration when present, otherwise a
+        ".cache" directory next to the build directory.
+        """
+        if cache_dir:
+            cache_path = Path(cache_dir)
+        elif cls.BUILD_DIR:
+            cache_path = Path(cls.BUILD_DIR).parent / ".cache"
+        else:
+            cache_path = Path(".cache")
+
+        return cache_path if cache_path.is_absolute() else cls.PROJECT_ROOT / cache_path
+
+    @classmethod
+    def reload(cls):
+        """
+        Reload the configuration file, even if already initialized.
         """
         cls._initialized = False
-        cls.initialize(build_config_file)
+        cls.initialize()
 
     @classmethod
     def summary(cls):
@@ -102,6 +121,7 @@ class ProjectConfig:
             f"  COMPILER_STD     : {cls.COMPILER_CPPSTD}",
             f"  BUILD_TYPE       : {cls.BUILD_TYPE}",
             f"  CMAKE_GENERATOR  : {cls.CMAKE_GENERATOR}",
+            f"  CACHE_DIR        : {cls.CACHE_DIR}",
         ]
 
         Logger.Info("\n".join(summary_lines))
@@ -0,0 +1,462 @@
+import os
+import sys
+import stat
+import time
+import socket
+import hashlib
+import marshal
+from pathlib import Path
+
+automation_package_location = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(automation_package_location))
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_IDLE_TIMEOUT = 15 * 60
+
+# Seconds the client waits for a daemon it started to accept connections
+STARTUP_TIMEOUT = 10
+
+# Messages are marshal dumps of plain dicts with a 4 byte length prefix, json and tempfile would double the client's import time
+_LENGTH_BYTES = 4
+
+
+def get_socket_dir():
+    """
+    A directory only this user can enter, $XDG_RUNTIME_DIR when set, created on first use.
+
+    Raises:
+        PermissionError: If the directory exists but belongs to another user or is open to others,
+            someone else could serve a socket there and read the environment clients send.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        directory = Path(runtime_dir) / "aether-manage"
+    else:
+        temp_dir = os.environ.get("TMPDIR") or os.environ.get("TMP") or os.environ.get("TEMP") or "/tmp"
+        directory = Path(temp_dir) / f"aether-manage-{os.getuid()}"
+
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+
+    status = os.lstat(directory)
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() or status.st_mode & 0o077:
+        raise PermissionError(f"{directory} is not a private directory of this user")
+
+    return directory
+
+def get_socket_path(project_root=PROJECT_ROOT):
+    """
+    A per-checkout socket path in the private socket directory, short enough for AF_UNIX.
+    """
+    digest = hashlib.sha1(str(Path(project_root).resolve()).encode("utf-8")).hexdigest()[:12]
+    return get_socket_dir() / f"{digest}.sock"
+
+def is_supported():
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "getuid")
+
+
+class DaemonServer:
+    """
+    Serves manage.py requests one at a time on a Unix domain socket.
+
+    The daemon keeps the project config, the subcommand modules, the resolved
+    tools and the command runner's event loop loaded, and runs each request's
+    arguments in process with output streamed back to the client. It exits
+    after an idle timeout and when the automation sources change, and reloads
+    the config or forgets resolved tools when project_config.json or the
+    virtual environment change.
+    """
+
+    def __init__(self, socket_path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.socket_path = Path(socket_path or get_socket_path())
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.requests = 0
+        self.running = True
+        self.stamps = {}
+
+    def serve_forever(self):
+        from automation.config.project_config import ProjectConfig
+        from automation.utils.logger import Logger
+        from automation.utils.shell_utils import CommandRunner
+        from automation.subcommands import SUBCOMMANDS
+
+        ProjectConfig.initialize()
+        # Import everything a request may need up front, the import cost is what the daemon saves
+        import automation.manage
+        for subcommand in SUBCOMMANDS:
+            try:
+                subcommand.load()
+            except Exception as e:
+                Logger.Warning(f"Daemon: cannot preload {subcommand.name}: {e}")
+        CommandRunner.instance()
+        self.stamps = self._current_stamps()
+
+        if _connect(self.socket_path) is not None:
+            Logger.Info(f"Daemon: another daemon already serves {self.socket_path}")
+            return
+
+        self.socket_path.unlink(missing_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+        try:
+            server.bind(str(self.socket_path))
+        finally:
+            os.umask(old_umask)
+        server.listen()
+        server.settimeout(self.idle_timeout)
+
+        Logger.Info(f"Daemon: pid {os.getpid()} serving {self.socket_path}, idle timeout {self.idle_timeout}s")
+        try:
+            while self.running:
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    Logger.Info("Daemon: idle timeout, exiting")
+                    break
+
+                with connection:
+                    self._handle(connection)
+        finally:
+            server.close()
+            self.socket_path.unlink(missing_ok=True)
+
+    def _handle(self, connection):
+        stream = _MessageStream(connection)
+        request = _receive(connection.makefile("rb"))
+        if not isinstance(request, dict):
+            return
+
+        action = request.get("action", "run")
+        if action == "stop":
+            self.running = False
+            stream.send({"exit": 0})
+            return
+        if action == "status":
+            stream.send({"pid": os.getpid(), "uptime": time.time() - self.started, "requests": self.requests, "exit": 0})
+            return
+
+        if not self._refresh():
+            # The automation code changed, the client starts a fresh daemon
+            self.running = False
+            stream.send({"restart": True})
+            return
+
+        self.requests += 1
+        exit_code = self._run(request, stream)
+        # The request may have resolved the virtual environment for the first time
+        self.stamps = self._current_stamps()
+        stream.send({"exit": exit_code})
+
+    def _run(self, request, stream):
+        """
+        Run manage.main with the client's arguments, working directory and environment, output goes to the client.
+        """
+        import logging
+        import traceback
+        from automation import manage
+        from automation.utils.shell_utils import terminate_running_commands
+
+        stdout = _ClientWriter(stream, "stdout", on_disconnect=terminate_running_commands)
+        stderr = _ClientWriter(stream, "stderr", on_disconnect=terminate_running_commands)
+
+        root = logging.getLogger()
+        saved_handlers = root.handlers[:]
+        handler = logging.StreamHandler(stderr)
+        handler.setFormatter(saved_handlers[0].formatter if saved_handlers and saved_handlers[0].formatter else logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+
+        saved_streams = sys.stdout, sys.stderr
+        saved_argv = sys.argv
+        saved_environ = dict(os.environ)
+        saved_cwd = os.getcwd()
+
+        root.handlers = [handler]
+        sys.stdout, sys.stderr = stdout, stderr
+        # argparse names the program after sys.argv[0]
+        sys.argv = [str(Path(manage.__file__).name), *request.get("argv", [])]
+        try:
+            os.environ.clear()
+            os.environ.update(request.get("env") or saved_environ)
+            os.chdir(request.get("cwd") or saved_cwd)
+            return manage.main(request.get("argv", []))
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+            return 1
+        finally:
+            sys.stdout, sys.stderr = saved_streams
+            sys.argv = saved_argv
+            root.handlers = saved_handlers
+            os.chdir(saved_cwd)
+            os.environ.clear()
+            os.environ.update(saved_environ)
+
+    def _current_stamps(self):
+        from automation.config.project_config import ProjectConfig
+        from automation.environment.venv_helper import ExecutableCache, _venv_stamp
+
+        venv = ExecutableCache.get_venv()
+        return {
+            "config": _file_stamp(ProjectConfig.PROJECT_ROOT / "config" / "project_config.json"),
+            "venv": (_venv_stamp(venv) if venv else None, _file_stamp(ProjectConfig.PROJECT_ROOT / "Pipfile.lock")),
+            "code": sorted((str(path), _file_stamp(path)) for path in Path(__file__).resolve().parent.rglob("*.py")),
+        }
+
+    def _refresh(self):
+        """
+        Invalidate what changed since the last request.
+
+        Returns:
+            bool: False when the daemon must be restarted to pick up changed automation code.
+        """
+        from automation.config.project_config import ProjectConfig
+        from automation.environment.venv_helper import clear_executable_cache
+        from automation.utils.logger import Logger
+
+        current = self._current_stamps()
+        if current["code"] != self.stamps["code"]:
+            Logger.Info("Daemon: automation sources changed, restarting")
+            return False
+
+        if current["config"] != self.stamps["config"]:
+            Logger.Info("Daemon: project_config.json changed, reloading")
+            ProjectConfig.reload()
+            clear_executable_cache()
+        elif current["venv"] != self.stamps["venv"]:
+            Logger.Info("Daemon: virtual environment changed, resolving tools again")
+            clear_executable_cache()
+
+        self.stamps = self._current_stamps()
+        return True
+
+
+class _MessageStream:
+    """
+    Length-prefixed marshal messages sent to the client, shared by the stdout and stderr writers.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.connected = True
+
+    def send(self, message):
+        if not self.connected:
+            return False
+        try:
+            _send(self.connection, message)
+            return True
+        except OSError:
+            self.connected = False
+            return False
+
+
+class _ClientWriter:
+    """
+    A text stream forwarding writes to the client, used for sys.stdout, sys.stderr and the log handler.
+    """
+
+    def __init__(self, stream, name, on_disconnect=None):
+        self.stream = stream
+        self.name = name
+        self.on_disconnect = on_disconnect
+
+    def write(self, text):
+        if text and not self.stream.send({self.name: text}) and self.on_disconnect is not None:
+            # The client went away (Ctrl+C), stop the work it asked for
+            on_disconnect, self.on_disconnect = self.on_disconnect, None
+            on_disconnect()
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+def run_client(argv, autostart=True):
+    """
+    Run manage.py `argv` in the daemon, streaming its output to this process.
+
+    Returns:
+        int: The command's exit code, or None when no daemon could be reached.
+    """
+    try:
+        socket_path = get_socket_path()
+    except OSError as e:
+        print(f"Daemon: {e}, running locally", file=sys.stderr)
+        return None
+
+    for _ in range(2):
+        connection = _connect(socket_path)
+        if connection is None and autostart:
+            connection = _start_daemon(socket_path)
+        if connection is None:
+            return None
+
+        with connection:
+            _send(connection, {"action": "run", "argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)})
+
+            replies = connection.makefile("rb")
+            received = False
+            while True:
+                message = _receive(replies)
+                if message is None:
+                    # Closed without a reply, an incompatible daemon, otherwise it died during the command
+                    return 1 if received else None
+                received = True
+                if "stdout" in message:
+                    sys.stdout.write(message["stdout"])
+                    sys.stdout.flush()
+                elif "stderr" in message:
+                    sys.stderr.write(message["stderr"])
+                    sys.stderr.flush()
+                elif message.get("restart"):
+                    break
+                elif "exit" in message:
+                    return message["exit"]
+
+        # The daemon exited to pick up changed code, give it a moment to release the socket
+        time.sleep(0.1)
+
+    return None
+
+def send_action(action):
+    try:
+        connection = _connect(get_socket_path())
+    except OSError:
+        return None
+    if connection is None:
+        return None
+
+    with connection:
+        _send(connection, {"action": action})
+        return _receive(connection.makefile("rb"))
+
+def _connect(socket_path):
+    """
+    Connect to the daemon at `socket_path`, None unless it is there and runs as this user.
+    """
+    if not is_supported():
+        return None
+
+    try:
+        status = os.lstat(socket_path)
+    except OSError:
+        return None
+    if not stat.S_ISSOCK(status.st_mode) or status.st_uid != os.getuid():
+        return None
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(str(socket_path))
+        if _peer_uid(connection) not in (None, os.getuid()):
+            connection.close()
+            return None
+        return connection
+    except OSError:
+        connection.close()
+        return None
+
+def _peer_uid(connection):
+    """
+    The user id of the process at the other end of `connection`, None where the platform does not tell.
+    """
+    if hasattr(socket, "SO_PEERCRED"):
+        # struct ucred: pid, uid and gid as three ints
+        credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, 12)
+        return int.from_bytes(credentials[4:8], sys.byteorder)
+    if hasattr(os, "getpeereid"):
+        return os.getpeereid(connection.fileno())[0]
+    return None
+
+def _send(connection, message):
+    data = marshal.dumps(message)
+    connection.sendall(len(data).to_bytes(_LENGTH_BYTES, "big") + data)
+
+def _receive(stream):
+    header = stream.read(_LENGTH_BYTES)
+    if len(header) < _LENGTH_BYTES:
+        return None
+
+    data = stream.read(int.from_bytes(header, "big"))
+    try:
+        return marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+def _start_daemon(socket_path):
+    import subprocess
+
+    with open(socket_path.with_suffix(".log"), "ab") as log:
+        subprocess.Popen([sys.executable, str(Path(__file__).resolve()), "--serve"], cwd=str(PROJECT_ROOT),
+                         stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True, close_fds=True)
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        connection = _connect(socket_path)
+        if connection is not None:
+            return connection
+        time.sleep(0.05)
+
+    return None
+
+def _file_stamp(path):
+    try:
+        status = os.stat(path)
+        return status.st_mtime_ns, status.st_size
+    except OSError:
+        return None
+
+def _run_locally(argv):
+    from automation.config.project_config import ProjectConfig
+    from automation import manage
+
+    ProjectConfig.initialize()
+    return manage.main(argv)
+
+def main(argv=None):
+    """
+    Entry point for the thin client, which only imports the standard library modules it needs.
+
+        daemon.py eurora --build    Run a manage.py command in the daemon, starting it when needed
+        daemon.py --status          Show whether the daemon runs
+        daemon.py --stop            Stop the daemon
+        daemon.py --serve           Run the daemon in the foreground, [--idle-timeout SECONDS]
+
+    Falls back to running the command in process when no daemon can be reached.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv[:1] == ["--serve"]:
+        idle_timeout = float(argv[argv.index("--idle-timeout") + 1]) if "--idle-timeout" in argv else DEFAULT_IDLE_TIMEOUT
+        DaemonServer(idle_timeout=idle_timeout).serve_forever()
+        return 0
+
+    if argv[:1] in (["--stop"], ["--status"]):
+        reply = send_action(argv[0][2:])
+        if reply is None:
+            print("Daemon is not running.")
+            return 1 if argv[0] == "--status" else 0
+        if argv[0] == "--status":
+            print(f"Daemon pid {reply['pid']}, up {reply['uptime']:.0f}s, {reply['requests']} requests served, socket {get_socket_path()}")
+        return 0
+
+    if not is_supported():
+        return _run_locally(argv)
+
+    exit_code = run_client(argv)
+    if exit_code is None:
+        print("Daemon unavailable, running in process.", file=sys.stderr)
+        return _run_locally(argv)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
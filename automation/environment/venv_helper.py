@@ -2,25 +2,159 @@ import os
 import sys
 from pathlib import Path
 
-from automation.utils.shell_utils import run_command
+from automation.config.project_config import ProjectConfig
+from automation.utils.shell_utils import run_command, ShellCommand
 from automation.utils.logger import Logger
 from automation.utils.file_utils import clean
+from automation.utils.cache_utils import JsonStore
 
 
 class EnvironmentSetupError(Exception):
     """Custom exception for environment setup errors."""
     pass
 
-def get_executable_path(executable_name):
-    success, venv_path = get_pipenv_venv()
+
+class ExecutableCache:
+    """
+    Memoizes the pipenv virtual environment and the tools resolved inside it.
+
+    Resolved tools are kept in process and persisted per virtual environment,
+    the on-disk record is only trusted while the mtimes of the interpreter and
+    the bin/ directory are unchanged.
+    """
+    _venv = None
+    _tools = {}
+    _records = None
+
+    @classmethod
+    def get_venv(cls):
+        return cls._venv
+
+    @classmethod
+    def set_venv(cls, venv_path):
+        cls._venv = venv_path
+
+    @classmethod
+    def lookup(cls, venv_path, executable_name):
+        key = (str(venv_path), executable_name)
+        if key in cls._tools:
+            return cls._tools[key]
+
+        record = cls._load_records().get(str(venv_path))
+        if not record or record.get("stamp") != _venv_stamp(venv_path):
+            return None
+
+        executable_path = record.get("tools", {}).get(executable_name)
+        if executable_path is None:
+            return None
+
+        executable_path = Path(executable_path)
+        cls._tools[key] = executable_path
+        return executable_path
+
+    @classmethod
+    def store(cls, venv_path, executable_name, executable_path):
+        cls._tools[(str(venv_path), executable_name)] = executable_path
+
+        stamp = _venv_stamp(venv_path)
+
+        def merge(data):
+            venvs = data.setdefault("venvs", {})
+            record = venvs.get(str(venv_path))
+            if not record or record.get("stamp") != stamp:
+                record = venvs[str(venv_path)] = {"stamp": stamp, "tools": {}}
+            record["tools"][executable_name] = str(executable_path)
+
+        try:
+            cls._records = cls._store().update(merge).get("venvs", {})
+        except OSError as e:
+            Logger.Warning(f"Cannot persist resolved tool {executable_name}: {e}")
+
+    @classmethod
+    def clear(cls):
+        cls._venv = None
+        cls._tools = {}
+        cls._records = None
+
+    @classmethod
+    def _store(cls):
+        return JsonStore(ProjectConfig.CACHE_DIR / "tools.json")
+
+    @classmethod
+    def _load_records(cls):
+        if cls._records is None:
+            cls._records = cls._store().load().get("venvs", {})
+        return cls._records
+
+
+def _venv_stamp(venv_path):
+    """
+    Modification times identifying the state of a virtual environment.
+    """
     venv_path = Path(venv_path)
+    stamp = []
+    for bin_dir, python_name in (("bin", "python"), ("Scripts", "python.exe")):
+        try:
+            stamp.append(os.stat(venv_path / bin_dir / python_name).st_mtime_ns)
+            stamp.append(os.stat(venv_path / bin_dir).st_mtime_ns)
+            return stamp
+        except OSError:
+            continue
+
+    return None
+
+def _find_in_project_venv():
+    """
+    Locate an in-project .venv next to the Pipfile pipenv would use, without starting pipenv.
+    """
+    pipfile = os.environ.get("PIPENV_PIPFILE")
+    if pipfile:
+        search_dirs = [Path(pipfile).resolve().parent]
+    else:
+        max_depth = int(os.environ.get("PIPENV_MAX_DEPTH", "3"))
+        cwd = Path.cwd()
+        search_dirs = [cwd, *cwd.parents][:max_depth]
+
+    for directory in search_dirs:
+        if (directory / "Pipfile").is_file():
+            venv_path = directory / ".venv"
+            if (venv_path / "pyvenv.cfg").is_file():
+                return venv_path
+            return None
+
+    return None
+
+def clear_executable_cache():
+    """
+    Forget the memoized virtual environment and tools, e.g. after the venv was recreated.
+    """
+    ExecutableCache.clear()
+
+def get_executable_path(executable_name, quiet=False):
+    """
+    Find an executable installed in the pipenv virtual environment.
+
+    Args:
+        executable_name (str): The executable's name, with or without extension.
+        quiet (bool): Do not log an error when it is missing, for callers that look elsewhere next.
+
+    Returns:
+        Path: The executable, or None if it is not installed in the virtual environment.
+    """
+    success, venv_path = get_pipenv_venv()
 
     if not success:
-        Logger.Error(f"Cannot detect pipenv environment in {os.get_cwd()}")
+        if not quiet:
+            Logger.Error(f"Cannot detect pipenv environment in {os.getcwd()}")
         return None
 
+    venv_path = Path(venv_path)
     executable_name = Path(executable_name).stem
 
+    executable_path = ExecutableCache.lookup(venv_path, executable_name)
+    if executable_path is not None:
+        return executable_path
+
     candidates = [
         venv_path / "bin" / executable_name, # Unix-like systems
         venv_path / "Scripts" / (executable_name + ".exe") # Windows
@@ -34,11 +168,14 @@ def get_executable_path(executable_name):
             break
 
     if executable_path == None:
-        Logger.Error(f"No {executable_name} interpreter found in virtual environment: {venv_path}")
+        if not quiet:
+            Logger.Error(f"No {executable_name} interpreter found in virtual environment: {venv_path}")
         return None
 
     Logger.Info(f"Detect {executable_name} in virtual environment: {venv_path}")
 
+    ExecutableCache.store(venv_path, executable_name, executable_path)
+
     return executable_path
 
 def get_python_info():
@@ -82,9 +219,23 @@ def get_virtualenv_python_info(venv_path):
 def get_pipenv_venv():
     """
     Check if the virtual environment already exists.
+
+    An in-project .venv is used directly, otherwise `pipenv --venv` is asked once per process.
     """
-    success, venv_path, _ = run_command(["pipenv", "--venv"], check=False)
-    return success, venv_path
+    venv_path = ExecutableCache.get_venv()
+    if venv_path is not None:
+        return True, venv_path
+
+    in_project_venv = _find_in_project_venv()
+    if in_project_venv is not None:
+        venv_path = str(in_project_venv)
+    else:
+        success, venv_path, _ = run_command(["pipenv", "--venv"], check=False)
+        if not success:
+            return success, venv_path
+
+    ExecutableCache.set_venv(venv_path)
+    return True, venv_path
 
 def delete_virtualenv(target_root):
     """
@@ -100,6 +251,8 @@ def delete_virtualenv(target_root):
     else:
         Logger.Info("No .venv directory found, skipping manual deletion.")
 
+    clear_executable_cache()
+
 def check_pipenv():
     """
     Check if Pipenv is installed.
@@ -161,10 +314,19 @@ def create_virtualenv(python_version, pypi_source):
     Logger.Info("Installing clang-tidy in virtualenv...")
     run_command(["pipenv", "install", "clang-tidy", "-i", pypi_source], env=env)
 
-def run_pipenv_python_command(command : str | list, *, check=True):
-    env = os.environ.copy()
-    env["PIPENV_VENV_IN_PROJECT"] = "TRUE"
-    env["PIPENV_MAX_DEPTH"] = "10"
+    clear_executable_cache()
+
+def make_pipenv_python_command(command : str | list):
+    """
+    Build a command running the virtual environment's python, or `python -m <command>`.
+
+    Returns:
+        ShellCommand: The command, ready for `run_command` or `run_commands`.
+    """
+    env = {
+        "PIPENV_VENV_IN_PROJECT": "TRUE",
+        "PIPENV_MAX_DEPTH": "10"
+    }
 
     if isinstance(command, str):
         # Split string into list for processing
@@ -182,11 +344,14 @@ def run_pipenv_python_command(command : str | list, *, check=True):
 
     # Replace 'python' with the specified python_path if it's the first element
     if Path(command_parts[0]).stem == "python" or Path(command_parts[0]).stem == "python3":
-        command_parts[0] = python_path
+        command_parts[0] = str(python_path)
     else:
         command_parts.insert(0, "-m")
         command_parts.insert(0, str(python_path))
 
     Logger.Info(f"Run: {' '.join(command_parts)}")
 
-    return run_command(command_parts, check=check, env=env)
+    return ShellCommand(command_parts, env=env)
+
+def run_pipenv_python_command(command : str | list, *, check=True):
+    return run_command(make_pipenv_python_command(command), check=check)
@@ -1,25 +1,27 @@
 import sys
 import argparse
-import importlib
 from pathlib import Path
 
 automation_package_location = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(automation_package_location))
 
 from automation.config.project_config import ProjectConfig
+from automation.subcommands import add_subcommands
+from automation.utils.logger import Logger, DEFAULT_CONSOLE_RATE
 
 
-SUBCOMMANDS = {
-    "setup-env": "automation.environment.env_setup",
-    "eurora": "automation.buildkit.build_runner",
-    "tree": "automation.utils.print_tree",
-    "format": "automation.utils.code_format"
-}
-
-def main():
+def main(argv=None):
     """
     Entry point for the project management script. Distributes subcommands to corresponding modules.
+
+    Only the module of the selected subcommand is imported, the others are
+    listed in the help output from their declaration in automation.subcommands.
+
+    Returns:
+        int: The process exit code.
     """
+    argv = sys.argv[1:] if argv is None else argv
+
     parser = argparse.ArgumentParser(description="Project management script")
     parser.add_argument(
         "-p, --show-project-info",
@@ -29,31 +31,63 @@ def main():
         action = 'store_true'
     )
 
+    parser.add_argument(
+        "--log-dir",
+        dest = 'log_dir',
+        metavar = 'DIR',
+        help = "Write the full log to DIR/manage.log and the output of every command to its own file in DIR",
+        default = None
+    )
+    parser.add_argument(
+        "--log-json",
+        dest = 'log_json',
+        metavar = 'FILE',
+        help = "Append every log record to FILE as one JSON object per line",
+        default = None
+    )
+    parser.add_argument(
+        "--log-rate",
+        dest = 'log_rate',
+        type = int,
+        metavar = 'LINES',
+        help = f"Lines of command output per second shown on the console, 0 for no limit (default: {DEFAULT_CONSOLE_RATE} with --log-dir, otherwise no limit)",
+        default = None
+    )
+
     subparsers = parser.add_subparsers(title="Commands", dest="command")
 
-    # Dynamically load and register subcommands
     try:
-        for name, module_name in SUBCOMMANDS.items():
-            module = importlib.import_module(module_name)
-            if hasattr(module, "register_subcommand"):
-                module.register_subcommand(subparsers)
-            else:
-                raise ImportError(f"Subcommand module {name} is missing `register_subcommand`.")
+        add_subcommands(subparsers, argv)
     except Exception as e:
-        print(f"Failed to load subcommand {name}: {e}\n")
+        print(f"Failed to load subcommand: {e}\n")
+        return 1
 
     # Parse arguments and dispatch to the correct function
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    # Queued logging keeps slow consoles and files off the threads that run the commands
+    rate = args.log_rate
+    if rate is None:
+        # Only drop console lines when the log directory has them
+        rate = DEFAULT_CONSOLE_RATE if args.log_dir is not None else 0
+    Logger.start_queue(args.log_dir, args.log_json, rate)
+
+    try:
+        if hasattr(args, "func"):
+            result = args.func(args)
+            # bool is an int too, only handlers returning an actual exit code set it
+            return result if type(result) is int else 0
+        elif args.show_project_info:
+            ProjectConfig.summary()
+        else:
+            parser.print_help()
+    finally:
+        Logger.stop_queue()
 
-    if hasattr(args, "func"):
-        args.func(args)
-    elif args.show_project_info:
-        ProjectConfig.summary()
-    else:
-        parser.print_help()
+    return 0
 
 
 if __name__ == "__main__":
     ProjectConfig.initialize()
 
-    main()
+    sys.exit(main())
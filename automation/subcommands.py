@@ -0,0 +1,84 @@
+import sys
+import argparse
+import importlib
+
+
+class Subcommand:
+    """
+    A manage.py subcommand, declared without importing the module implementing it.
+
+    The module provides `register_subcommand(parent_parser)`, which adds the
+    full argument parser and sets the `func` to dispatch to. It is only
+    imported when the subcommand is selected on the command line.
+    """
+
+    def __init__(self, name, module, help):
+        self.name = name
+        self.module = module
+        self.help = help
+
+    def load(self):
+        module = importlib.import_module(self.module)
+        if not hasattr(module, "register_subcommand"):
+            raise ImportError(f"Subcommand module {self.module} is missing `register_subcommand`.")
+        return module
+
+    def register(self, subparsers):
+        self.load().register_subcommand(subparsers)
+
+    def register_placeholder(self, subparsers):
+        """
+        List the subcommand in the help output without importing its module.
+        """
+        subparsers.add_parser(self.name, help=self.help, description=self.help, add_help=False)
+
+
+SUBCOMMANDS = (
+    Subcommand("setup-env", "automation.environment.env_setup", "Setup the development environment."),
+    Subcommand("eurora", "automation.buildkit.build_runner", "Eurora."),
+    Subcommand("tree", "automation.utils.print_tree", "Prints the directory tree structure up to a specified depth."),
+    Subcommand("format", "automation.utils.code_format", "Formats code files using clang-format. Supports recursive formatting."),
+    Subcommand("tidy", "automation.utils.code_tidy", "Runs clang-tidy on the project's translation units using compile_commands.json."),
+    Subcommand("conan-cache", "automation.buildkit.conan_cache", "Saves and restores the binaries of the conan dependencies in a local artifact store."),
+    Subcommand("assets", "automation.assetkit.asset_pipeline", "Bakes assets with the converter registered for each file extension."),
+    Subcommand("watch", "automation.buildkit.watch_runner", "Watches the sources and formats, builds and tests incrementally on every change."),
+    Subcommand("bench", "automation.benchmarks.bench_runner", "Benchmarks the automation tooling against stub executables and compares with a baseline."),
+)
+
+
+def find_subcommand(name):
+    for subcommand in SUBCOMMANDS:
+        if subcommand.name == name:
+            return subcommand
+    return None
+
+def selected_subcommand(argv):
+    """
+    The subcommand named on the command line, i.e. the first non-option argument naming one.
+    """
+    for argument in argv:
+        if argument == "--":
+            break
+        if not argument.startswith("-"):
+            subcommand = find_subcommand(argument)
+            if subcommand is not None:
+                return subcommand
+    return None
+
+def add_subcommands(subparsers, argv=None):
+    """
+    Add every subcommand to `subparsers`, importing only the one selected in `argv`.
+
+    Returns:
+        Subcommand: The selected subcommand, or None.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    selected = selected_subcommand(argv)
+
+    for subcommand in SUBCOMMANDS:
+        if subcommand is selected:
+            subcommand.register(subparsers)
+        else:
+            subcommand.register_placeholder(subparsers)
+
+    return selected
@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+from automation.config.project_config import ProjectConfig
+from automation.utils import code_tidy
+
+
+def _diagnostic(level):
+    return {"file": "/src/a.cpp", "line": 1, "column": 1, "level": level, "message": "message", "check": None, "details": []}
+
+
+class RunTidyExitCodeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        root = Path(self.directory.name)
+        clang_tidy_path = root / "clang-tidy"
+        clang_tidy_path.touch()
+
+        units = [{"file": "/src/a.cpp", "directory": "/src", "arguments": []},
+                 {"file": "/src/b.cpp", "directory": "/src", "arguments": []}]
+
+        patches = [
+            mock.patch.object(ProjectConfig, "CACHE_DIR", root),
+            mock.patch.object(code_tidy, "find_compile_commands", return_value=root / "compile_commands.json"),
+            mock.patch.object(code_tidy, "load_translation_units", return_value=units),
+            mock.patch.object(code_tidy, "get_executable_path", return_value=clang_tidy_path),
+            # Threads see the patched _tidy_unit, worker processes would run the real one
+            mock.patch.object(code_tidy, "ProcessPoolExecutor", ThreadPoolExecutor),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _run_tidy(self, results):
+        def tidy_unit(clang_tidy_path, build_path, unit, context, cached):
+            result = results[unit["file"]]
+            if isinstance(result, Exception):
+                raise result
+            return dict(result, key=unit["file"], cached=False)
+
+        with mock.patch.object(code_tidy, "_tidy_unit", side_effect=tidy_unit):
+            return code_tidy.run_tidy(use_cache=False)
+
+    def test_warnings_only(self):
+        self.assertEqual(self._run_tidy({
+            "/src/a.cpp": {"diagnostics": [_diagnostic("warning")], "success": True},
+            "/src/b.cpp": {"diagnostics": [], "success": True},
+        }), 0)
+
+    def test_error_diagnostic(self):
+        self.assertEqual(self._run_tidy({
+            "/src/a.cpp": {"diagnostics": [_diagnostic("error")], "success": True},
+            "/src/b.cpp": {"diagnostics": [], "success": True},
+        }), 1)
+
+    def test_failed_unit(self):
+        self.assertEqual(self._run_tidy({
+            "/src/a.cpp": {"diagnostics": [], "success": True},
+            "/src/b.cpp": {"diagnostics": [], "success": False},
+        }), 1)
+
+    def test_unit_raising(self):
+        self.assertEqual(self._run_tidy({
+            "/src/a.cpp": {"diagnostics": [], "success": True},
+            "/src/b.cpp": OSError("clang-tidy crashed"),
+        }), 1)
+
+    def test_missing_compile_commands(self):
+        with mock.patch.object(code_tidy, "find_compile_commands", return_value=None):
+            self.assertEqual(code_tidy.run_tidy(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
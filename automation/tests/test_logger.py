@@ -0,0 +1,54 @@
+import json
+import logging
+import tempfile
+import unittest
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from automation.utils.logger import Logger
+
+
+def _log_from_worker(index):
+    Logger.Info(f"worker line {index}")
+    return index
+
+
+class QueuedLoggingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.json_path = Path(self.directory.name) / "log.jsonl"
+        root = logging.getLogger()
+        self.level = root.level
+        root.setLevel(logging.INFO)
+
+    def tearDown(self):
+        Logger.stop_queue()
+        logging.getLogger().setLevel(self.level)
+        self.directory.cleanup()
+
+    def _messages(self):
+        with open(self.json_path) as f:
+            return [json.loads(line)["message"] for line in f]
+
+    def test_records_reach_handlers(self):
+        Logger.start_queue(json_path=self.json_path, console_rate=0)
+        Logger.Info("main line")
+        Logger.stop_queue()
+
+        self.assertIn("main line", self._messages())
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "workers only inherit the queue when forked")
+    def test_pool_worker_records_reach_handlers(self):
+        Logger.start_queue(json_path=self.json_path, console_rate=0)
+        with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("fork")) as executor:
+            self.assertEqual(list(executor.map(_log_from_worker, range(4))), list(range(4)))
+        Logger.stop_queue()
+
+        messages = self._messages()
+        for index in range(4):
+            self.assertIn(f"worker line {index}", messages)
+
+
+if __name__ == "__main__":
+    unittest.main()
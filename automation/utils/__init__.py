@@ -1,9 +1,25 @@
 # common/python/__init__.py
 
-from .logger import Logger
-from .shell_utils import run_command
-from .file_utils import clean
-from .platform_utils import Platform
-from .print_tree import print_tree
+import importlib
 
-__all__ = ["Logger", "run_command", "clean", "Platform", "print_tree"]
+# Exports are imported on first access, importing a lightweight submodule such as
+# automation.utils.logger must not pull in asyncio through shell_utils
+_EXPORTS = {
+    "Logger": ".logger",
+    "run_command": ".shell_utils",
+    "run_commands": ".shell_utils",
+    "clean": ".file_utils",
+    "Platform": ".platform_utils",
+    "print_tree": ".print_tree",
+}
+
+__all__ = ["Logger", "run_command", "run_commands", "clean", "Platform", "print_tree"]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
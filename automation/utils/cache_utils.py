@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+
+from automation.utils.logger import Logger
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    An exclusive inter-process lock held on a lock file.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    def acquire(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+b")
+
+        if os.name == "nt":
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+
+    def release(self):
+        if self._file is None:
+            return
+
+        try:
+            if os.name == "nt":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+def atomic_write_text(path, text, encoding="utf-8"):
+    """
+    Write text to a file so that readers only ever observe the old or the new content.
+
+    Args:
+        path (str | Path): Destination file.
+        text (str): Content to write.
+        encoding (str): Text encoding.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 digest of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, previous=None):
+    """
+    Fingerprint a file by content, reusing a previous digest while its size and mtime are unchanged.
+
+    Args:
+        path (str | Path): The file to fingerprint.
+        previous (dict or None): A fingerprint returned by an earlier call for the same file.
+
+    Returns:
+        dict: {"mtime_ns": int, "size": int, "digest": str}
+    """
+    stat = os.stat(path)
+
+    if previous and previous.get("mtime_ns") == stat.st_mtime_ns and previous.get("size") == stat.st_size:
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "digest": previous["digest"]}
+
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "digest": hash_file(path)}
+
+
+class JsonStore:
+    """
+    A JSON document on disk that several processes can read and update concurrently.
+
+    Writers serialize on a lock file and replace the document atomically,
+    so readers never need the lock.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            Logger.Warning(f"Ignoring unreadable cache {self.path}: {e}")
+            return {}
+
+        return data if isinstance(data, dict) else {}
+
+    def update(self, updater):
+        """
+        Read-modify-write the document under the lock.
+
+        Args:
+            updater (callable): Receives the current document (dict) and modifies it in place.
+
+        Returns:
+            dict: The document as written.
+        """
+        with self.lock:
+            data = self.load()
+            updater(data)
+            atomic_write_text(self.path, json.dumps(data, separators=(",", ":")))
+
+        return data
@@ -1,19 +1,174 @@
 import os
 import sys
+import time
 import argparse
+from itertools import repeat
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 automation_package_location = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(automation_package_location))
 
+from automation.config.project_config import ProjectConfig
 from automation.environment.venv_helper import get_executable_path
 from automation.utils.logger import Logger
-from automation.utils.shell_utils import run_command
+from automation.utils.shell_utils import run_command, ShellCommand
+from automation.utils.cache_utils import JsonStore, file_fingerprint, hash_bytes
 
-def run_clang_format_command(command_args, *, check=True):
+
+SOURCE_EXTENSIONS = ('.cpp', '.h', '.c', '.hpp', '.cc')
+
+# Upper bound on files per clang-format invocation, keeps command lines well below OS limits.
+DEFAULT_BATCH_SIZE = 64
+
+CLANG_FORMAT_CONFIG_NAMES = ('.clang-format', '_clang-format')
+
+
+class FormatCache:
+    """
+    Persistent record of files that are already formatted.
+
+    Each entry stores the file's content fingerprint together with the hash of
+    the effective style and the clang-format version, a file is only considered
+    formatted while all three still match.
+    """
+
+    def __init__(self, cache_path, clang_format_path, style):
+        self.store = JsonStore(cache_path)
+        self.style = style
+
+        data = self.store.load()
+        self.entries = data.get("files", {})
+        self.tools = data.get("tools", {})
+
+        self.tool_key, self.tool_version = self._detect_tool_version(clang_format_path)
+        self._style_hashes = {}
+        self._style_files = {}
+        self._updates = {}
+
+    def stale_files(self, files):
+        """
+        Filter `files` down to the ones that need formatting.
+        """
+        stale = []
+        for file_path in files:
+            key = self._key(file_path)
+            entry = self.entries.get(key)
+            fingerprint = file_fingerprint(file_path, entry)
+            style_hash = self._style_hash(file_path)
+
+            if (entry
+                    and entry.get("digest") == fingerprint["digest"]
+                    and entry.get("style") == style_hash
+                    and entry.get("tool") == self.tool_version):
+                if entry.get("mtime_ns") != fingerprint["mtime_ns"]:
+                    # Touched but unchanged, refresh the stat info so the next run skips hashing
+                    self._updates[key] = dict(entry, **fingerprint)
+                continue
+
+            stale.append(file_path)
+
+        return stale
+
+    def record(self, files):
+        """
+        Mark freshly formatted files as up to date.
+        """
+        for file_path in files:
+            entry = file_fingerprint(file_path)
+            entry["style"] = self._style_hash(file_path)
+            entry["tool"] = self.tool_version
+            self._updates[self._key(file_path)] = entry
+
+    def save(self):
+        """
+        Merge the recorded entries into the on-disk cache.
+        """
+        if not self._updates and self.tools.get(self.tool_key) == self.tool_version:
+            return
+
+        updates = self._updates
+        tool_key, tool_version = self.tool_key, self.tool_version
+
+        def merge(data):
+            data.setdefault("files", {}).update(updates)
+            data["tools"] = {tool_key: tool_version}
+
+        self.store.update(merge)
+        self._updates = {}
+
+    @staticmethod
+    def _key(file_path):
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def _detect_tool_version(self, clang_format_path):
+        """
+        Identify the clang-format binary, only running it when the binary itself changed.
+        """
+        stat = os.stat(clang_format_path)
+        tool_key = f"{clang_format_path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+        if tool_key in self.tools:
+            return tool_key, self.tools[tool_key]
+
+        _, version, _ = run_command([str(clang_format_path), "--version"], check=False)
+        return tool_key, version.strip()
+
+    def _style_hash(self, file_path):
+        """
+        Hash the effective style, including the .clang-format file clang-format would pick.
+        """
+        if self.style.startswith("file:"):
+            config_path = self.style[len("file:"):]
+        elif self.style == "file":
+            config_path = self._find_style_file(os.path.dirname(os.path.abspath(file_path)))
+        else:
+            config_path = None
+
+        if config_path in self._style_hashes:
+            return self._style_hashes[config_path]
+
+        content = self.style.encode("utf-8")
+        if config_path:
+            try:
+                with open(config_path, "rb") as f:
+                    content += b"\0" + f.read()
+            except OSError:
+                pass
+
+        style_hash = hash_bytes(content)
+        self._style_hashes[config_path] = style_hash
+        return style_hash
+
+    def _find_style_file(self, directory):
+        if directory in self._style_files:
+            return self._style_files[directory]
+
+        config_path = None
+        for name in CLANG_FORMAT_CONFIG_NAMES:
+            candidate = os.path.join(directory, name)
+            if os.path.isfile(candidate):
+                config_path = candidate
+                break
+
+        if config_path is None:
+            parent = os.path.dirname(directory)
+            if parent != directory:
+                config_path = self._find_style_file(parent)
+
+        self._style_files[directory] = config_path
+        return config_path
+
+
+def make_clang_format_command(command_args):
     """
+    Build a clang-format command using the clang-format of the virtual environment.
+
     Args:
-        command_args (list): List of arguments for the clang-format command.
+        command_args (str or list): Arguments for the clang-format command.
+
+    Returns:
+        ShellCommand: The command, ready for `run_command` or `run_commands`.
     """
     if isinstance(command_args, str):
         # Split string into list for processing
@@ -34,44 +189,164 @@ def run_clang_format_command(command_args, *, check=True):
     else:
         command_parts.insert(0, str(clang_format_path))
 
-    return run_command(command_parts, check=check)
+    return ShellCommand(command_parts)
 
-def format_code(path, style="file", recursive=False):
+def run_clang_format_command(command_args, *, check=True):
+    """
+    Args:
+        command_args (list): List of arguments for the clang-format command.
+    """
+    return run_command(make_clang_format_command(command_args), check=check)
+
+def format_code(path, style="file", recursive=False, jobs=1, batch_size=DEFAULT_BATCH_SIZE, use_cache=True, clang_format_path=None):
     """
     Format code files using clang-format.
 
+    Files are split into batches, each batch is formatted by a single clang-format
+    invocation and batches are distributed across a process pool.
+
     Args:
         path (str): The file or directory to format.
-        style (str): The clang-format style to use (default: "Google").
+        style (str): The clang-format style to use (default: "file").
         recursive (bool): Whether to recursively format files in a directory.
+        jobs (int): Number of parallel clang-format processes, 0 or None uses the CPU count.
+        batch_size (int): Maximum number of files passed to one clang-format invocation.
+        use_cache (bool): Skip files the format cache records as already formatted.
+        clang_format_path (str or None): The clang-format to run instead of the virtual environment's one.
+
+    Returns:
+        list: (file_path, reason) tuples for files that failed to format.
     """
     if not os.path.exists(path):
         Logger.Error(f"Path not found: {path}")
-        return
+        return []
+
+    if not os.path.isfile(path) and not os.path.isdir(path):
+        Logger.Error(f"Invalid path: {path}")
+        return []
+
+    files = collect_source_files(path, recursive)
+    if not files:
+        Logger.Info(f"No source files to format in: {path}")
+        return []
+
+    if clang_format_path is None:
+        clang_format_path = get_executable_path("clang-format")
+    if clang_format_path == None:
+        raise FileNotFoundError("clang-format was not found.")
+
+    start_time = time.perf_counter()
+    cache = None
+    total_files = len(files)
+
+    if use_cache:
+        cache = FormatCache(ProjectConfig.CACHE_DIR / "format_cache.json", clang_format_path, style)
+        files = cache.stale_files(files)
+        Logger.Info(f"Format cache: {total_files - len(files)}/{total_files} files up to date")
 
+        if not files:
+            cache.save()
+            return []
+
+    jobs = resolve_jobs(jobs)
+    batches = _split_batches(files, jobs, batch_size)
+    failures = []
+
+    if jobs == 1 or len(batches) == 1:
+        for batch in batches:
+            failures.extend(_format_batch(clang_format_path, batch, style))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(batches))) as executor:
+            for batch_failures in executor.map(_format_batch, repeat(clang_format_path), batches, repeat(style)):
+                failures.extend(batch_failures)
+
+    if cache:
+        failed_files = {file_path for file_path, _ in failures}
+        cache.record([file_path for file_path in files if file_path not in failed_files])
+        cache.save()
+
+    elapsed = time.perf_counter() - start_time
+    Logger.Info(f"Formatted {len(files) - len(failures)}/{len(files)} files in {elapsed:.2f}s "
+                f"({len(batches)} batches, {jobs} jobs)")
+
+    for file_path, reason in failures:
+        Logger.Error(f"Failed to format {file_path}: {reason}")
+
+    return failures
+
+def collect_source_files(path, recursive=False):
+    """
+    Collect the source files below `path` that clang-format should process.
+
+    Args:
+        path (str): A source file or a directory.
+        recursive (bool): Whether to descend into subdirectories.
+
+    Returns:
+        list: Sorted list of file paths.
+    """
     if os.path.isfile(path):
-        _format_file(path, style)
-    elif os.path.isdir(path):
-        if recursive:
-            for root, _, files in os.walk(path):
-                for file in files:
-                    if file.endswith(('.cpp', '.h', '.c', '.hpp', '.cc')):
-                        _format_file(os.path.join(root, file), style)
-        else:
-            for file in os.listdir(path):
-                full_path = os.path.join(path, file)
-                if os.path.isfile(full_path) and file.endswith(('.cpp', '.h', '.c', '.hpp', '.cc')):
-                    _format_file(full_path, style)
+        return [path]
+
+    files = []
+    if recursive:
+        for root, _, names in os.walk(path):
+            files.extend(os.path.join(root, name) for name in names if name.endswith(SOURCE_EXTENSIONS))
     else:
-        Logger.Error(f"Invalid path: {path}")
+        with os.scandir(path) as entries:
+            files.extend(entry.path for entry in entries if entry.is_file() and entry.name.endswith(SOURCE_EXTENSIONS))
+
+    return sorted(files)
+
+def resolve_jobs(jobs):
+    """Translate the --jobs value into a worker count, 0 or None meaning one per CPU."""
+    if not jobs or jobs < 0:
+        return os.cpu_count() or 1
+    return jobs
+
+def _split_batches(files, jobs, batch_size):
+    """
+    Split files into batches, aiming for several batches per worker so that
+    slow files do not leave the other workers idle.
+    """
+    per_batch = -(-len(files) // (jobs * 4))
+    per_batch = max(1, min(batch_size, per_batch))
+    return [files[i:i + per_batch] for i in range(0, len(files), per_batch)]
+
+def _format_batch(clang_format_path, files, style):
+    """
+    Format a batch of files with a single clang-format invocation.
+
+    When the batch fails, files are retried one by one so failures can be reported per file.
+
+    Returns:
+        list: (file_path, reason) tuples for files that failed to format.
+    """
+    Logger.Info(f"Formatting {len(files)} files: {files[0]}{' ...' if len(files) > 1 else ''}")
 
-def _format_file(file_path, style):
-    """Helper function to format a single file using clang-format."""
+    success, reason = _run_clang_format(clang_format_path, files, style)
+    if success:
+        return []
+
+    if len(files) == 1:
+        return [(files[0], reason)]
+
+    failures = []
+    for file_path in files:
+        success, reason = _run_clang_format(clang_format_path, [file_path], style)
+        if not success:
+            failures.append((file_path, reason))
+
+    return failures
+
+def _run_clang_format(clang_format_path, files, style):
+    """Helper function to format files in place, returns (success, reason)."""
     try:
-        Logger.Info(f"Formatting: {file_path}")
-        run_clang_format_command(f"clang-format -i {file_path} --style={style}")
+        success, _, stderr = run_command([str(clang_format_path), "-i", f"--style={style}", *files], check=False)
     except Exception as e:
-        Logger.Error(f"Failed to format {file_path}: {e}")
+        return False, str(e)
+
+    return success, stderr or "clang-format exited with a non-zero code"
 
 def _create_parser(parent_parser=None):
     description = "Formats code files using clang-format. Supports recursive formatting."
@@ -96,6 +371,24 @@ def _create_parser(parent_parser=None):
         action="store_true",
         help="Recursively format files in a directory."
     )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Number of parallel clang-format processes (default: the CPU count)."
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Format every file, ignoring the format cache."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Maximum number of files per clang-format invocation (default: {DEFAULT_BATCH_SIZE})."
+    )
 
     return parser
 
@@ -105,7 +398,7 @@ def register_subcommand(parent_parser):
     """
     parser = _create_parser(parent_parser)
 
-    parser.set_defaults(func=lambda args: format_code(os.path.normpath(args.path), args.style, args.recursive))
+    parser.set_defaults(func=lambda args: format_code(os.path.normpath(args.path), args.style, args.recursive, args.jobs, args.batch_size, args.use_cache))
 
 def main():
     """
@@ -116,7 +409,7 @@ def main():
     args = parser.parse_args()
 
     if args.path:
-        format_code(args.path, args.style, args.recursive)
+        format_code(args.path, args.style, args.recursive, args.jobs, args.batch_size, args.use_cache)
     else:
         parser.print_help()
 
@@ -0,0 +1,358 @@
+import os
+import re
+import sys
+import json
+import time
+import shlex
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+automation_package_location = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(automation_package_location))
+
+from automation.config.project_config import ProjectConfig
+from automation.environment.venv_helper import get_executable_path
+from automation.buildkit.conan_helper import get_conan_build_folder
+from automation.utils.logger import Logger
+from automation.utils.shell_utils import run_command
+from automation.utils.cache_utils import JsonStore, hash_bytes
+from automation.utils.code_format import resolve_jobs
+
+
+CLANG_TIDY_CONFIG_NAME = ".clang-tidy"
+
+DIAGNOSTIC_PATTERN = re.compile(
+    r"^(?P<file>.+?):(?P<line>\d+):(?P<column>\d+): (?P<level>warning|error): (?P<message>.*?)(?: \[(?P<check>[^\]]+)\])?$"
+)
+
+# Compiler options that write dependency files or objects, dropped when preprocessing
+_OUTPUT_OPTIONS_WITH_VALUE = {"-o", "-MF", "-MT", "-MQ"}
+_OUTPUT_OPTIONS = {"-c", "-MD", "-MMD"}
+
+# A preprocessed unit is hashed whole, output cut to its head and tail would miss changes in between
+PREPROCESSED_OUTPUT_LIMIT = 512 * 1024 * 1024
+
+
+def find_compile_commands(build_path=None):
+    """
+    Locate the compile_commands.json exported by the CMake build.
+
+    Args:
+        build_path (str or None): A build directory or the compile_commands.json itself.
+
+    Returns:
+        Path: The compile database, or None if it was not found.
+    """
+    if build_path is not None:
+        candidates = [Path(build_path), Path(build_path) / "compile_commands.json"]
+    else:
+        candidates = [get_conan_build_folder() / "compile_commands.json"]
+        if ProjectConfig.BUILD_DIR:
+            build_dir = Path(ProjectConfig.BUILD_DIR)
+            candidates.append(build_dir / "compile_commands.json")
+            candidates.extend(sorted(build_dir.glob("*/compile_commands.json")))
+
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+
+    return None
+
+def load_translation_units(compile_commands_path, paths=None):
+    """
+    Read the compile database, keeping the project's translation units below `paths`.
+
+    Returns:
+        list: Compile database entries with normalized "file" and "arguments".
+    """
+    with open(compile_commands_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+
+    roots = [os.path.abspath(path) for path in (paths or [ProjectConfig.PROJECT_ROOT])]
+
+    units = {}
+    for entry in entries:
+        directory = entry["directory"]
+        file_path = os.path.normpath(os.path.join(directory, entry["file"]))
+
+        if not any(file_path == root or file_path.startswith(root + os.sep) for root in roots):
+            continue
+
+        arguments = entry.get("arguments") or shlex.split(entry["command"], posix=os.name != "nt")
+        units[file_path] = {"directory": directory, "file": file_path, "arguments": arguments}
+
+    return [units[file_path] for file_path in sorted(units)]
+
+def run_tidy(paths=None, build_path=None, jobs=1, checks=None, use_cache=True):
+    """
+    Run clang-tidy on the translation units of the compile database.
+
+    Each unit's result is cached, keyed by its preprocessed source, its compile
+    flags, the .clang-tidy configuration and the clang-tidy version, so only
+    changed units are analyzed again. Diagnostics of all units are merged and
+    deduplicated, headers included by many units are reported once.
+
+    Args:
+        paths (list or None): Only analyze translation units below these paths.
+        build_path (str or None): The build directory or compile_commands.json to use.
+        jobs (int): Number of parallel clang-tidy processes, 0 or None uses the CPU count.
+        checks (str or None): Value for clang-tidy's --checks, overriding .clang-tidy.
+        use_cache (bool): Reuse cached results of unchanged translation units.
+
+    Returns:
+        int: 0 if every unit was analyzed without errors, 1 if clang-tidy reported an error or failed on a unit.
+    """
+    compile_commands = find_compile_commands(build_path)
+    if compile_commands is None:
+        Logger.Error("compile_commands.json not found, build the project first or pass --build-path.")
+        return 1
+
+    units = load_translation_units(compile_commands, paths)
+    if not units:
+        Logger.Info(f"No translation units to analyze in {compile_commands}")
+        return 0
+
+    clang_tidy_path = get_executable_path("clang-tidy")
+    if clang_tidy_path == None:
+        raise FileNotFoundError("clang-tidy was not found.")
+
+    stat = os.stat(clang_tidy_path)
+    context = {
+        "tool": f"{clang_tidy_path}|{stat.st_size}|{stat.st_mtime_ns}",
+        "checks": checks,
+    }
+
+    store = JsonStore(ProjectConfig.CACHE_DIR / "tidy_cache.json")
+    cached_units = store.load().get("units", {}) if use_cache else {}
+
+    jobs = resolve_jobs(jobs)
+    start_time = time.perf_counter()
+    results = {}
+    analyzed = 0
+    failures = 0
+
+    Logger.Info(f"Analyzing {len(units)} translation units from {compile_commands} with {jobs} jobs")
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(units))) as executor:
+        futures = {
+            executor.submit(_tidy_unit, clang_tidy_path, compile_commands.parent, unit, context, cached_units.get(unit["file"])): unit
+            for unit in units
+        }
+
+        for index, future in enumerate(as_completed(futures), start=1):
+            unit = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                Logger.Error(f"[{index}/{len(units)}] Failed to analyze {unit['file']}: {e}")
+                failures += 1
+                continue
+
+            results[unit["file"]] = result
+            failures += not result["success"]
+            analyzed += not result["cached"]
+            state = "cached" if result["cached"] else "analyzed"
+            Logger.Info(f"[{index}/{len(units)}] {unit['file']} ({state}, {len(result['diagnostics'])} diagnostics)")
+
+    updates = {file_path: result for file_path, result in results.items() if not result["cached"] and result["success"]}
+    if updates:
+        def merge(data):
+            data.setdefault("units", {}).update(
+                {file_path: {"key": result["key"], "diagnostics": result["diagnostics"]} for file_path, result in updates.items()}
+            )
+        store.update(merge)
+
+    diagnostics = _merge_diagnostics(result["diagnostics"] for result in results.values())
+
+    for diagnostic in diagnostics:
+        log_method = Logger.Error if diagnostic["level"] == "error" else Logger.Warning
+        log_method("\n".join([_format_diagnostic(diagnostic), *diagnostic["details"]]))
+
+    elapsed = time.perf_counter() - start_time
+    errors = sum(diagnostic["level"] == "error" for diagnostic in diagnostics)
+    Logger.Info(f"clang-tidy: {len(diagnostics)} diagnostics ({errors} errors) in {len(units)} translation units, "
+                f"{analyzed} analyzed, {len(units) - analyzed} cached, {failures} failed, {elapsed:.2f}s")
+
+    return 1 if errors or failures else 0
+
+def _tidy_unit(clang_tidy_path, build_path, unit, context, cached):
+    """
+    Analyze one translation unit unless its cache key is unchanged.
+    """
+    key = _unit_key(unit, context)
+
+    if cached and cached.get("key") == key:
+        return {"key": key, "diagnostics": cached["diagnostics"], "cached": True, "success": True}
+
+    command = [str(clang_tidy_path), "-p", str(build_path), "--quiet"]
+    if context["checks"]:
+        command.append(f"--checks={context['checks']}")
+    command.append(unit["file"])
+
+    result_success, stdout, stderr = run_command(command, check=False, log_stdout=lambda _: None, log_stderr=lambda _: None)
+
+    diagnostics = _parse_diagnostics(stdout)
+    # clang-tidy exits non-zero when it reports errors, which is a valid result, not a failed run
+    success = result_success or bool(diagnostics)
+    if not success:
+        Logger.Error(f"clang-tidy failed on {unit['file']}: {stderr}")
+
+    return {"key": key, "diagnostics": diagnostics, "cached": False, "success": success}
+
+def _unit_key(unit, context):
+    """
+    Cache key of a translation unit: preprocessed source, compile flags, .clang-tidy and tool.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([unit["arguments"], context], sort_keys=True).encode("utf-8"))
+    digest.update(_config_hash(os.path.dirname(unit["file"])).encode("utf-8"))
+    digest.update(_preprocessed_hash(unit).encode("utf-8"))
+    return digest.hexdigest()
+
+def _preprocessed_hash(unit):
+    """
+    Hash the preprocessed source so that changes in included headers invalidate the unit.
+
+    Falls back to the source file itself when the compiler cannot preprocess it.
+    """
+    arguments = []
+    skip_next = False
+    for argument in unit["arguments"]:
+        if skip_next:
+            skip_next = False
+            continue
+        if argument in _OUTPUT_OPTIONS_WITH_VALUE:
+            skip_next = True
+            continue
+        if argument in _OUTPUT_OPTIONS or argument.startswith("-o") and len(argument) > 2:
+            continue
+        arguments.append(argument)
+
+    try:
+        # Through run_command so that preprocessing takes a jobserver token like every other command
+        success, stdout, _ = run_command(arguments + ["-E"], check=False, cwd=unit["directory"], log_stdout=lambda _: None,
+                                         log_stderr=lambda _: None, output_limit=PREPROCESSED_OUTPUT_LIMIT)
+        if success:
+            return hash_bytes(stdout.encode("utf-8"))
+    except OSError:
+        pass
+
+    with open(unit["file"], "rb") as f:
+        return "source:" + hash_bytes(f.read())
+
+def _config_hash(directory):
+    """
+    Hash the .clang-tidy files that apply to `directory`, clang-tidy merges parent configurations.
+    """
+    digest = hashlib.sha256()
+    current = directory
+    while True:
+        config_path = os.path.join(current, CLANG_TIDY_CONFIG_NAME)
+        if os.path.isfile(config_path):
+            with open(config_path, "rb") as f:
+                digest.update(config_path.encode("utf-8") + b"\0" + f.read())
+
+        parent = os.path.dirname(current)
+        if parent == current:
+            return digest.hexdigest()
+        current = parent
+
+def _parse_diagnostics(output):
+    """
+    Parse clang-tidy output into diagnostics, keeping notes and code snippets as details.
+    """
+    diagnostics = []
+    for line in output.splitlines():
+        match = DIAGNOSTIC_PATTERN.match(line)
+        if match:
+            diagnostics.append({
+                "file": os.path.normpath(match["file"]),
+                "line": int(match["line"]),
+                "column": int(match["column"]),
+                "level": match["level"],
+                "message": match["message"],
+                "check": match["check"],
+                "details": [],
+            })
+        elif diagnostics:
+            diagnostics[-1]["details"].append(line)
+
+    return diagnostics
+
+def _merge_diagnostics(diagnostic_lists):
+    merged = {}
+    for diagnostics in diagnostic_lists:
+        for diagnostic in diagnostics:
+            key = (diagnostic["file"], diagnostic["line"], diagnostic["column"], diagnostic["level"], diagnostic["message"])
+            merged.setdefault(key, diagnostic)
+
+    return [merged[key] for key in sorted(merged)]
+
+def _format_diagnostic(diagnostic):
+    check = f" [{diagnostic['check']}]" if diagnostic["check"] else ""
+    return f"{diagnostic['file']}:{diagnostic['line']}:{diagnostic['column']}: {diagnostic['level']}: {diagnostic['message']}{check}"
+
+def _create_parser(parent_parser=None):
+    description = "Runs clang-tidy on the project's translation units using compile_commands.json."
+    if parent_parser is None:
+        parser = argparse.ArgumentParser(description=description)
+    else:
+        parser = parent_parser.add_parser("tidy", description=description, help=description)
+
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="*",
+        help="Only analyze translation units below these paths (default: the whole project)."
+    )
+    parser.add_argument(
+        "-p", "--build-path",
+        type=Path,
+        default=None,
+        help="The build directory containing compile_commands.json (default: the conan build folder)."
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Number of parallel clang-tidy processes (default: the CPU count)."
+    )
+    parser.add_argument(
+        "--checks",
+        type=str,
+        default=None,
+        help="clang-tidy checks to run, overriding .clang-tidy."
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Analyze every translation unit, ignoring cached results."
+    )
+
+    return parser
+
+def register_subcommand(parent_parser):
+    """
+    Add 'tidy' subcommand to the parent parser.
+    """
+    parser = _create_parser(parent_parser)
+
+    parser.set_defaults(func=lambda args: run_tidy(args.paths, args.build_path, args.jobs, args.checks, args.use_cache))
+
+def main():
+    """
+    Entry point for the script. Parses command-line arguments and calls `run_tidy`.
+    """
+    parser = _create_parser()
+
+    args = parser.parse_args()
+
+    sys.exit(run_tidy(args.paths, args.build_path, args.jobs, args.checks, args.use_cache))
+
+if __name__ == "__main__":
+    ProjectConfig.initialize()
+
+    main()
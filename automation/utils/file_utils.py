@@ -1,29 +1,56 @@
-import shutil
+import os
+import stat
+import time
+import uuid
+import queue
+import threading
 from pathlib import Path
 
 from automation.utils.logger import Logger
 
 
-def clean(target, dry_run=False):
+TRASH_MARKER = ".trash-"
+
+
+def clean(target, dry_run=False, background=False, exclude=(), jobs=None):
     """
     A general-purpose function to clean files or directories.
 
+    A directory is first renamed to a trash sibling on the same filesystem,
+    which is O(1), so the target path is free again immediately. The trash is
+    then deleted by parallel workers, in the background if requested. Trash
+    left behind by an interrupted run is swept on the next clean of the same
+    target.
+
     Args:
         target (str | Path): The path to the file or directory to clean.
         dry_run (bool): If True, only print what would be deleted without deleting.
+        background (bool): Return once the directory is renamed, deleting it on non-daemon
+            threads that the interpreter waits for at exit.
+        exclude (list): Paths inside the target to keep in place, e.g. a compiler cache.
+        jobs (int or None): Number of deletion workers, defaults to the CPU count.
 
     Returns:
-        None
+        TreeRemover or None: The removal of the directory, if one was started.
     """
     target_path = Path(target).resolve()
+    excluded = _excluded_paths(target_path, exclude)
+
+    if excluded is None:
+        Logger.Info(f"Target is excluded, nothing to clean: {target_path}")
+        return None
+
+    if not dry_run:
+        sweep_trash(target_path, jobs=jobs)
 
     if not target_path.exists():
         Logger.Info(f"Target does not exist, nothing to clean: {target_path}")
-        return
+        return None
 
     if dry_run:
-        Logger.Info(f"Would remove: {target_path}")
-        return
+        kept = f" (keeping {', '.join(map(str, excluded))})" if excluded else ""
+        Logger.Info(f"Would remove: {target_path}{kept}")
+        return None
 
     if target_path.is_file():
         try:
@@ -31,11 +58,236 @@ def clean(target, dry_run=False):
             Logger.Info(f"File removed: {target_path}")
         except Exception as e:
             Logger.Error(f"Failed to remove file: {target_path}. Reason: {e}")
-    elif target_path.is_dir():
-        try:
-            shutil.rmtree(target_path)
-            Logger.Info(f"Directory removed: {target_path}")
-        except Exception as e:
-            Logger.Error(f"Failed to remove directory: {target_path}. Reason: {e}")
-    else:
+        return None
+    elif not target_path.is_dir():
         Logger.Warn(f"Target is neither a file nor a directory: {target_path}")
+        return None
+
+    try:
+        trash_path = _move_to_trash(target_path, excluded)
+    except OSError as e:
+        # Renaming fails e.g. when a file is held open on Windows, delete in place
+        Logger.Warning(f"Cannot move {target_path} aside ({e}), deleting it in place")
+        remover = TreeRemover(target_path, jobs=jobs, keep=excluded)
+        remover.start()
+        remover.wait()
+        return remover
+
+    remover = TreeRemover(trash_path, jobs=jobs)
+    remover.start()
+
+    if background:
+        Logger.Info(f"Directory removed: {target_path} (deleting {trash_path.name} in the background)")
+    else:
+        remover.wait()
+        Logger.Info(f"Directory removed: {target_path}")
+
+    return remover
+
+def sweep_trash(target, jobs=None):
+    """
+    Delete, in the background, trash siblings of `target` left behind by interrupted cleans.
+    """
+    target_path = Path(target).resolve()
+    prefix = f".{target_path.name}{TRASH_MARKER}"
+
+    try:
+        siblings = [entry for entry in os.scandir(target_path.parent) if entry.name.startswith(prefix)]
+    except OSError:
+        return
+
+    for entry in siblings:
+        pid = entry.name[len(prefix):].split("-", 1)[0]
+        if pid.isdigit() and _is_process_alive(int(pid)):
+            # Still being deleted by a running clean
+            continue
+
+        Logger.Info(f"Removing leftover trash: {entry.path}")
+        remover = TreeRemover(Path(entry.path), jobs=jobs)
+        remover.start()
+
+def _excluded_paths(target_path, exclude):
+    """
+    Resolve `exclude` to paths relative to the target, returns None if the target itself is excluded.
+    """
+    excluded = []
+    for path in exclude or ():
+        path = Path(path)
+        if not path.is_absolute():
+            path = target_path / path
+        path = path.resolve()
+
+        if path == target_path or path in target_path.parents:
+            return None
+        if target_path in path.parents:
+            excluded.append(path.relative_to(target_path))
+
+    # Nested exclusions are kept along with their parent
+    return [path for path in sorted(set(excluded)) if not any(other in path.parents for other in excluded)]
+
+def _move_to_trash(target_path, excluded):
+    """
+    Rename the target to a trash sibling, then move the excluded subtrees back into a fresh target.
+    """
+    trash_path = target_path.with_name(f".{target_path.name}{TRASH_MARKER}{os.getpid()}-{uuid.uuid4().hex[:8]}")
+    os.rename(target_path, trash_path)
+
+    if excluded:
+        target_path.mkdir()
+        for relative_path in excluded:
+            source = trash_path / relative_path
+            if source.exists() or source.is_symlink():
+                destination = target_path / relative_path
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(source, destination)
+
+    return trash_path
+
+def _is_process_alive(pid):
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        return False
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+class _Directory:
+    def __init__(self, path, parent):
+        self.path = path
+        self.parent = parent
+        # The scan of the directory itself plus one per subdirectory not yet removed
+        self.pending = 1
+        # Whether an excluded entry below it stays, so the directory itself must stay too
+        self.kept = False
+
+
+class TreeRemover:
+    """
+    Deletes a directory tree with parallel os.scandir-based workers.
+
+    Workers share a queue of directories: each one unlinks the files of a
+    directory and queues its subdirectories, and a directory is removed once
+    its scan and all of its subdirectories are done. Worker threads are not
+    daemons, so an exiting interpreter waits for the deletion to finish.
+    """
+
+    def __init__(self, path, jobs=None, keep=()):
+        self.path = Path(path)
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.keep = {self.path / relative_path for relative_path in keep}
+        self.errors = []
+        self.removed_files = 0
+        self.elapsed = None
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._threads = []
+        self._start_time = None
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        self._queue.put(_Directory(self.path, None))
+
+        for index in range(self.jobs):
+            thread = threading.Thread(target=self._worker, name=f"clean-{self.path.name}-{index}", daemon=False)
+            thread.start()
+            self._threads.append(thread)
+
+    def wait(self):
+        for thread in self._threads:
+            thread.join()
+
+        if self.errors:
+            Logger.Warning(f"Failed to remove {len(self.errors)} entries below {self.path}, first: {self.errors[0]}")
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def _worker(self):
+        while True:
+            directory = self._queue.get()
+            if directory is None:
+                return
+            self._scan(directory)
+
+    def _scan(self, directory):
+        removed_files = 0
+        try:
+            with os.scandir(directory.path) as entries:
+                for entry in entries:
+                    path = Path(entry.path)
+                    if path in self.keep:
+                        self._keep_parents(directory)
+                        continue
+
+                    if entry.is_dir(follow_symlinks=False):
+                        with self._lock:
+                            directory.pending += 1
+                        self._queue.put(_Directory(path, directory))
+                    else:
+                        self._unlink(path)
+                        removed_files += 1
+        except OSError as e:
+            self._record_error(directory.path, e)
+
+        with self._lock:
+            self.removed_files += removed_files
+
+        self._finish(directory)
+
+    def _finish(self, directory):
+        while directory is not None:
+            with self._lock:
+                directory.pending -= 1
+                if directory.pending > 0:
+                    return
+
+            if not directory.kept:
+                try:
+                    os.rmdir(directory.path)
+                except OSError as e:
+                    self._record_error(directory.path, e)
+
+            if directory.parent is None:
+                self.elapsed = time.perf_counter() - self._start_time
+                self._done.set()
+                # One stop marker per worker, including workers start() has not launched yet
+                for _ in range(self.jobs):
+                    self._queue.put(None)
+                return
+
+            directory = directory.parent
+
+    def _keep_parents(self, directory):
+        with self._lock:
+            while directory is not None and not directory.kept:
+                directory.kept = True
+                directory = directory.parent
+
+    def _unlink(self, path):
+        try:
+            os.unlink(path)
+        except PermissionError:
+            # Read-only files cannot be deleted on Windows
+            try:
+                os.chmod(path, stat.S_IWRITE)
+                os.unlink(path)
+            except OSError as e:
+                self._record_error(path, e)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self._record_error(path, e)
+
+    def _record_error(self, path, error):
+        with self._lock:
+            self.errors.append(f"{path}: {error}")
@@ -0,0 +1,264 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+
+
+# inotify event flags, see <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Directories never watched, build trees and tool caches produce events that are not edits
+IGNORED_DIRECTORIES = ("CMakeFiles", "__pycache__")
+
+
+class FileWatcher:
+    """
+    Reports files changed below a set of directories.
+    """
+
+    def __init__(self, roots):
+        self.roots = [Path(root).resolve() for root in roots if Path(root).is_dir()]
+
+    def read(self, timeout=None):
+        """
+        Wait up to `timeout` seconds for changes.
+
+        Returns:
+            set: Paths created, modified, moved or deleted since the last call, empty on timeout.
+        """
+        raise NotImplementedError
+
+    def wait_for_changes(self, quiet_period=0.2, timeout=None):
+        """
+        Block until something changes, then collect changes until none arrived for `quiet_period` seconds.
+
+        Editors and formatters touch files in bursts (write a temporary file,
+        rename it, update a backup), the burst is returned as one batch.
+
+        Returns:
+            set: The changed paths, empty if `timeout` expired first.
+        """
+        changes = self.read(timeout)
+        if not changes:
+            return changes
+
+        while True:
+            more = self.read(quiet_period)
+            if not more:
+                return changes
+            changes |= more
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    Linux inotify through ctypes, one watch per directory, new directories are watched as they appear.
+    """
+
+    def __init__(self, roots):
+        super().__init__(roots)
+        self.libc = _load_libc()
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.directories = {}
+        for root in self.roots:
+            self._watch_tree(root)
+
+    @staticmethod
+    def is_supported():
+        return sys.platform.startswith("linux") and _load_libc() is not None
+
+    def read(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        # Some events change nothing reportable (an empty directory appeared), keep waiting for one that does
+        while True:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return set()
+
+            changes = self._read_events()
+            if changes:
+                return changes
+
+    def _read_events(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changes = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, report the roots so the caller treats everything as changed
+                changes.update(self.roots)
+                continue
+
+            directory = self.directories.get(wd)
+            if mask & IN_IGNORED:
+                self.directories.pop(wd, None)
+                continue
+            if directory is None or not name:
+                continue
+
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files written into the new directory before the watch existed are reported by the scan
+                    changes.update(self._watch_tree(path))
+                elif mask & IN_MOVED_FROM:
+                    # The files moved away with it, their watches would keep reporting the old paths
+                    self._unwatch_tree(path)
+                    changes.add(path)
+                continue
+
+            changes.add(path)
+
+        return changes
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def _watch_tree(self, root):
+        """
+        Watch `root` and its subdirectories, returning the files already in them.
+        """
+        files = set()
+        for directory, dirs, names in os.walk(root):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in IGNORED_DIRECTORIES]
+
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOSPC:
+                    raise OSError(error, "inotify watch limit reached, raise fs.inotify.max_user_watches")
+                continue
+
+            self.directories[wd] = Path(directory)
+            files.update(Path(directory) / name for name in names)
+
+        return files
+
+    def _unwatch_tree(self, root):
+        for wd, directory in list(self.directories.items()):
+            if directory == root or directory.is_relative_to(root):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.directories[wd]
+
+
+class PollingWatcher(FileWatcher):
+    """
+    Portable fallback comparing size and mtime of every file at a fixed interval.
+    """
+
+    def __init__(self, roots, interval=0.5):
+        super().__init__(roots)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def read(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            current = self._scan()
+            changes = {path for path in self.snapshot.keys() | current.keys() if self.snapshot.get(path) != current.get(path)}
+            self.snapshot = current
+            if changes:
+                return changes
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+
+    def _scan(self):
+        snapshot = {}
+        pending = list(self.roots)
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in IGNORED_DIRECTORIES:
+                                pending.append(entry.path)
+                            continue
+                        try:
+                            stat = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        snapshot[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+
+        return snapshot
+
+
+def create_watcher(roots, polling=False, interval=0.5):
+    """
+    An inotify watcher on Linux, a polling watcher elsewhere or when `polling` is set.
+    """
+    if not polling and InotifyWatcher.is_supported():
+        try:
+            return InotifyWatcher(roots)
+        except OSError:
+            pass
+
+    return PollingWatcher(roots, interval)
+
+
+_libc = None
+
+def _load_libc():
+    global _libc
+    if _libc is None and sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            _libc = libc
+        except (OSError, AttributeError):
+            return None
+    return _libc
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from automation.utils.shell_utils import run_command
+
+
+def changed_files(since="HEAD", cwd=None):
+    """
+    Files that differ between `since` and the working tree, untracked files included.
+
+    Renames are reported as a deletion and an addition, so both paths are listed.
+
+    Args:
+        since (str): A git revision, e.g. "HEAD" or "origin/main".
+        cwd (str or Path or None): A directory inside the repository, defaults to the current directory.
+
+    Returns:
+        list: Sorted absolute Paths, deleted files included.
+
+    Raises:
+        RuntimeError: If git fails, e.g. because `since` is not a valid revision.
+    """
+    top_level = _git(["rev-parse", "--show-toplevel"], cwd).strip()
+    root = Path(top_level)
+
+    names = set(_git(["diff", "--name-only", "--no-renames", "-z", since, "--"], root).split("\0"))
+    names.update(_git(["ls-files", "--others", "--exclude-standard", "-z"], root).split("\0"))
+    names.discard("")
+
+    return sorted(root / name for name in names)
+
+def _git(arguments, cwd):
+    success, stdout, stderr = run_command(["git", *arguments], cwd=str(cwd) if cwd else None, log_stdout=lambda _: None, log_stderr=lambda _: None)
+    if not success:
+        raise RuntimeError(f"`git {' '.join(arguments)}` failed: {stderr.strip()}")
+    return stdout
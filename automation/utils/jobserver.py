@@ -0,0 +1,294 @@
+import os
+import re
+import sys
+import stat
+import shutil
+import asyncio
+import tempfile
+import threading
+import subprocess
+import contextlib
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+
+from automation.utils.logger import Logger
+
+
+TOKEN = b"+"
+
+# Stands for the token a joined process owns without reading it from the pool
+IMPLICIT_TOKEN = b""
+
+_JOBSERVER_AUTH_PATTERN = re.compile(r"--jobserver-(?:auth|fds)=(\S+)")
+
+
+class Jobserver(ABC):
+    """
+    A pool of job tokens shared by the commands of this process and its children.
+
+    A command holds one token while it runs. Processes that joined through
+    MAKEFLAGS own one implicit token, like GNU make does, since the process that
+    started them holds a token on their behalf.
+    """
+
+    def __init__(self, jobs, implicit_token=False):
+        self.jobs = jobs
+        # The implicit token only belongs to the process that joined, not to pool workers forked from it
+        self.implicit_pid = os.getpid() if implicit_token else None
+        self.implicit_free = implicit_token
+
+    async def acquire(self):
+        """
+        Wait for a free token.
+
+        Returns:
+            bytes: The token to hand back to `release`.
+        """
+        if self.implicit_free and self.implicit_pid == os.getpid():
+            self.implicit_free = False
+            return IMPLICIT_TOKEN
+
+        return await self._acquire()
+
+    def release(self, token):
+        if token == IMPLICIT_TOKEN:
+            self.implicit_free = True
+        else:
+            self._release(token)
+
+    def environment(self):
+        """
+        Environment variables that let child processes join the pool, empty if they cannot.
+        """
+        return {}
+
+    def close(self):
+        pass
+
+    @abstractmethod
+    async def _acquire(self):
+        """
+        Wait for a token from the pool.
+        """
+
+    @abstractmethod
+    def _release(self, token):
+        """
+        Return a token taken by `_acquire` to the pool.
+        """
+
+
+class FifoJobserver(Jobserver):
+    """
+    The GNU make jobserver protocol on a named pipe holding one byte per free token.
+
+    Tokens are taken with non-blocking reads when the pipe becomes readable on
+    the event loop running the commands, so waiting never blocks other commands.
+    """
+
+    def __init__(self, jobs, path, fd, write_fd=None, owner=False, implicit_token=False):
+        super().__init__(jobs, implicit_token)
+        self.path = path
+        self.fd = fd
+        # A named pipe is read and written through one descriptor, an inherited anonymous pipe has two
+        self.write_fd = fd if write_fd is None else write_fd
+        self.owner = owner
+        # Commands waiting for a token, per event loop
+        self.waiters = {}
+
+    @classmethod
+    def create(cls, jobs):
+        directory = Path(tempfile.mkdtemp(prefix="aether-jobserver-"))
+        path = directory / "fifo"
+        os.mkfifo(path, 0o600)
+        fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+
+        # Every child is started with a token, so the pool holds all of them and this process holds none
+        os.write(fd, TOKEN * jobs)
+        return cls(jobs, path, fd, owner=True)
+
+    @classmethod
+    def attach(cls, auth, jobs):
+        """
+        Join the jobserver described by a --jobserver-auth value, "fifo:PATH" or "R,W" inherited descriptors.
+        """
+        if auth.startswith("fifo:"):
+            path = Path(auth[len("fifo:"):])
+            fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+            return cls(jobs, path, fd, implicit_token=True)
+
+        read_fd, write_fd = (int(value) for value in auth.split(","))
+        # A make that did not pass its pipe leaves the numbers pointing at whatever else is open
+        if not all(stat.S_ISFIFO(os.fstat(fd).st_mode) for fd in (read_fd, write_fd)):
+            raise ValueError(f"descriptors {auth} are not a pipe")
+        os.set_blocking(read_fd, False)
+        return cls(jobs, None, read_fd, write_fd, implicit_token=True)
+
+    def environment(self):
+        if self.path is None or not fifo_supported():
+            return {}
+        return {"MAKEFLAGS": f"-j{self.jobs} --jobserver-auth=fifo:{self.path}"}
+
+    async def _acquire(self):
+        token = self._read()
+        if token is not None:
+            return token
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        waiters = self.waiters.setdefault(loop, deque())
+        waiters.append(waiter)
+        if len(waiters) == 1:
+            loop.add_reader(self.fd, self._on_readable, loop)
+
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(waiter.result())
+            raise
+
+    def release(self, token):
+        if token == IMPLICIT_TOKEN:
+            # Commands already waiting only watch the pipe, hand the implicit token to the first of them
+            waiters = self.waiters.get(asyncio.get_running_loop(), ())
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(token)
+                    return
+
+        super().release(token)
+
+    def _release(self, token):
+        os.write(self.write_fd, token)
+
+    def _read(self):
+        try:
+            return os.read(self.fd, 1) or None
+        except BlockingIOError:
+            # Another process took the token first
+            return None
+
+    def _on_readable(self, loop):
+        waiters = self.waiters[loop]
+        while waiters:
+            if waiters[0].done():
+                waiters.popleft()
+                continue
+
+            token = self._read()
+            if token is None:
+                return
+            waiters.popleft().set_result(token)
+
+        loop.remove_reader(self.fd)
+
+    def close(self):
+        if self.fd is None:
+            return
+
+        os.close(self.fd)
+        self.fd = None
+        if self.owner:
+            # Children still running lose nothing, they opened the pipe by its path
+            shutil.rmtree(self.path.parent, ignore_errors=True)
+
+
+class SemaphoreJobserver(Jobserver):
+    """
+    Fallback where named pipes are not available, tokens are shared by the commands of this process only.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, jobs):
+        super().__init__(jobs)
+        self.semaphore = threading.Semaphore(jobs)
+
+    async def _acquire(self):
+        while not self.semaphore.acquire(blocking=False):
+            await asyncio.sleep(self.POLL_INTERVAL)
+        return TOKEN
+
+    def _release(self, token):
+        self.semaphore.release()
+
+
+_active = None
+_attached = {}
+
+def get_jobserver():
+    """
+    The jobserver commands take tokens from: the one this process serves, or the one
+    a parent advertised in MAKEFLAGS, or None when running unconstrained.
+    """
+    if _active is not None:
+        return _active
+
+    makeflags = os.environ.get("MAKEFLAGS", "")
+    match = _JOBSERVER_AUTH_PATTERN.search(makeflags)
+    if match is None or sys.platform == "win32":
+        return None
+
+    if makeflags not in _attached:
+        jobs = re.search(r"(?:^|\s)-j(\d+)", makeflags)
+        try:
+            _attached[makeflags] = FifoJobserver.attach(match.group(1), int(jobs.group(1)) if jobs else 1)
+        except (OSError, ValueError) as e:
+            Logger.Warning(f"Jobserver: cannot join {match.group(1)}: {e}")
+            _attached[makeflags] = None
+
+    return _attached[makeflags]
+
+@contextlib.contextmanager
+def serve_jobserver(jobs):
+    """
+    Serve a pool of `jobs` tokens for the duration of the block.
+
+    A process that already runs under a jobserver, its own or a parent's, keeps
+    using it so that nested builds share one budget.
+    """
+    global _active
+
+    if get_jobserver() is not None:
+        yield get_jobserver()
+        return
+
+    if sys.platform == "win32":
+        jobserver = SemaphoreJobserver(jobs)
+    else:
+        jobserver = FifoJobserver.create(jobs)
+
+    _active = jobserver
+    try:
+        yield jobserver
+    finally:
+        _active = None
+        jobserver.close()
+
+_fifo_supported = None
+
+def fifo_supported():
+    """
+    Whether the make on PATH joins fifo jobservers, GNU make 4.4 and later do.
+
+    Older makes abort on a fifo --jobserver-auth, so MAKEFLAGS is only exported when this holds.
+    """
+    global _fifo_supported
+    if _fifo_supported is None:
+        _fifo_supported = False
+        make = shutil.which("make") or shutil.which("gmake")
+        if make is not None:
+            try:
+                output = subprocess.run([make, "--version"], capture_output=True, text=True, timeout=10).stdout
+            except (OSError, subprocess.SubprocessError):
+                output = ""
+            version = re.match(r"GNU Make (\d+)\.(\d+)", output)
+            _fifo_supported = version is not None and (int(version.group(1)), int(version.group(2))) >= (4, 4)
+            if not _fifo_supported:
+                Logger.Info(f"Jobserver: {output.splitlines()[0] if output else make} cannot join fifo jobservers, "
+                            "only the automation's own commands share the tokens")
+
+    return _fifo_supported
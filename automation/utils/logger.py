@@ -1,9 +1,154 @@
+import re
+import json
+import time
+import atexit
 import logging
 import logging.config
-import json
+import logging.handlers
+import contextvars
+import multiprocessing
 from pathlib import Path
 
 
+# The command a record belongs to, shell_utils sets it while running each command
+log_job = contextvars.ContextVar("log_job", default=None)
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+# Job lines per second shown on the console in queued mode, the log files always get everything
+DEFAULT_CONSOLE_RATE = 100
+
+# Per-job log files kept open at once, older ones are reopened in append mode when needed
+MAX_OPEN_JOB_FILES = 64
+
+
+class JobFilter(logging.Filter):
+    """
+    Tags each record with the job of the context it was logged from.
+    """
+
+    def filter(self, record):
+        if not hasattr(record, "job"):
+            record.job = log_job.get()
+        return True
+
+
+class RateLimitedHandler(logging.Handler):
+    """
+    Passes at most `rate` job records per second to `handler`, warnings, errors and records outside jobs always pass.
+
+    Dropped records are counted and reported by a notice before the next record that passes.
+    """
+
+    def __init__(self, handler, rate, notice=None):
+        super().__init__()
+        self.handler = handler
+        self.rate = rate
+        self.notice = notice or "... {count} lines suppressed on the console"
+        self.tokens = float(rate)
+        self.last_time = time.monotonic()
+        self.suppressed = 0
+
+    def emit(self, record):
+        # The listener only checks this handler's level, the wrapped handler's one is checked here
+        if record.levelno < self.handler.level:
+            return
+
+        if getattr(record, "job", None) is not None and record.levelno < logging.WARNING:
+            now = time.monotonic()
+            self.tokens = min(float(self.rate), self.tokens + (now - self.last_time) * self.rate)
+            self.last_time = now
+
+            if self.tokens < 1:
+                self.suppressed += 1
+                return
+            self.tokens -= 1
+
+        self._report_suppressed()
+        self.handler.handle(record)
+
+    def flush(self):
+        self._report_suppressed()
+        self.handler.flush()
+
+    def _report_suppressed(self):
+        if self.suppressed:
+            notice = logging.makeLogRecord({"msg": self.notice.format(count=self.suppressed), "levelno": logging.INFO, "levelname": "INFO", "job": None})
+            self.suppressed = 0
+            self.handler.handle(notice)
+
+
+class JobFileHandler(logging.Handler):
+    """
+    Writes every record to <log_dir>/manage.log and the output of each job to <log_dir>/<job>.log.
+    """
+
+    def __init__(self, log_dir):
+        super().__init__()
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.main_file = open(self.log_dir / "manage.log", "a", encoding="utf-8")
+        self.job_files = {}
+
+    def emit(self, record):
+        self.main_file.write(self.format(record) + "\n")
+
+        job = getattr(record, "job", None)
+        if job is not None:
+            self._job_file(job).write(record.getMessage() + "\n")
+
+    def flush(self):
+        self.main_file.flush()
+        for job_file in self.job_files.values():
+            job_file.flush()
+
+    def close(self):
+        self.main_file.close()
+        for job_file in self.job_files.values():
+            job_file.close()
+        self.job_files = {}
+        super().close()
+
+    def _job_file(self, job):
+        job_file = self.job_files.pop(job, None)
+        if job_file is None:
+            if len(self.job_files) >= MAX_OPEN_JOB_FILES:
+                oldest = next(iter(self.job_files))
+                self.job_files.pop(oldest).close()
+            job_file = open(self.log_dir / f"{_file_name(job)}.log", "a", encoding="utf-8")
+
+        # Most recently used last
+        self.job_files[job] = job_file
+        return job_file
+
+
+class JsonLinesHandler(logging.Handler):
+    """
+    Writes one JSON object per record, for tools that post-process build logs.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def emit(self, record):
+        self.file.write(json.dumps({
+            "time": record.created,
+            "level": record.levelname,
+            "job": getattr(record, "job", None),
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
 class LoggerSingleton:
     """
     A singleton logger class that provides simple static methods for logging.
@@ -20,6 +165,9 @@ class LoggerSingleton:
         if not self._initialized:
             self._initialized = True
             self.logger = None
+            self.listener = None
+            self.saved_handlers = None
+            self.stop_registered = False
             if config_file:
                 self._setup_from_config_file(config_file)
             else:
@@ -42,10 +190,77 @@ class LoggerSingleton:
         """
         Set up default logging configuration.
         """
-        log_format = "%(asctime)s [%(levelname)s] %(message)s"
-        logging.basicConfig(level=log_level, format=log_format)
+        logging.basicConfig(level=log_level, format=LOG_FORMAT)
         self.logger = logging.getLogger()
 
+    def _start_queue(self, log_dir, json_path, console_rate):
+        """
+        Hand records to a background thread instead of writing them in the logging thread.
+
+        The current handlers keep writing to the console, limited to `console_rate`
+        job lines per second (0 for no limit), while `log_dir` receives full
+        per-job log files and `json_path` a JSON-lines copy of every record.
+        """
+        if self.listener is not None:
+            return
+
+        root = logging.getLogger()
+        self.saved_handlers = root.handlers[:]
+
+        handlers = []
+        for handler in self.saved_handlers:
+            if console_rate:
+                notice = "... {count} lines suppressed on the console" + (f", full output in {log_dir}" if log_dir else "")
+                handler = RateLimitedHandler(handler, console_rate, notice)
+            handlers.append(handler)
+
+        formatter = self.saved_handlers[0].formatter if self.saved_handlers else None
+        if log_dir:
+            job_file_handler = JobFileHandler(log_dir)
+            job_file_handler.setFormatter(formatter or logging.Formatter(LOG_FORMAT))
+            handlers.append(job_file_handler)
+        if json_path:
+            handlers.append(JsonLinesHandler(json_path))
+
+        # Pool workers forked from this process inherit the queue handler, a process queue carries their records here
+        log_queue = multiprocessing.Queue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(JobFilter())
+
+        self.listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        root.handlers = [queue_handler]
+
+        if not self.stop_registered:
+            atexit.register(LoggerSingleton.stop_queue)
+            self.stop_registered = True
+
+    def _stop_queue(self):
+        """
+        Write the queued records, close the log files and restore the direct handlers.
+        """
+        if self.listener is None:
+            return
+
+        logging.getLogger().handlers = self.saved_handlers
+        self.listener.stop()
+        self.listener.queue.close()
+        for handler in self.listener.handlers:
+            handler.flush()
+            if isinstance(handler, (JobFileHandler, JsonLinesHandler)):
+                handler.close()
+
+        self.listener = None
+        self.saved_handlers = None
+
+    @staticmethod
+    def start_queue(log_dir=None, json_path=None, console_rate=DEFAULT_CONSOLE_RATE):
+        LoggerSingleton()._start_queue(log_dir, json_path, console_rate)
+
+    @staticmethod
+    def stop_queue():
+        LoggerSingleton()._stop_queue()
+
     @staticmethod
     def Debug(message, *args, **kwargs):
         LoggerSingleton().logger.debug(message, *args, **kwargs)
@@ -71,5 +286,9 @@ class LoggerSingleton:
         LoggerSingleton().logger.set_level(level)
 
 
+def _file_name(job):
+    return re.sub(r"[^\w.-]+", "_", str(job)).strip("_") or "job"
+
+
 # Global logger instance
 Logger = LoggerSingleton
@@ -1,32 +1,222 @@
 import os
+import sys
+import json
+import queue
 import argparse
+import posixpath
+from fnmatch import fnmatch
+from concurrent.futures import ThreadPoolExecutor
 
 
-def print_tree(path, depth=1, indent=""):
+def print_tree(path, depth=1, indent="", include=None, exclude=None, sizes=False, sort="name", limit=None, json_lines=False, jobs=None):
     """
     Recursively prints the directory structure up to a specified depth.
 
+    Entries are read with os.scandir and their cached type information, so no
+    extra stat is needed to tell directories from files. When sizes are
+    requested the whole tree below `path` is scanned first, in parallel, and
+    every directory is printed with the total size and file count of its subtree.
+
     Args:
         path (str): The root directory path to start printing.
         depth (int): Maximum depth to recurse into subdirectories.
         indent (str): Indentation string for each level.
+        include (list or None): Glob patterns a file's name or relative path must match to be shown and counted.
+        exclude (list or None): Glob patterns of files and directories to skip entirely.
+        sizes (bool): Show the size and file count of each entry.
+        sort (str): "name", "size" for largest first, or "none" for directory order.
+        limit (int or None): Maximum number of entries printed per directory.
+        json_lines (bool): Stream one JSON object per entry instead of the indented text.
+        jobs (int or None): Number of threads scanning directories for sizes, defaults to the CPU count.
+
+    Returns:
+        dict or None: {"size": int, "files": int} of the root when sizes are computed.
     """
     if depth < 0:
-        return
+        return None
+
+    if not os.path.isdir(path):
+        print(f"{indent}[Path Not Found: {path}]")
+        return None
+
+    sizes = sizes or sort == "size"
+    totals = compute_directory_totals(path, include, exclude, jobs) if sizes else None
+
+    write = _json_line_writer() if json_lines else _text_writer(indent)
+    _print_directory(path, "", 0, depth, include, exclude, totals, sort, limit, write)
+
+    if totals is None:
+        return None
+
+    size, files = totals[os.path.normpath(path)]
+    return {"size": size, "files": files}
+
+def compute_directory_totals(root, include=None, exclude=None, jobs=None):
+    """
+    Total size and file count of every directory below `root`, subdirectories included.
+
+    Directories are scanned concurrently by a thread pool, os.scandir releases
+    the GIL while it waits on the filesystem.
+
+    Returns:
+        dict: Normalized directory path -> [size, files].
+    """
+    root = os.path.normpath(root)
+    totals = {}
+    parents = {}
+    results = queue.Queue()
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1, thread_name_prefix="tree") as executor:
+        def submit(directory, relative_path):
+            executor.submit(_scan_directory, directory, relative_path, include, exclude).add_done_callback(results.put)
+
+        submit(root, "")
+        outstanding = 1
+
+        while outstanding:
+            directory, size, files, subdirectories = results.get().result()
+            outstanding -= 1
+
+            totals[directory] = [size, files]
+            for subdirectory, relative_path in subdirectories:
+                parents[subdirectory] = directory
+                submit(subdirectory, relative_path)
+                outstanding += 1
+
+    # Fold the deepest directories into their parents first
+    for directory in sorted(parents, key=lambda directory: directory.count(os.sep), reverse=True):
+        parent_totals = totals[parents[directory]]
+        parent_totals[0] += totals[directory][0]
+        parent_totals[1] += totals[directory][1]
+
+    return totals
+
+def _scan_directory(directory, relative_path, include, exclude):
+    size = 0
+    files = 0
+    subdirectories = []
+
     try:
-        items = os.listdir(path)
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                entry_relative_path = posixpath.join(relative_path, entry.name) if relative_path else entry.name
+                if _matches(exclude, entry.name, entry_relative_path):
+                    continue
+
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append((entry.path, entry_relative_path))
+                elif include is None or _matches(include, entry.name, entry_relative_path):
+                    try:
+                        size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+                    files += 1
+    except OSError:
+        pass
+
+    return directory, size, files, subdirectories
+
+def _matches(patterns, name, relative_path):
+    if not patterns:
+        return False
+    return any(fnmatch(name, pattern) or fnmatch(relative_path, pattern) for pattern in patterns)
+
+def _print_directory(path, relative_path, level, depth, include, exclude, totals, sort, limit, write):
+    try:
+        with os.scandir(path) as iterator:
+            entries = []
+            for entry in iterator:
+                entry_relative_path = posixpath.join(relative_path, entry.name) if relative_path else entry.name
+                if _matches(exclude, entry.name, entry_relative_path):
+                    continue
+
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if not is_dir and include is not None and not _matches(include, entry.name, entry_relative_path):
+                    continue
+
+                entries.append((entry, entry_relative_path, is_dir, _entry_totals(entry, is_dir, totals)))
     except PermissionError:
-        print(f"{indent}[Permission Denied: {path}]")
+        write(level, {"error": "Permission Denied", "path": path})
         return
     except FileNotFoundError:
-        print(f"{indent}[Path Not Found: {path}]")
+        write(level, {"error": "Path Not Found", "path": path})
         return
 
-    for item in items:
-        full_path = os.path.join(path, item)
-        print(f"{indent}{item}")
-        if os.path.isdir(full_path):
-            print_tree(full_path, depth - 1, indent + "    ")
+    if sort == "size":
+        entries.sort(key=lambda item: (-item[3][0], item[0].name))
+    elif sort == "name":
+        entries.sort(key=lambda item: item[0].name)
+
+    shown = entries if limit is None else entries[:limit]
+
+    for entry, entry_relative_path, is_dir, (size, files) in shown:
+        record = {
+            "path": entry_relative_path,
+            "name": entry.name,
+            "type": "dir" if is_dir else ("symlink" if entry.is_symlink() else "file"),
+            "depth": level,
+        }
+        if totals is not None:
+            record["size"] = size
+            record["files"] = files
+        write(level, record)
+
+        if is_dir and depth > 0:
+            _print_directory(entry.path, entry_relative_path, level + 1, depth - 1, include, exclude, totals, sort, limit, write)
+
+    if len(shown) < len(entries):
+        hidden = entries[len(shown):]
+        record = {"path": relative_path, "omitted": len(hidden), "depth": level}
+        if totals is not None:
+            record["size"] = sum(item[3][0] for item in hidden)
+            record["files"] = sum(item[3][1] for item in hidden)
+        write(level, record)
+
+def _entry_totals(entry, is_dir, totals):
+    if totals is None:
+        return 0, 0
+    if is_dir:
+        size, files = totals.get(os.path.normpath(entry.path), (0, 0))
+        return size, files
+
+    try:
+        return entry.stat(follow_symlinks=False).st_size, 1
+    except OSError:
+        return 0, 1
+
+def _text_writer(indent):
+    def write(level, record):
+        prefix = indent + "    " * level
+        if "error" in record:
+            print(f"{prefix}[{record['error']}: {record['path']}]")
+            return
+
+        if "omitted" in record:
+            line = f"{prefix}... {record['omitted']} more entries"
+        else:
+            line = f"{prefix}{record['name']}"
+
+        if "size" in record:
+            detail = _format_size(record["size"])
+            if record.get("type") != "file":
+                detail += f", {record['files']} files"
+            line += f"  ({detail})"
+
+        print(line)
+
+    return write
+
+def _json_line_writer():
+    def write(level, record):
+        sys.stdout.write(json.dumps(record) + "\n")
+
+    return write
+
+def _format_size(size):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
 
 def _create_parser(parent_parser = None):
     description = "Prints the directory tree structure up to a specified depth."
@@ -46,16 +236,61 @@ def _create_parser(parent_parser = None):
         default=1,
         help="The maximum depth of recursion (default: 1)."
     )
+    parser.add_argument(
+        "-i", "--include",
+        action="append",
+        default=None,
+        help="Only show and count files whose name or relative path matches this glob, can be repeated."
+    )
+    parser.add_argument(
+        "-e", "--exclude",
+        action="append",
+        default=None,
+        help="Skip files and directories whose name or relative path matches this glob, can be repeated."
+    )
+    parser.add_argument(
+        "-s", "--sizes",
+        action="store_true",
+        help="Show total size and file count of every directory."
+    )
+    parser.add_argument(
+        "--sort",
+        choices=["name", "size", "none"],
+        default="name",
+        help="Sort entries by name, by size largest first (implies --sizes), or not at all (default: name)."
+    )
+    parser.add_argument(
+        "-n", "--limit",
+        type=int,
+        default=None,
+        help="Maximum number of entries shown per directory."
+    )
+    parser.add_argument(
+        "--json",
+        dest="json_lines",
+        action="store_true",
+        help="Stream one JSON object per line instead of the indented tree."
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Number of threads scanning directories for sizes (default: the CPU count)."
+    )
 
     return parser
 
+def _run(args):
+    print_tree(args.path, args.depth, include=args.include, exclude=args.exclude, sizes=args.sizes,
+               sort=args.sort, limit=args.limit, json_lines=args.json_lines, jobs=args.jobs)
+
 def register_subcommand(parent_parse):
     """
     Add 'print-tree' subcommand to the parent parser.
     """
     parser = _create_parser(parent_parse)
 
-    parser = parser.set_defaults(func=lambda args: print_tree(args.path, args.depth))
+    parser = parser.set_defaults(func=_run)
 
 def main():
     """
@@ -66,7 +301,7 @@ def main():
     args = parser.parse_args()
 
     if args.path:
-        print_tree(args.path, args.depth)
+        _run(args)
     else:
         parser.print_help()
 
@@ -0,0 +1,284 @@
+import os
+import sys
+import time
+import signal
+import asyncio
+import threading
+import subprocess
+from collections import deque
+from pathlib import Path
+
+from automation.utils.logger import Logger
+from automation.utils.cache_utils import JsonStore
+from automation.config.project_config import ProjectConfig
+
+
+class ResourceUsage:
+    """
+    CPU time, peak memory and context switches of a finished child process,
+    including the descendants it waited for.
+    """
+
+    def __init__(self, user_time, system_time, max_rss, voluntary_switches, involuntary_switches):
+        self.user_time = user_time
+        self.system_time = system_time
+        self.max_rss = max_rss
+        self.voluntary_switches = voluntary_switches
+        self.involuntary_switches = involuntary_switches
+
+    @classmethod
+    def from_rusage(cls, rusage):
+        # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+        max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+        return cls(rusage.ru_utime, rusage.ru_stime, max_rss, rusage.ru_nvcsw, rusage.ru_nivcsw)
+
+    def as_dict(self):
+        return {
+            "user_time": self.user_time,
+            "system_time": self.system_time,
+            "max_rss": self.max_rss,
+            "voluntary_switches": self.voluntary_switches,
+            "involuntary_switches": self.involuntary_switches,
+        }
+
+    def __str__(self):
+        return (f"user {self.user_time:.2f}s, sys {self.system_time:.2f}s, "
+                f"max RSS {self.max_rss / (1024 * 1024):.1f} MiB, "
+                f"context switches {self.voluntary_switches}/{self.involuntary_switches}")
+
+
+class ChildProcess:
+    """
+    A child process with piped stdout and stderr streams.
+
+    On POSIX the child is reaped with os.wait4 so that its resource usage is
+    known, elsewhere asyncio's subprocess support is used and no usage is reported.
+    """
+
+    def __init__(self, pid, stdout, stderr, process=None):
+        self.pid = pid
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode = None
+        self._process = process
+        self._popen = None
+
+    @classmethod
+    async def start(cls, command, env, **kwargs):
+        if os.name == "nt":
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                env=env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                **kwargs
+            )
+            return cls(process.pid, process.stdout, process.stderr, process)
+
+        loop = asyncio.get_running_loop()
+        popen = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+
+        stdout = asyncio.StreamReader()
+        stderr = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stdout), popen.stdout)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stderr), popen.stderr)
+
+        child = cls(popen.pid, stdout, stderr)
+        child._popen = popen
+        return child
+
+    async def wait(self):
+        """
+        Wait for the child to exit.
+
+        Returns:
+            tuple: (exit_code, ResourceUsage or None)
+        """
+        if self._process is not None:
+            self.returncode = await self._process.wait()
+            return self.returncode, None
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        threading.Thread(target=_reap_child, args=(self.pid, loop, future), name=f"wait4-{self.pid}", daemon=True).start()
+
+        _, status, rusage = await future
+        self.returncode = os.waitstatus_to_exitcode(status)
+        # Tell Popen the child is gone so it never tries to reap it again
+        self._popen.returncode = self.returncode
+
+        return self.returncode, ResourceUsage.from_rusage(rusage)
+
+    def terminate(self):
+        if self.returncode is not None:
+            return
+
+        try:
+            if self._process is not None:
+                self._process.terminate()
+            else:
+                # Popen.terminate() would poll, and thereby reap, the child behind os.wait4's back
+                os.kill(self.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+
+def _reap_child(pid, loop, future):
+    try:
+        result = os.wait4(pid, 0)
+    except Exception as e:
+        loop.call_soon_threadsafe(_set_future, future, None, e)
+    else:
+        loop.call_soon_threadsafe(_set_future, future, result, None)
+
+
+def _set_future(future, result, exception):
+    if future.cancelled():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+def command_class(command):
+    """
+    Group commands whose resource usage is alike, e.g. "conan build" or "clang-format".
+    """
+    name = Path(str(command[0])).stem if command else "command"
+    for argument in command[1:]:
+        argument = str(argument)
+        if argument.startswith("-"):
+            continue
+        # Only a word-like first argument is a subcommand, paths and code snippets are not
+        if argument.replace("-", "").replace("_", "").isalnum():
+            return f"{name} {argument}"
+        break
+
+    return name
+
+
+def read_available_memory():
+    """
+    Available memory in bytes as reported by /proc/meminfo, or None where it is not available.
+    """
+    try:
+        with open("/proc/meminfo", "r") as f:
+            meminfo = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None
+
+    value = meminfo.get("MemAvailable") or meminfo.get("MemFree")
+    if value is None:
+        return None
+
+    return int(value.split()[0]) * 1024
+
+
+class MemoryBudget:
+    """
+    Holds back new commands while the recent peak RSS of their command class does not fit in available memory.
+
+    Commands that are already running count with their own class estimate on
+    top of what /proc/meminfo reports, which is conservative but keeps parallel
+    link jobs from piling up. A command is always admitted when nothing else is
+    running, so progress is guaranteed.
+    """
+    HISTORY_SIZE = 5
+    POLL_INTERVAL = 0.25
+
+    # Peaks are kept across runs under ProjectConfig.CACHE_DIR, a single run sees too few commands of each class
+    HISTORY_FILE = "memory_budget.json"
+
+    _enabled = False
+    _lock = threading.Lock()
+    _history = {}
+    _store = None
+    _reserved = 0
+    _running = 0
+
+    @classmethod
+    def enable(cls, enabled=True):
+        cls._enabled = enabled
+        if not enabled:
+            # The next enable reloads the peaks, from the cache directory of the project it runs for
+            cls._store = None
+            return
+        if cls._store is not None:
+            return
+
+        cls._store = JsonStore(Path(ProjectConfig.CACHE_DIR) / cls.HISTORY_FILE)
+        stored = cls._store.load().get("peaks", {})
+        with cls._lock:
+            for command_class, peaks in stored.items():
+                # Peaks recorded in this process before enabling are newer than the stored ones
+                recorded = cls._history.get(command_class, ())
+                cls._history[command_class] = deque([*peaks, *recorded], maxlen=cls.HISTORY_SIZE)
+
+    @classmethod
+    def is_enabled(cls):
+        return cls._enabled
+
+    @classmethod
+    def record(cls, command_class, max_rss):
+        with cls._lock:
+            history = cls._history.setdefault(command_class, deque(maxlen=cls.HISTORY_SIZE))
+            history.append(max_rss)
+            peaks = list(history)
+
+        if cls._store is None:
+            return
+
+        def merge(data):
+            data.setdefault("peaks", {})[command_class] = peaks
+
+        cls._store.update(merge)
+
+    @classmethod
+    def estimate(cls, command_class):
+        with cls._lock:
+            history = cls._history.get(command_class)
+            return max(history) if history else 0
+
+    @classmethod
+    async def acquire(cls, command_class):
+        """
+        Wait until a command of `command_class` fits in memory and reserve its estimate.
+
+        Returns:
+            int: The reserved amount, to hand back to `release`.
+        """
+        if not cls._enabled:
+            return None
+
+        waiting_since = None
+
+        while True:
+            estimate = cls.estimate(command_class)
+            available = read_available_memory()
+            with cls._lock:
+                if cls._running == 0 or available is None or cls._reserved + estimate <= available:
+                    cls._reserved += estimate
+                    cls._running += 1
+                    break
+
+            if waiting_since is None:
+                waiting_since = time.perf_counter()
+                Logger.Info(f"Shell: holding back {command_class}, needs about {estimate >> 20} MiB "
+                            f"with {available >> 20} MiB available")
+
+            await asyncio.sleep(cls.POLL_INTERVAL)
+
+        if waiting_since is not None:
+            Logger.Info(f"Shell: starting {command_class} after waiting {time.perf_counter() - waiting_since:.1f}s for memory")
+
+        return estimate
+
+    @classmethod
+    def release(cls, reservation):
+        if reservation is None:
+            return
+
+        with cls._lock:
+            cls._reserved -= reservation
+            cls._running -= 1
@@ -1,14 +1,23 @@
 import subprocess
 import asyncio
+import codecs
+import atexit
 import sys
+import time
+import tempfile
 import threading
 from pathlib import Path
 import os
+import itertools
+from collections import deque
 
 automation_package_location = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(automation_package_location))
 
-from automation.utils.logger import Logger
+from automation.utils.logger import Logger, log_job
+from automation.utils.tracing import Tracer
+from automation.utils.process_utils import ChildProcess, MemoryBudget, command_class
+from automation.utils.jobserver import get_jobserver
 
 
 class DecodeFailed(Exception):
@@ -32,31 +41,177 @@ class Decoder:
         raise DecodeFailed()
 
 
-class StringBuffer:
+class StreamDecoder:
+    """
+    Decodes one output stream incrementally.
 
-    def __init__(self):
-        self.myData = ''
+    The encoding is detected once from the first chunk, later chunks go through a
+    `codecs` incremental decoder so that multibyte sequences split across reads
+    decode correctly. The other supported encodings are only tried when decoding fails.
+    """
+
+    def __init__(self, encodings=Decoder.static_supported_encodings):
+        self.encodings = encodings
+        self.encoding = None
+        self.decoder = None
+
+    def Decode(self, data, final=False):
+        """
+        Decode the next chunk of the stream, `final` flushes bytes held back from earlier chunks.
+        """
+        if self.decoder is None:
+            return self._switch(data, final, self.encodings)
+
+        buffered, _ = self.decoder.getstate()
+        try:
+            return self.decoder.decode(data, final)
+        except UnicodeDecodeError:
+            candidates = [encoding for encoding in self.encodings if encoding != self.encoding]
+            return self._switch(buffered + data, final, candidates)
+
+    def _switch(self, data, final, candidates):
+        for encoding in candidates:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            try:
+                text = decoder.decode(data, final)
+            except UnicodeDecodeError:
+                continue
+
+            if self.encoding is not None:
+                Logger.Warning(f"Decoder: switching stream encoding from {self.encoding} to {encoding}")
+
+            self.encoding = encoding
+            self.decoder = decoder
+            return text
+
+        Logger.Error(f"Decoder: {data[:256]}")
+        Logger.Error(f"Decoder: Decoding failed, supported coding : {self.encodings}")
+        raise DecodeFailed()
+
+
+class OutputBuffer:
+    """
+    Accumulates decoded output as a list of chunks with a bounded memory footprint.
+
+    Once the in-memory cap is exceeded the output spills to a temporary file and
+    only its head and tail stay in memory, `data` then joins them around a marker
+    that points at the spill file while it is kept.
+    """
+
+    DEFAULT_MEMORY_LIMIT = 4 * 1024 * 1024
+
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT, head_size=None, tail_size=None):
+        """
+        Args:
+            memory_limit (int): Number of characters kept in memory before spilling to disk.
+            head_size (int or None): Characters kept from the start after spilling, defaults to a quarter of the limit.
+            tail_size (int or None): Characters kept from the end after spilling, defaults to a quarter of the limit.
+        """
+        self.memory_limit = memory_limit
+        self.head_size = memory_limit // 4 if head_size is None else head_size
+        self.tail_size = memory_limit // 4 if tail_size is None else tail_size
+
+        self.myChunks = []
+        self.mySize = 0
+        self.myTotalSize = 0
+
+        self.myHead = ''
+        self.myTail = deque()
+        self.myTailSize = 0
+        self.mySpillFile = None
+        self.mySpillRemoved = False
 
     @property
     def data(self):
-        return self.myData
+        if self.mySpillFile is None:
+            if len(self.myChunks) > 1:
+                self.myChunks = [''.join(self.myChunks)]
+            return self.myChunks[0] if self.myChunks else ''
+
+        tail = ''.join(self.myTail)[-self.tail_size:] if self.tail_size else ''
+        omitted = self.myTotalSize - len(self.myHead) - len(tail)
+        location = f", full output in {self.spill_path}" if self.spill_path else ""
+        return f"{self.myHead}\n... [{omitted} characters omitted{location}] ...\n{tail}"
+
+    @property
+    def size(self):
+        return self.myTotalSize
+
+    @property
+    def spill_path(self):
+        if self.mySpillFile is None or self.mySpillRemoved:
+            return None
+        return self.mySpillFile.name
 
     def Append(self, data):
-        self.myData += data
+        self.myTotalSize += len(data)
+
+        if self.mySpillFile is None:
+            self.myChunks.append(data)
+            self.mySize += len(data)
+            if self.mySize > self.memory_limit:
+                self._spill()
+        else:
+            self.mySpillFile.write(data)
+            self._append_tail(data)
+
+    def Close(self, keep=False):
+        """
+        Close the spill file and delete it, unless `keep` asks to leave it on disk for inspection.
+        """
+        if self.mySpillFile is None or self.mySpillFile.closed:
+            return
+
+        self.mySpillFile.close()
+        if not keep:
+            try:
+                os.unlink(self.mySpillFile.name)
+            except OSError:
+                pass
+            self.mySpillRemoved = True
+
+    def _spill(self):
+        text = ''.join(self.myChunks)
+        self.myChunks = []
+        self.mySize = 0
+
+        self.mySpillFile = tempfile.NamedTemporaryFile(
+            mode="w", encoding="utf-8", errors="replace", newline="", prefix="automation-output-", suffix=".log", delete=False
+        )
+        self.mySpillFile.write(text)
+
+        self.myHead = text[:self.head_size]
+        self._append_tail(text[-self.tail_size:] if self.tail_size else '')
+
+    def _append_tail(self, data):
+        if not self.tail_size or not data:
+            return
+
+        self.myTail.append(data)
+        self.myTailSize += len(data)
+
+        # Drop whole chunks that fall entirely outside the tail window
+        while self.myTailSize - len(self.myTail[0]) >= self.tail_size:
+            self.myTailSize -= len(self.myTail.popleft())
 
 
 class SubprocessLogReaderAsync:
     """
-    Reads lines asynchronously from a subprocess stream, decodes them, and logs or buffers the output.
+    Reads a subprocess stream in fixed-size chunks, splits it into lines, decodes them, and logs or buffers the output.
     """
 
+    READ_CHUNK_SIZE = 64 * 1024
+
+    # Lines longer than this are logged in pieces instead of being held until their end
+    MAX_LINE_LENGTH = 64 * 1024
+
     def __init__(self, stream, string_buffer, log_method, log_each_line=True):
         """
-        Initialize the log reader.
+        Initialize the log reader, with one incremental decoder for the whole stream.
 
         Args:
             stream (asyncio.StreamReader): The stream to read from.
-            string_buffer (StringBuffer): A buffer to accumulate all lines read.
+            string_buffer (OutputBuffer): A buffer to accumulate all lines read.
             log_method (callable): A logging method (e.g., logging.info or logging.error).
             log_each_line (bool): Whether to log each line or only at the end.
         """
@@ -64,104 +219,372 @@ class SubprocessLogReaderAsync:
         self.string_buffer = string_buffer
         self.line_logger = log_method if log_each_line else lambda _: None
         self.passage_logger = log_method if not log_each_line else lambda _: None
+        self.decoder = StreamDecoder()
+        self.bytes_read = 0
 
     async def __call__(self):
         """
-        Start reading lines asynchronously from the stream.
+        Start reading asynchronously from the stream.
 
         This function appends decoded lines to the buffer and logs them based on the settings.
         """
-        async for line_bytes in self.stream:
-            line = Decoder.Decode(line_bytes).rstrip()
-            self.string_buffer.Append(line + '\n')
-            self.line_logger(line)
+        pending = ''
+        while True:
+            chunk = await self.stream.read(self.READ_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            self.bytes_read += len(chunk)
+            pending = self._consume(pending, self.decoder.Decode(chunk))
+
+        pending = self._consume(pending, self.decoder.Decode(b'', final=True))
+        if pending:
+            self._log(pending.rstrip())
+
         # Log the complete passage if `log_each_line` is False
         self.passage_logger(self.string_buffer.data)
 
+    def _consume(self, pending, text):
+        """
+        Buffer `text` as it was read, log every line it completes and return the unfinished remainder.
+
+        Only the logged lines are cut at MAX_LINE_LENGTH, the buffer keeps the output unchanged.
+        """
+        if text:
+            self.string_buffer.Append(text)
+
+        lines = (pending + text).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            self._log(line.rstrip())
 
-async def run_command_async(command, *, check=False, env=None, log_each_line=True, log_stdout=Logger.Info, log_stderr=Logger.Error, **kwargs):
+        while len(pending) > self.MAX_LINE_LENGTH:
+            self.line_logger(pending[:self.MAX_LINE_LENGTH])
+            pending = pending[self.MAX_LINE_LENGTH:]
+
+        return pending
+
+    def _log(self, line):
+        for start in range(0, max(len(line), 1), self.MAX_LINE_LENGTH):
+            self.line_logger(line[start:start + self.MAX_LINE_LENGTH])
+
+
+class ShellCommand:
+    """
+    A command together with its own environment, log prefix and subprocess options.
+    """
+
+    def __init__(self, command, *, env=None, prefix=None, **kwargs):
+        """
+        Args:
+            command (str or list): Command to run.
+            env (dict or None): Extra environment variables for this command.
+            prefix (str or None): Prefix for the command's log lines.
+            **kwargs: Additional keyword arguments for create_subprocess_exec.
+        """
+        self.command = command
+        self.env = env
+        self.prefix = prefix
+        self.kwargs = kwargs
+
+
+class CommandResult:
+    """
+    Outcome of a finished shell command.
+    """
+
+    def __init__(self, command, exit_code, stdout, stderr, start_time, elapsed, usage=None):
+        self.command = command
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+        self.start_time = start_time
+        self.elapsed = elapsed
+        # ResourceUsage of the process, None where the platform cannot report it
+        self.usage = usage
+
+    @property
+    def success(self):
+        return self.exit_code == 0
+
+    def __repr__(self):
+        return f"CommandResult(command={self.command}, exit_code={self.exit_code}, elapsed={self.elapsed:.3f}s)"
+
+
+class CommandRunner:
+    """
+    Owns one long-lived event loop, running on a background thread, that all synchronous helpers share.
+
+    Keeping the loop on its own thread lets synchronous code submit commands
+    even when it is itself called from a running event loop.
+    """
+    _instance = None
+    _instance_pid = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name="CommandRunner", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def instance(cls):
+        """
+        Return the runner of the current process, creating it on first use.
+        """
+        with cls._instance_lock:
+            # A forked child inherits the object but not the loop thread
+            if cls._instance is None or cls._instance_pid != os.getpid():
+                cls._instance = CommandRunner()
+                cls._instance_pid = os.getpid()
+                atexit.register(cls._instance.shutdown)
+            return cls._instance
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coroutine):
+        """
+        Run a coroutine on the runner loop and block until it finishes.
+        """
+        if threading.current_thread() is self.thread:
+            raise RuntimeError("CommandRunner.run cannot be called from the runner loop, await the coroutine instead.")
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def shutdown(self):
+        if self.loop.is_closed():
+            return
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+# Subprocesses currently running, mapped to the loop driving them
+_running_processes = {}
+_running_processes_lock = threading.Lock()
+
+# Numbers the jobs of this process, queued logging writes each job's output to its own file
+_job_ids = itertools.count(1)
+
+
+def terminate_running_commands():
+    """
+    Terminate every subprocess started through `execute_command_async` that is still running, e.g. to cancel a build.
+    """
+    with _running_processes_lock:
+        running = list(_running_processes.items())
+
+    for process, loop in running:
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(_terminate_process, process)
+
+
+def _terminate_process(process):
+    process.terminate()
+
+
+async def execute_command_async(command, *, check=False, env=None, log_each_line=True, log_stdout=Logger.Info, log_stderr=Logger.Error, prefix=None,
+                                output_limit=OutputBuffer.DEFAULT_MEMORY_LIMIT, **kwargs):
     """
     Run a shell command asynchronously.
 
     Args:
-        command (str or list): Command to run. String for Windows, list for Linux/Unix.
+        command (str, list or ShellCommand): Command to run. String for Windows, list for Linux/Unix.
         check (bool): Whether to raise an exception if the process exits with a non-zero code.
         env (dict or None): A dictionary of environment variables to pass to the subprocess.
             - If `None` (default), the subprocess inherits the current process's environment variables.
         log_stdout (callable): Optional function to log stdout lines (e.g., print or a logger).
         log_stderr (callable): Optional function to log stderr lines (e.g., print or a logger).
+        prefix (str or None): Prefix added to every logged output line.
+        output_limit (int): Characters of stdout and of stderr kept in memory, beyond it output spills to a temporary file.
         **kwargs: Additional keyword arguments for create_subprocess_exec.
 
     Returns:
-        tuple: (exit_code, stdout, stderr) where:
-            - exit_code: Process exit code.
-            - stdout: Captured stdout as a single string.
-            - stderr: Captured stderr as a single string.
+        CommandResult: Exit code, captured output and timing of the command.
 
     Raises:
-        ShellCommandError: If `check` is True and the process exits with a non-zero code.
+        RuntimeError: If `check` is True and the process exits with a non-zero code.
     """
+    if isinstance(command, ShellCommand):
+        env = {**(env or {}), **(command.env or {})}
+        prefix = prefix or command.prefix
+        kwargs = {**kwargs, **command.kwargs}
+        command = command.command
+
     if isinstance(command, str):
         command = command.split()
     elif not isinstance(command, list):
         raise ValueError("Command must be a string or a list.")
 
+    if prefix:
+        log_stdout = _prefixed(log_stdout, prefix)
+        log_stderr = _prefixed(log_stderr, prefix)
+
+    # Records logged while the command runs are tagged with its job, queued logging writes them to the job's file
+    job_token = log_job.set(f"{next(_job_ids):03d}-{prefix or _command_name(command)}")
+
     Logger.Info(f'Shell: executing shell command : {command}')
 
-    # Merge environment variables
+    # Merge environment variables, children join the jobserver through MAKEFLAGS
+    jobserver = get_jobserver()
     final_env = os.environ.copy()
+    if jobserver is not None:
+        final_env.update(jobserver.environment())
     if env:
         final_env.update(env)
 
-    try:
-        process = await asyncio.create_subprocess_exec(
-            *command,
-            env=final_env,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            **kwargs
-        )
-    except Exception as e:
-        Logger.Error(f"Failed to start process: {e}")
-        raise
-
-    stdout_buffer = StringBuffer()
-    stderr_buffer = StringBuffer()
-
-    stdout_reader = SubprocessLogReaderAsync(
-        process.stdout,
-        stdout_buffer,
-        log_method=log_stdout,
-        log_each_line=log_each_line
-    )
-
-    stderr_reader = SubprocessLogReaderAsync(
-        process.stderr,
-        stderr_buffer,
-        log_method=log_stderr,
-        log_each_line=log_each_line
-    )
+    command_kind = command_class(command)
+    reservation = await MemoryBudget.acquire(command_kind)
+    token = None
 
     try:
-        await asyncio.gather(stdout_reader(), stderr_reader())
-        return_code = await process.wait()
-        stdout, stderr = stdout_buffer.data.rstrip(), stderr_buffer.data.rstrip()
+        # The token stands for the command's own process, a make it starts reads further tokens itself
+        if jobserver is not None:
+            token = await jobserver.acquire()
 
-        if not log_each_line:
-            len(stdout) > 0 and log_stdout(stdout)
-            len(stderr) > 0 and log_stdout(stderr)
+        with Tracer.span(_command_name(command), "command", command=" ".join(map(str, command))) as trace_args:
+            start_time = time.time()
+            start_counter = time.perf_counter()
 
-        if check and return_code != 0:
-            raise RuntimeError(f"Command {command} failed with return code {return_code}")
-        else:
-            return process.returncode == 0, stdout, stderr
-    except Exception as e:
-        Logger.Error(f"Error while running command: {e}")
-        raise
+            try:
+                process = await ChildProcess.start(command, final_env, **kwargs)
+            except Exception as e:
+                Logger.Error(f"Failed to start process: {e}")
+                raise
+
+            with _running_processes_lock:
+                _running_processes[process] = asyncio.get_running_loop()
+
+            stdout_buffer = OutputBuffer(output_limit)
+            stderr_buffer = OutputBuffer(output_limit)
+
+            stdout_reader = SubprocessLogReaderAsync(
+                process.stdout,
+                stdout_buffer,
+                log_method=log_stdout,
+                log_each_line=log_each_line
+            )
+
+            stderr_reader = SubprocessLogReaderAsync(
+                process.stderr,
+                stderr_buffer,
+                log_method=log_stderr,
+                log_each_line=log_each_line
+            )
+
+            try:
+                await asyncio.gather(stdout_reader(), stderr_reader())
+                return_code, usage = await process.wait()
+                elapsed = time.perf_counter() - start_counter
+
+                # Output that did not fit in memory is kept on disk only when the command failed
+                for name, buffer in (("stdout", stdout_buffer), ("stderr", stderr_buffer)):
+                    buffer.Close(keep=return_code != 0)
+                    if buffer.spill_path:
+                        Logger.Warning(f"Shell: {name} of {command[0]} exceeded {output_limit} characters, full output in {buffer.spill_path}")
+
+                stdout, stderr = stdout_buffer.data.rstrip(), stderr_buffer.data.rstrip()
+
+                trace_args.update(exit_code=return_code, stdout_bytes=stdout_reader.bytes_read, stderr_bytes=stderr_reader.bytes_read)
+
+                if usage is not None:
+                    MemoryBudget.record(command_kind, usage.max_rss)
+                    trace_args.update(usage.as_dict())
+                    Logger.Info(f"Shell: {command_kind} exited with code {return_code} after {elapsed:.2f}s ({usage})")
+
+                if not log_each_line:
+                    len(stdout) > 0 and log_stdout(stdout)
+                    len(stderr) > 0 and log_stdout(stderr)
+
+                if check and return_code != 0:
+                    raise RuntimeError(f"Command {command} failed with return code {return_code}")
+                else:
+                    return CommandResult(command, return_code, stdout, stderr, start_time, elapsed, usage)
+            except Exception as e:
+                Logger.Error(f"Error while running command: {e}")
+                raise
+            finally:
+                with _running_processes_lock:
+                    _running_processes.pop(process, None)
+
+                stdout_buffer.Close()
+                stderr_buffer.Close()
+    finally:
+        if token is not None:
+            jobserver.release(token)
+        MemoryBudget.release(reservation)
+        log_job.reset(job_token)
+
+
+async def run_command_async(command, **kwargs):
+    """
+    Run a shell command asynchronously, see `execute_command_async` for the arguments.
+
+    Returns:
+        tuple: (success, stdout, stderr) where:
+            - success: Whether the process exited with code 0.
+            - stdout: Captured stdout as a single string.
+            - stderr: Captured stderr as a single string.
+    """
+    result = await execute_command_async(command, **kwargs)
+    return result.success, result.stdout, result.stderr
+
+
+async def run_commands_async(commands, *, max_concurrency=None, check=False, **kwargs):
+    """
+    Run several shell commands concurrently.
+
+    Args:
+        commands (list): Commands to run, each a string, a list or a ShellCommand.
+        max_concurrency (int or None): Maximum number of commands running at once, defaults to the CPU count.
+        check (bool): Whether to raise an exception once all commands finished if any of them failed.
+        **kwargs: Options passed to `execute_command_async` for every command.
+
+    Returns:
+        list: CommandResult for each command, in the order of `commands`.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or os.cpu_count() or 1)
+
+    async def run_one(index, command):
+        prefix = command.prefix if isinstance(command, ShellCommand) else None
+        if prefix is None:
+            prefix = f"{index}:{_command_name(command)}"
+
+        async with semaphore:
+            return await execute_command_async(command, prefix=prefix, **kwargs)
+
+    results = await asyncio.gather(*(run_one(index, command) for index, command in enumerate(commands)))
+
+    failed = [result for result in results if not result.success]
+    if check and failed:
+        raise RuntimeError(f"{len(failed)} of {len(results)} commands failed: {[result.command for result in failed]}")
+
+    return list(results)
+
+
+def _prefixed(log_method, prefix):
+    return lambda message: log_method(f"[{prefix}] {message}")
+
+
+def _command_name(command):
+    if isinstance(command, ShellCommand):
+        command = command.command
+    parts = command.split() if isinstance(command, str) else command
+    return Path(str(parts[0])).stem if parts else "command"
 
 
 def run_command(*args, **kwargs):
-    return asyncio.run(run_command_async(*args, **kwargs))
+    return CommandRunner.instance().run(run_command_async(*args, **kwargs))
+
+
+def run_commands(commands, **kwargs):
+    """
+    Run several shell commands concurrently on the shared runner loop, see `run_commands_async`.
+    """
+    return CommandRunner.instance().run(run_commands_async(commands, **kwargs))
 
 
 if __name__ == "__main__":
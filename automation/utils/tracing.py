@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+
+class Tracer:
+    """
+    Collects timed spans and writes them as a Chrome trace, viewable in chrome://tracing or Perfetto.
+
+    Concurrent spans are spread over numbered lanes so that spans on one lane
+    never partially overlap, which the trace format requires.
+    """
+    _enabled = False
+    _lock = threading.Lock()
+    _origin = time.perf_counter()
+    _spans = []
+    _busy_lanes = set()
+
+    @classmethod
+    def enable(cls):
+        with cls._lock:
+            cls._enabled = True
+            cls._origin = time.perf_counter()
+            cls._spans = []
+            cls._busy_lanes = set()
+
+    @classmethod
+    def disable(cls):
+        """
+        Stop collecting spans and drop the collected ones, a long-lived process traces each run on its own.
+        """
+        with cls._lock:
+            cls._enabled = False
+            cls._spans = []
+            cls._busy_lanes = set()
+
+    @classmethod
+    def is_enabled(cls):
+        return cls._enabled
+
+    @classmethod
+    @contextmanager
+    def span(cls, name, category, **args):
+        """
+        Time the enclosed block.
+
+        Yields a dict of span arguments the block can extend, e.g. with an exit code.
+        """
+        if not cls._enabled:
+            yield args
+            return
+
+        lane = cls._acquire_lane()
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = repr(e)
+            raise
+        finally:
+            end = time.perf_counter()
+            with cls._lock:
+                cls._busy_lanes.discard(lane)
+                cls._spans.append((name, category, start - cls._origin, end - start, lane, dict(args)))
+
+    @classmethod
+    def _acquire_lane(cls):
+        with cls._lock:
+            lane = 0
+            while lane in cls._busy_lanes:
+                lane += 1
+            cls._busy_lanes.add(lane)
+            return lane
+
+    @classmethod
+    def write(cls, path):
+        """
+        Write the collected spans as Chrome trace JSON.
+        """
+        pid = os.getpid()
+        with cls._lock:
+            spans = list(cls._spans)
+
+        events = []
+        for lane in sorted({span[4] for span in spans}):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": lane, "args": {"name": f"lane {lane}"}})
+
+        for name, category, start, duration, lane, args in spans:
+            events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round(start * 1e6),
+                "dur": round(duration * 1e6),
+                "pid": pid,
+                "tid": lane,
+                "args": args,
+            })
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    @classmethod
+    def summary(cls, limit=10):
+        """
+        Summarize the slowest spans.
+
+        Returns:
+            str: One line per span, slowest first.
+        """
+        with cls._lock:
+            spans = sorted(cls._spans, key=lambda span: span[3], reverse=True)[:limit]
+
+        lines = [f"Slowest {len(spans)} spans:"]
+        for name, category, start, duration, _, _ in spans:
+            lines.append(f"  {duration:9.3f}s  {category:<8} {name}  (started at {start:.3f}s)")
+
+        return "\n".join(lines)
@@ -47,12 +47,19 @@ class AetherEngineConan(ConanFile):
         deps = CMakeDeps(self)
         deps.generate()
         tc = CMakeToolchain(self)
+        # 编译器缓存 (ccache/sccache)，由 manage.py eurora --compiler-cache 传入
+        compiler_launcher = self.conf.get("user.aether:compiler_launcher")
+        if compiler_launcher:
+            tc.cache_variables["CMAKE_C_COMPILER_LAUNCHER"] = compiler_launcher
+            tc.cache_variables["CMAKE_CXX_COMPILER_LAUNCHER"] = compiler_launcher
         tc.generate()
 
     def build(self):
         cmake = CMake(self)
         cmake.configure()
-        cmake.build()
+        # 只构建指定的目标，由 manage.py eurora --targets 传入
+        targets = self.conf.get("user.aether:build_targets", check_type=list)
+        cmake.build(target=targets)
 
     def package(self):
         cmake = CMake(self)